@@ -0,0 +1,136 @@
+"""
+Response serialization benchmark.
+
+Times the same /calculate and /batch response bodies through FastAPI's
+response_model path (validate the returned model again, then encode it)
+and through PrebuiltJSONResponse (serialize once, no validation), over a
+throwaway app so no solves are involved. Requests are sent straight to the
+ASGI app, without an HTTP client, so the timings are routing plus
+serialization.
+
+Usage (from the api directory):
+    python -m av-calculator.benchmark_responses
+    python -m av-calculator.benchmark_responses --plans 1 100 1000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import fastapi
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from .calculator import calculate_av_from_request, result_details
+from .main import TEST_001_PLAN
+from .models import BatchItemResult, BatchResponse, CalculateResponse
+from .responses import PrebuiltJSONResponse, model_json
+
+
+def build_app(plans: int) -> FastAPI:
+    """App serving one precomputed result per route, the old way and the fast way."""
+    result = calculate_av_from_request(TEST_001_PLAN)
+    fields = dict(
+        success=True,
+        av_percentage=result.av_percent,
+        metal_tier=result.metal_tier,
+        calculation_time_ms=result.calculation_time,
+        details=result_details(result),
+        warnings=result.warnings or None,
+    )
+    items = [
+        BatchItemResult(
+            index=index,
+            is_valid=True,
+            av_percentage=result.av_percent,
+            metal_tier=result.metal_tier,
+            details=result_details(result),
+            warnings=result.warnings,
+        )
+        for index in range(plans)
+    ]
+    batch_fields = dict(
+        success=True, results=items, valid_count=plans, invalid_count=0, calculation_time_ms=1.0
+    )
+
+    app = FastAPI()
+
+    @app.get("/calculate/model", response_model=CalculateResponse)
+    async def calculate_model():
+        # /calculate before: build and validate, dump, encode with json
+        return JSONResponse(content=CalculateResponse(**fields).model_dump())
+
+    @app.get("/calculate/fast", response_model=CalculateResponse)
+    async def calculate_fast():
+        return PrebuiltJSONResponse(model_json(CalculateResponse.model_construct(**fields)))
+
+    @app.get("/batch/model", response_model=BatchResponse)
+    async def batch_model():
+        return BatchResponse(**batch_fields)
+
+    @app.get("/batch/fast", response_model=BatchResponse)
+    async def batch_fast():
+        return PrebuiltJSONResponse(BatchResponse.model_construct(**batch_fields))
+
+    return app
+
+
+async def asgi_get(app: FastAPI, path: str) -> bytes:
+    """Send a GET straight to an ASGI app and return the response body."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': b'', 'headers': [], 'client': ('127.0.0.1', 0), 'server': ('test', 80),
+    }
+    body = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return b''.join(body)
+
+
+async def time_requests(app: FastAPI, path: str, repeat: int) -> float:
+    """Mean milliseconds per request, after one warm-up request."""
+    await asgi_get(app, path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await asgi_get(app, path)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def run(plans_list: List[int], repeat: int) -> None:
+    print(f"FastAPI {fastapi.__version__}")
+    print(f"{'response':<20} {'model path ms':>14} {'fast path ms':>13} {'speedup':>8}")
+    for plans in plans_list:
+        app = build_app(plans)
+        routes = [('batch', f"batch ({plans} plans)")]
+        if plans == plans_list[0]:
+            routes.insert(0, ('calculate', 'calculate'))
+        for route, label in routes:
+            slow = await time_requests(app, f"/{route}/model", repeat)
+            fast = await time_requests(app, f"/{route}/fast", repeat)
+            same = json.loads(await asgi_get(app, f"/{route}/model")) == json.loads(
+                await asgi_get(app, f"/{route}/fast"))
+            assert same, f"{route}: paths return different bodies"
+            print(f"{label:<20} {slow:>14.3f} {fast:>13.3f} {slow / fast:>7.1f}x")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument('--plans', type=int, nargs='+', default=[1, 100, 1000],
+                        help="Batch sizes to time")
+    parser.add_argument('--repeat', type=int, default=30, help="Requests per measurement")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.plans, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Response Cache
+
+In-process LRU cache of calculation responses, keyed on a canonical hash of
+the validated request together with the engine and continuance table
+versions. A key (and the ETag built from it) therefore only changes when the
+plan, the engine or the tables change, so every API worker derives the same
+ETag for the same request, and clients and CDNs can revalidate against any
+worker.
+
+Configuration (environment):
+    AV_CACHE_SIZE: Most responses kept per worker (default 4096, 0 disables)
+    AV_CACHE_TTL: Seconds a response is kept and may be reused by clients
+        (default 3600)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CACHE_TTL = 3600.0
+
+
+def request_key(request: BaseModel, *versions: str) -> str:
+    """
+    Canonical hash of a validated request and the versions it depends on.
+
+    The request is dumped after validation, so defaults are filled in and
+    numbers are normalised (4000 and 4000.0 hash alike), and keys are
+    sorted, so field order and formatting of the original body do not
+    matter.
+
+    Args:
+        request: Validated request model
+        versions: Engine/table versions the response depends on
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    canonical = json.dumps(
+        {'request': request.model_dump(mode='json'), 'versions': list(versions)},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    """Strong ETag for a request key."""
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with expiry and hit/miss counters.
+
+    Args:
+        max_entries: Most entries kept; least recently used are evicted
+            first (0 disables caching)
+        ttl: Seconds an entry stays valid
+
+    Raises:
+        ValueError: If max_entries is negative or ttl is not positive
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        if max_entries < 0:
+            raise ValueError(f"Cache size cannot be negative, got {max_entries}")
+        if ttl <= 0:
+            raise ValueError(f"Cache TTL must be positive, got {ttl}")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        """Cache configured from AV_CACHE_SIZE and AV_CACHE_TTL."""
+        return cls(
+            max_entries=int(os.environ.get('AV_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+            ttl=float(os.environ.get('AV_CACHE_TTL', DEFAULT_CACHE_TTL)),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None on a miss or expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key, evicting the least recently used entries."""
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, hit/miss counters and hit rate."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
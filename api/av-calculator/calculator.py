@@ -5,160 +5,202 @@ Integrates with Agent 5's AV calculation engine.
 Converts API request models to calculation engine format.
 """
 
+import hashlib
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 # Add lib directory to path for imports
-lib_path = Path(__file__).parent.parent.parent / 'lib'
-sys.path.insert(0, str(lib_path))
+lib_path = str(Path(__file__).parent.parent.parent / 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
 
-from av_calculator import calculate_av, PlanDesign, get_continuance_table
-from av_calculator.models import ServiceParams, AVResult
+# Import only the modules a request needs; the package itself is lazy
+import av_calculator
+from av_calculator import __version__ as engine_package_version
+from av_calculator.calculator_v2 import calculate_av_combined_v2
+from av_calculator.constants import DEFAULT_PLAN_YEAR, METAL_TIERS
+from av_calculator.metrics import enable_metrics
+from av_calculator.models import PlanDesign, AVResult
+from av_calculator.continuance import get_continuance_table, get_registry, table_cache_stats, warm_start
+from av_calculator.vectorized import BatchResult, calculate_av_batch
 
-from .models import CalculateRequest
+from .cache import request_key
+from .models import BatchItemResult, CalculateRequest, ValidationError
 
+# Map the compiled table bundle now, during cold start, so the first
+# request does not pay for table loading
+warm_start()
 
-def calculate_av_from_request(request: CalculateRequest) -> AVResult:
+# Attach per-phase engine timings to every result, for /metrics; this also
+# runs in process pool workers, which import this module to solve
+enable_metrics()
+
+# Source files that determine results: the engine package, and this
+# module's conversion of requests to engine parameters
+ENGINE_SOURCE_FILES = tuple(sorted(Path(av_calculator.__file__).parent.glob('*.py'))) + (Path(__file__),)
+
+# Start of the engines' warning for a deductible/MOOP loop that did not converge
+CONVERGENCE_WARNING = "Convergence not achieved"
+
+
+@lru_cache(maxsize=None)
+def table_version() -> str:
     """
-    Calculate AV from API request.
+    Version of the default vintage's continuance tables.
 
-    Converts the API request model to the internal calculation engine format
-    and performs the AV calculation.
+    The compiled bundle's checksum when there is one, otherwise a hash of
+    the table JSON files.
+    """
+    registry = get_registry()
+    manifest = registry.manifest(DEFAULT_PLAN_YEAR)
+    if manifest is not None:
+        return manifest['checksum']
+
+    digest = hashlib.sha256()
+    for path in sorted(registry.vintage_dir(DEFAULT_PLAN_YEAR).glob('*.json')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_version(paths) -> str:
+    """Hash of the names and contents of source files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode())
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def engine_version() -> str:
+    """
+    Version of the engine results come from.
+
+    The package __version__ is not bumped when results change, so the
+    engine source is hashed too: any deploy that changes it gets new
+    cache keys and ETags.
+    """
+    return f"v2-{engine_package_version}-{source_version(ENGINE_SOURCE_FILES)[:16]}"
+
+
+def calculation_key(request: CalculateRequest) -> str:
+    """Cache key (and ETag) of a request's calculation result."""
+    return request_key(request, engine_version(), table_version())
+
+
+def _copay_service(copay: float, subject_to_deductible: bool = False) -> dict:
+    """Service override for a flat copay outside coinsurance."""
+    return {
+        'copay': copay,
+        'subject_to_deductible': subject_to_deductible,
+        'subject_to_coinsurance': False,  # Copay structure
+    }
+
+
+def plan_params_from_request(request: CalculateRequest) -> dict:
+    """
+    Convert an API request to engine plan parameters.
+
+    Single calculations and batches both solve these parameters, so the
+    scalar and vectorized engines see the same plan and agree exactly.
 
     Args:
         request: CalculateRequest from API
 
     Returns:
-        AVResult with calculated values
-
-    Raises:
-        ValueError: If parameters are invalid
-        RuntimeError: If calculation fails
+        plan_params dictionary as accepted by calculator_v2.calculate_av
+        and vectorized.calculate_av_batch
     """
     # Build service parameters dictionary
     service_params = {}
 
-    # Primary care
+    # Primary care, specialist and ER (default: not subject to deductible)
     if request.primary_care_copay > 0 or request.primary_care_std is not None:
-        service_params['PC'] = ServiceParams(
-            copay=request.primary_care_copay,
-            subject_to_deductible=(
-                request.primary_care_std
-                if request.primary_care_std is not None
-                else False  # Default: PC not subject to deductible
-            ),
-            subject_to_coinsurance=False,  # Copay structure
-        )
-
-    # Specialist
+        service_params['PC'] = _copay_service(request.primary_care_copay, bool(request.primary_care_std))
     if request.specialist_copay > 0 or request.specialist_std is not None:
-        service_params['SP'] = ServiceParams(
-            copay=request.specialist_copay,
-            subject_to_deductible=(
-                request.specialist_std
-                if request.specialist_std is not None
-                else False  # Default: Specialist not subject to deductible
-            ),
-            subject_to_coinsurance=False,
-        )
-
-    # Emergency room
+        service_params['SP'] = _copay_service(request.specialist_copay, bool(request.specialist_std))
     if request.er_copay > 0 or request.er_std is not None:
-        service_params['ER'] = ServiceParams(
-            copay=request.er_copay,
-            subject_to_deductible=(
-                request.er_std
-                if request.er_std is not None
-                else False  # Default: ER not subject to deductible
-            ),
-            subject_to_coinsurance=False,
-        )
+        service_params['ER'] = _copay_service(request.er_copay, bool(request.er_std))
 
-    # Inpatient hospital
+    # Inpatient hospital, lab work, imaging, physical therapy
     if request.inpatient_copay > 0:
-        service_params['IP'] = ServiceParams(
-            copay=request.inpatient_copay,
-            subject_to_deductible=False,
-            subject_to_coinsurance=False,
-        )
-
-    # Lab work
+        service_params['IP'] = _copay_service(request.inpatient_copay)
     if request.lab_work_copay > 0:
-        service_params['LAB'] = ServiceParams(
-            copay=request.lab_work_copay,
-            subject_to_deductible=False,
-            subject_to_coinsurance=False,
-        )
-
-    # Imaging
+        service_params['LAB'] = _copay_service(request.lab_work_copay)
     if request.imaging_copay > 0:
-        service_params['IMG'] = ServiceParams(
-            copay=request.imaging_copay,
-            subject_to_deductible=False,
-            subject_to_coinsurance=False,
-        )
-
-    # Physical therapy
+        service_params['IMG'] = _copay_service(request.imaging_copay)
     if request.physical_therapy_copay > 0:
-        service_params['ST'] = ServiceParams(
-            copay=request.physical_therapy_copay,
-            subject_to_deductible=False,
-            subject_to_coinsurance=False,
-        )
+        service_params['OT'] = _copay_service(request.physical_therapy_copay)
 
     # Prescription drugs
     drug_std = request.drugs_std if request.drugs_std is not None else False
-    drug_coins = request.drug_coinsurance if request.drug_coinsurance is not None else None
-
-    if request.generic_copay > 0 or drug_std:
-        service_params['RXGEN'] = ServiceParams(
-            copay=request.generic_copay,
-            coinsurance=drug_coins,
-            subject_to_deductible=drug_std,
-            subject_to_coinsurance=False,
-        )
-
-    if request.preferred_brand_copay > 0 or drug_std:
-        service_params['RXFORM'] = ServiceParams(
-            copay=request.preferred_brand_copay,
-            coinsurance=drug_coins,
-            subject_to_deductible=drug_std,
-            subject_to_coinsurance=False,
-        )
-
-    if request.non_preferred_copay > 0 or drug_std:
-        service_params['RXNONFORM'] = ServiceParams(
-            copay=request.non_preferred_copay,
-            coinsurance=drug_coins,
-            subject_to_deductible=drug_std,
-            subject_to_coinsurance=False,
-        )
+    drug_copays = [
+        ('GENRX', request.generic_copay),
+        ('PREFRX', request.preferred_brand_copay),
+        ('NONPREFRX', request.non_preferred_copay),
+    ]
+    for code, copay in drug_copays:
+        if copay > 0 or drug_std:
+            service_params[code] = _copay_service(copay, drug_std)
+            if request.drug_coinsurance is not None:
+                service_params[code]['coinsurance'] = request.drug_coinsurance
 
     if request.specialty_drug_copay > 0 or drug_std:
-        service_params['RXSPCLTY'] = ServiceParams(
-            copay=request.specialty_drug_copay,
-            coinsurance=drug_coins if drug_coins is not None else 1.0,  # Default: 100% member pays
-            subject_to_deductible=True,
-            subject_to_coinsurance=True,
-        )
+        service_params['SPECRX'] = {
+            'copay': request.specialty_drug_copay,
+            # Default: 100% member pays
+            'coinsurance': request.drug_coinsurance if request.drug_coinsurance is not None else 1.0,
+            'subject_to_deductible': True,
+            'subject_to_coinsurance': True,
+        }
 
     # Preventive care (always $0, not subject to deductible per ACA)
-    service_params['PREV'] = ServiceParams(
-        copay=0.0,
-        subject_to_deductible=False,
-        subject_to_coinsurance=False,
-    )
+    service_params['PV'] = _copay_service(0.0)
+
+    return {
+        'deductible': request.deductible_individual,
+        'moop': request.moop_individual,
+        'coinsurance': request.coinsurance_medical,
+        'metal_tier': request.metal_tier,
+        'family_deductible': request.deductible_family,
+        'family_moop': request.moop_family,
+        'hsa_contribution': request.hsa_contribution or 0.0,
+        'service_params': service_params,
+    }
+
+
+def calculate_av_from_request(request: CalculateRequest) -> AVResult:
+    """
+    Calculate AV from API request.
+
+    Converts the API request model to the internal calculation engine format
+    and performs the AV calculation.
+
+    Args:
+        request: CalculateRequest from API
+
+    Returns:
+        AVResult with calculated values
+
+    Raises:
+        ValueError: If parameters are invalid
+        RuntimeError: If calculation fails
+    """
+    params = plan_params_from_request(request)
 
     # Build PlanDesign object
     plan = PlanDesign(
-        deductible=request.deductible_individual,
-        moop=request.moop_individual,
-        coinsurance=request.coinsurance_medical,
-        metal_tier=request.metal_tier,
-        family_deductible=request.deductible_family,
-        family_moop=request.moop_family,
-        hsa_contribution=request.hsa_contribution,
-        service_params=service_params,
+        deductible=params['deductible'],
+        moop=params['moop'],
+        coinsurance=params['coinsurance'],
+        metal_tier=params['metal_tier'],
+        family_deductible=params['family_deductible'],
+        family_moop=params['family_moop'],
+        hsa_contribution=params['hsa_contribution'],
+        service_params=params['service_params'],
     )
 
     # Get appropriate continuance table
@@ -168,9 +210,113 @@ def calculate_av_from_request(request: CalculateRequest) -> AVResult:
     )
 
     # Calculate AV
-    result = calculate_av(plan, cont_table)
+    return calculate_av_combined_v2(plan, cont_table)
 
-    return result
+
+def calculate_batch_from_requests(requests: List[CalculateRequest]) -> BatchResult:
+    """
+    Calculate AV for many API requests in one vectorized solve.
+
+    Args:
+        requests: Validated CalculateRequests
+
+    Returns:
+        BatchResult with one lane per request, in order; lanes the engine
+        rejects carry their message in BatchResult.errors
+    """
+    return calculate_av_batch([plan_params_from_request(request) for request in requests])
+
+
+def solve_converged(warnings: List[str]) -> bool:
+    """Whether a solve converged, from the warnings it returned."""
+    return not any(warning.startswith(CONVERGENCE_WARNING) for warning in warnings)
+
+
+def result_details(result: AVResult) -> dict:
+    """Detailed breakdown of an AVResult, as returned by /calculate."""
+    return {
+        "plan_pays": result.total_plan_payment,
+        "member_pays": result.total_allowed_cost - result.total_plan_payment,
+        "total_expected_cost": result.total_allowed_cost,
+        "breakdown": {
+            "below_deductible": result.plan_pay_below_deduct,
+            "deductible_to_moop": result.plan_pay_deduct_to_moop,
+            "above_moop": result.plan_pay_above_moop,
+            "hsa_funding": result.plan_pay_hsa,
+        },
+        "adjusted_values": {
+            "deductible": result.adjusted_deductible,
+            "moop": result.adjusted_moop,
+        },
+        "performance": {
+            "iterations_outer": result.iterations_outer,
+            "iterations_inner": result.iterations_inner,
+        },
+    }
+
+
+def solve_batch_items(pending: List[Tuple[BatchItemResult, CalculateRequest]]) -> List[BatchItemResult]:
+    """
+    Calculate validated batch plans in one vectorized solve.
+
+    Fills each item's AV, metal tier and details; plans the engine rejects
+    are marked invalid with a CALCULATION_ERROR.
+
+    Args:
+        pending: (item, request) pairs of plans that passed validation
+
+    Returns:
+        The solved items, in order (the same objects, updated, unless this
+        ran in another process)
+    """
+    if not pending:
+        return []
+
+    solved = calculate_batch_from_requests([plan for _, plan in pending])
+    for lane, (item, _) in enumerate(pending):
+        if solved.errors[lane] is not None:
+            item.is_valid = False
+            item.errors = [ValidationError(
+                field="plan",
+                error="CALCULATION_ERROR",
+                message=solved.errors[lane],
+            )]
+            continue
+        result = solved.result(lane)
+        item.av_percentage = result.av_percent
+        item.metal_tier = result.metal_tier
+        item.details = result_details(result)
+        item.warnings = item.warnings + result.warnings
+
+    return [item for item, _ in pending]
+
+
+def warm_up(request: CalculateRequest) -> Dict[str, float]:
+    """
+    Load every tier's table and run the request once per tier.
+
+    Each tier goes through both the single-plan and the batch path, so
+    the first real request finds its table loaded and the code paths warm.
+
+    Args:
+        request: Plan to solve (its metal_tier is replaced per tier)
+
+    Returns:
+        AV percentage per metal tier, from the single-plan path
+
+    Raises:
+        FileNotFoundError: If a table is missing
+        ValueError: If the plan cannot be calculated
+    """
+    av_by_tier = {}
+    for metal_tier in METAL_TIERS:
+        tier_request = request.model_copy(update={'metal_tier': metal_tier})
+        get_continuance_table(metal_tier=metal_tier, table_type='combined')
+        av_by_tier[metal_tier] = calculate_av_from_request(tier_request).av_percent
+        batch = calculate_batch_from_requests([tier_request])
+        if batch.errors[0] is not None:
+            raise ValueError(batch.errors[0])
+    return av_by_tier
 
 
 def validate_calculation_inputs(request: CalculateRequest) -> None:
@@ -5,26 +5,71 @@ REST API endpoints for calculating Actuarial Values of health insurance plans.
 Integrates with Agent 5's calculation engine.
 """
 
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import ClientDisconnect
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from limits import parse as parse_rate_limit
+import asyncio
+import json
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 
 from .models import (
+    BatchItemResult,
+    BatchRequest,
+    BatchResponse,
+    ValidationError,
     CalculateRequest,
     CalculateResponse,
     ErrorResponse,
     HealthCheckResponse,
+    ReadyResponse,
+    SweepRequest,
+    SweepResponse,
+    TableListResponse,
+    TableResponse,
     ValidateResponse,
 )
-from .calculator import calculate_av_from_request
-from .validation import validate_plan_parameters
+from .cache import ResponseCache, etag_for, etag_matches
+from .calculator import (
+    calculate_av_from_request,
+    calculation_key,
+    result_details,
+    solve_batch_items,
+    solve_converged,
+    table_cache_stats,
+    warm_up,
+)
+from . import metrics
+from .metrics import PROMETHEUS_MEDIA_TYPE, MetricsExporter, record_solve
+from .responses import PrebuiltJSONResponse, dumps, model_json
+from .singleflight import SingleFlight
+from .streaming import NDJSON_MEDIA_TYPE, BodyStreamingResponse, ndjson_lines
+from .sweep import ARROW_MEDIA_TYPE, encode_surface, render_sweep_arrow, solve_sweep, sweep_formats
+from .tables import (
+    NPY_MEDIA_TYPE,
+    TABLE_FORMATS,
+    TABLE_MAX_AGE,
+    encode_body,
+    negotiate_encoding,
+    normalize_table_name,
+    render_json,
+    render_npy,
+    select_columns,
+    table_etag,
+    table_listing,
+    table_row_count,
+    table_slice,
+)
+from .validation import validate_batch_plan, validate_plan_parameters
+from .workers import SolvePool, SolvePoolFull
 
 # Configure logging
 logging.basicConfig(
@@ -33,9 +78,200 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# TEST-001: SLI-SBC-4000 parameters (used by /validate and the startup warm-up)
+TEST_001_PLAN = CalculateRequest(
+    deductible_individual=4000.0,
+    deductible_family=10000.0,
+    moop_individual=9100.0,
+    moop_family=18200.0,
+    coinsurance_medical=0.20,
+    primary_care_copay=45.0,
+    specialist_copay=45.0,
+    er_copay=350.0,
+    urgent_care_copay=0.0,
+    generic_copay=10.0,
+    preferred_brand_copay=50.0,
+    non_preferred_copay=75.0,
+    specialty_drug_copay=0.0,
+    lab_work_copay=30.0,
+    imaging_copay=0.0,
+    inpatient_copay=0.0,
+    metal_tier="Silver",
+)
+
+# CPU-bound solves run here, off the event loop (see workers.py); process
+# workers warm themselves up as they start
+solve_pool = SolvePool.from_env(initializer=warm_up, initargs=(TEST_001_PLAN,))
+
+
+async def run_warm_up(app: FastAPI) -> None:
+    """Warm up tables and solves on the pool, then mark the app ready."""
+    start_time = time.time()
+    try:
+        av_by_tier = await solve_pool.run(warm_up, TEST_001_PLAN)
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}", exc_info=True)
+        app.state.warm_up = {"error": str(e)}
+        return
+
+    duration_ms = (time.time() - start_time) * 1000
+    app.state.warm_up = {"av_by_tier": av_by_tier, "duration_ms": duration_ms}
+    app.state.ready = True
+    logger.info(f"Warm-up complete in {duration_ms:.2f}ms, ready")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up in the background at startup; stop solving at shutdown.
+
+    Liveness (/health) answers straight away, while readiness (/ready)
+    waits for the warm-up, so no traffic is routed to a cold worker.
+    """
+    app.state.ready = False
+    app.state.warm_up = None
+    warm_up_task = asyncio.create_task(run_warm_up(app))
+    publish_task = asyncio.create_task(publish_metrics())
+
+    yield
+
+    app.state.ready = False
+    warm_up_task.cancel()
+    publish_task.cancel()
+    solve_pool.shutdown(wait=False)
+    metrics_exporter.publish()
+
+
+# Calculation responses by canonical request hash (see cache.py)
+response_cache = ResponseCache.from_env()
+
+# Identical /calculate requests in flight share one solve (see singleflight.py)
+calculation_flights = SingleFlight()
+
+
+def collect_metrics() -> None:
+    """Copy solve pool, cache and table statistics into the metrics registry."""
+    pool = solve_pool.stats()
+    metrics.SOLVE_POOL_SOLVES.set(pool["running"], "running")
+    metrics.SOLVE_POOL_SOLVES.set(pool["queued"], "queued")
+    metrics.SOLVE_POOL_TOTAL.set(pool["completed"], "completed")
+    metrics.SOLVE_POOL_TOTAL.set(pool["rejected"], "rejected")
+
+    cache = response_cache.stats()
+    metrics.RESPONSE_CACHE_ENTRIES.set(cache["entries"])
+    metrics.RESPONSE_CACHE_LOOKUPS.set(cache["hits"], "hit")
+    metrics.RESPONSE_CACHE_LOOKUPS.set(cache["misses"], "miss")
+    metrics.RESPONSE_CACHE_REMOVALS.set(cache["evictions"], "eviction")
+    metrics.RESPONSE_CACHE_REMOVALS.set(cache["expirations"], "expiration")
+
+    flights = calculation_flights.stats()
+    metrics.COALESCED_REQUESTS.set(flights["computations"], "leader")
+    metrics.COALESCED_REQUESTS.set(flights["coalesced"], "coalesced")
+
+    tables = table_cache_stats()
+    metrics.TABLE_CACHE_ENTRIES.set(tables["tables_loaded"], "base")
+    metrics.TABLE_CACHE_ENTRIES.set(tables["adjusted_views"], "adjusted")
+    metrics.TABLE_CACHE_EVENTS.set(tables["hits"], "hit")
+    metrics.TABLE_CACHE_EVENTS.set(tables["misses"], "miss")
+    metrics.TABLE_CACHE_EVENTS.set(tables["evictions"], "eviction")
+
+
+metrics.REGISTRY.add_collector(collect_metrics)
+
+# Serves /metrics, merged across uvicorn workers (see metrics.py)
+metrics_exporter = MetricsExporter.from_env(metrics.REGISTRY)
+
+
+async def publish_metrics() -> None:
+    """Publish this worker's metrics snapshot for the other workers, periodically."""
+    if metrics_exporter.directory is None:
+        return
+    while True:
+        try:
+            metrics_exporter.publish()
+        except OSError as e:
+            logger.warning(f"Could not publish metrics: {str(e)}")
+        await asyncio.sleep(metrics_exporter.interval)
+
+
+def record_scalar_solve(result) -> None:
+    """Record a single-plan solve's iterations, convergence and phase timings."""
+    record_solve(
+        "scalar",
+        result.iterations_outer,
+        result.iterations_inner,
+        solve_converged(result.warnings),
+        result.timings.phase_ns if result.timings is not None else None,
+    )
+
+
+def record_batch_solves(items: List[BatchItemResult]) -> None:
+    """Record the iterations and convergence of solved batch plans."""
+    for item in items:
+        if item.is_valid and item.details:
+            performance = item.details["performance"]
+            record_solve(
+                "vectorized",
+                performance["iterations_outer"],
+                performance["iterations_inner"],
+                solve_converged(item.warnings),
+            )
+
+
+async def solve_and_cache(plan: CalculateRequest, key: str, start_time: float) -> bytes:
+    """
+    Solve a validated plan and cache the response body under key.
+
+    Args:
+        plan: Validated plan
+        key: Canonical request key (see calculation_key)
+        start_time: When the request was received, for calculation_time_ms
+
+    Returns:
+        CalculateResponse JSON body
+    """
+    result = await solve_pool.run(calculate_av_from_request, plan)
+    record_scalar_solve(result)
+
+    calculation_time_ms = (time.time() - start_time) * 1000
+
+    logger.info(
+        f"AV calculated: {result.av_percent:.2f}% "
+        f"({result.metal_tier}) in {calculation_time_ms:.2f}ms"
+    )
+
+    # Engine output needs no validation; serialize it once, for every
+    # request that shares or later reuses this result
+    body = model_json(CalculateResponse.model_construct(
+        success=True,
+        av_percentage=result.av_percent,
+        metal_tier=result.metal_tier,
+        calculation_time_ms=calculation_time_ms,
+        details=result_details(result),
+        warnings=result.warnings if result.warnings else None,
+    ))
+    response_cache.put(key, body)
+    return body
+
+
+def record_sweep_solves(sweep) -> None:
+    """Record the iterations and convergence of a sweep's solved cells."""
+    for outer, inner, converged in zip(sweep.iterations_outer, sweep.iterations_inner, sweep.converged):
+        record_solve("vectorized", int(outer), int(inner), bool(converged))
+
+
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+# Batches are limited by plans calculated rather than by requests
+BATCH_PLAN_RATE_LIMIT = "2000/minute"
+
+# Sweeps are limited by grid cells; a full-size sweep must fit the window
+SWEEP_CELL_RATE_LIMIT = "20000/minute"
+
+# Most plans a streaming batch solves at once
+STREAM_CHUNK_SIZE = 500
+
 # Create FastAPI app
 app = FastAPI(
     title="AV Calculator API",
@@ -43,6 +279,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/av-calculator/docs",
     openapi_url="/api/av-calculator/openapi.json",
+    lifespan=lifespan,
 )
 
 # Add rate limiting
@@ -67,13 +304,22 @@ app.add_middleware(
 # Middleware for logging
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all API requests with timing."""
+    """Log all API requests with timing, and record their latency."""
     start_time = time.time()
 
     response = await call_next(request)
 
     duration = (time.time() - start_time) * 1000  # Convert to milliseconds
 
+    # Label by route template, not path, to keep label values bounded
+    route = request.scope.get("route")
+    metrics.REQUEST_LATENCY.observe(
+        duration / 1000,
+        request.method,
+        route.path if route is not None else "unmatched",
+        response.status_code,
+    )
+
     logger.info(
         f"{request.method} {request.url.path} - "
         f"Status: {response.status_code} - "
@@ -83,6 +329,51 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+def charge_rate_limit(request: Request, rate_limit: str, scope: str, cost: int) -> None:
+    """
+    Count cost hits against a client's rate limit for scope.
+
+    Used where one request does a variable amount of work, so the limit is
+    counted in units of work (plans, grid cells) instead of requests.
+
+    Args:
+        request: Incoming request (client address is the limit key)
+        rate_limit: Limit string, e.g. "2000/minute"
+        scope: Name of the shared limit
+        cost: Hits this request counts for
+
+    Raises:
+        HTTPException: 413 if cost exceeds the whole limit, so the request
+            could never succeed; 429 with Retry-After if the limit is exceeded
+    """
+    if not limiter.enabled:
+        return
+
+    item = parse_rate_limit(rate_limit)
+    if cost > item.amount:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "success": False,
+                "error": "REQUEST_TOO_LARGE",
+                "message": f"Request counts for {cost}, more than the whole rate limit of {rate_limit} ({scope})",
+            },
+        )
+
+    key = get_remote_address(request)
+    if not limiter.limiter.hit(item, scope, key, cost=cost):
+        reset_time, _ = limiter.limiter.get_window_stats(item, scope, key)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "success": False,
+                "error": "RATE_LIMIT_EXCEEDED",
+                "message": f"Rate limit exceeded: {rate_limit} ({scope}), {cost} requested",
+            },
+            headers={"Retry-After": str(max(int(reset_time - time.time()), 1))},
+        )
+
+
 # Health check endpoint
 @app.get(
     "/api/av-calculator/health",
@@ -93,13 +384,74 @@ async def health_check():
     """
     Health check endpoint.
 
-    Returns API status and current timestamp.
+    Returns API status, current timestamp, solve pool queue depth and wait
+    times, and response cache hit rates. Never waits on a solve.
     """
     return HealthCheckResponse(
         status="healthy",
         timestamp=datetime.utcnow().isoformat(),
         version="1.0.0",
+        solve_pool=solve_pool.stats(),
+        response_cache=response_cache.stats(),
+        coalescing=calculation_flights.stats(),
+    )
+
+
+# Prometheus metrics endpoint
+@app.get(
+    "/api/av-calculator/metrics",
+    response_class=Response,
+    responses={200: {"content": {PROMETHEUS_MEDIA_TYPE: {}}}},
+    tags=["Health"],
+)
+async def prometheus_metrics():
+    """
+    Metrics in Prometheus text format.
+
+    Request latency by route and status, engine phase timings, convergence
+    iterations and failures, response/table cache and coalescing counts,
+    and solve pool queue depth. With AV_METRICS_DIR set, covers every
+    uvicorn worker, not just the one answering.
+    """
+    return Response(content=metrics_exporter.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+# Readiness endpoint
+@app.get(
+    "/api/av-calculator/ready",
+    response_model=ReadyResponse,
+    responses={503: {"model": ReadyResponse}},
+    tags=["Health"],
+)
+async def readiness_check(request: Request):
+    """
+    Readiness check endpoint.
+
+    Returns 200 once startup has loaded the continuance tables and solved
+    TEST-001 for every metal tier, and 503 while warming up, after a failed
+    warm-up, or while shutting down. Use /health for liveness.
+    """
+    ready = getattr(request.app.state, "ready", False)
+    warm_up_state = getattr(request.app.state, "warm_up", None)
+    if ready:
+        state = "ready"
+    elif warm_up_state and "error" in warm_up_state:
+        state = "failed"
+    else:
+        state = "starting"
+
+    response = ReadyResponse(
+        ready=ready,
+        status=state,
+        timestamp=datetime.utcnow().isoformat(),
+        warm_up=warm_up_state,
     )
+    if not ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=response.model_dump(),
+        )
+    return response
 
 
 # Main calculation endpoint
@@ -123,6 +475,13 @@ async def calculate_av(request: Request, plan: CalculateRequest):
 
     **Rate Limit:** 100 requests per minute per IP address
 
+    **Caching:** Responses carry an `ETag` derived from the validated plan and
+    the engine and table versions, plus `Cache-Control`. A matching
+    `If-None-Match` gets 304 without a calculation, and repeated plans are
+    served from cache (`X-Cache: HIT`, with the original calculation time).
+    Identical requests arriving while the plan is being solved wait for that
+    solve and share its result or error (`X-Cache: COALESCED`).
+
     **Parameters:**
     - deductible_individual: Individual deductible ($0-$15,000)
     - deductible_family: Family deductible ($0-$30,000)
@@ -165,55 +524,311 @@ async def calculate_av(request: Request, plan: CalculateRequest):
                 }
             )
 
-        # Calculate AV
-        result = calculate_av_from_request(plan)
+        # Identical requests get identical results: revalidate or reuse
+        key = calculation_key(plan)
+        cache_headers = {
+            "ETag": etag_for(key),
+            "Cache-Control": f"public, max-age={int(response_cache.ttl)}",
+        }
+        if etag_matches(request.headers.get("if-none-match"), cache_headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return PrebuiltJSONResponse(content=cached, headers={**cache_headers, "X-Cache": "HIT"})
+
+        # Calculate AV, once for all concurrent requests for this plan
+        body, shared = await calculation_flights.run(
+            key, lambda: solve_and_cache(plan, key, start_time)
+        )
+        x_cache = "COALESCED" if shared else "MISS"
+        return PrebuiltJSONResponse(content=body, headers={**cache_headers, "X-Cache": x_cache})
+
+    except (HTTPException, SolvePoolFull):
+        raise
+    except Exception as e:
+        logger.error(f"Calculation error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "success": False,
+                "error": "CALCULATION_ERROR",
+                "message": f"Failed to calculate AV: {str(e)}",
+            }
+        )
+
+
+# Batch calculation endpoint
+@app.post(
+    "/api/av-calculator/batch",
+    response_model=BatchResponse,
+    responses={
+        422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    tags=["Calculator"],
+)
+async def calculate_batch(request: Request, batch: BatchRequest):
+    """
+    Calculate Actuarial Values for many plans in one request.
+
+    Every plan is validated on its own; valid plans are solved together in
+    one vectorized engine call, which is much faster per plan than separate
+    /calculate requests. Results come back in request order, and invalid
+    plans get `is_valid: false` with their errors instead of failing the batch.
+
+    **Rate Limit:** 2000 plans per minute per IP address (each plan counts)
+
+    **Returns:**
+    - results: One entry per plan with av_percentage, metal_tier and details
+      (as in /calculate) or errors
+    - valid_count / invalid_count: Plans calculated / rejected
+    - calculation_time_ms: Time taken for the whole batch
+    """
+    charge_rate_limit(request, BATCH_PLAN_RATE_LIMIT, "batch", len(batch.plans))
+
+    try:
+        start_time = time.time()
+
+        # Validate each plan; only valid ones go to the engine
+        results: List[BatchItemResult] = []
+        pending = []
+        for index, raw_plan in enumerate(batch.plans):
+            item, plan = validate_batch_plan(index, raw_plan)
+            results.append(item)
+            if plan is not None:
+                pending.append((item, plan))
+
+        # Solve all valid plans at once
+        solved = await solve_pool.run(solve_batch_items, pending)
+        record_batch_solves(solved)
+        for item in solved:
+            results[item.index] = item
 
         calculation_time_ms = (time.time() - start_time) * 1000
+        valid_count = sum(item.is_valid for item in results)
 
         logger.info(
-            f"AV calculated: {result.av_percent:.2f}% "
-            f"({result.metal_tier}) in {calculation_time_ms:.2f}ms"
+            f"Batch calculated: {valid_count}/{len(results)} plans "
+            f"in {calculation_time_ms:.2f}ms"
         )
 
-        # Build response
-        response = CalculateResponse(
-            success=True,
-            av_percentage=result.av_percent,
-            metal_tier=result.metal_tier,
+        return PrebuiltJSONResponse(BatchResponse.model_construct(
+            success=valid_count == len(results),
+            results=results,
+            valid_count=valid_count,
+            invalid_count=len(results) - valid_count,
             calculation_time_ms=calculation_time_ms,
-            details={
-                "plan_pays": result.total_plan_payment,
-                "member_pays": result.total_allowed_cost - result.total_plan_payment,
-                "total_expected_cost": result.total_allowed_cost,
-                "breakdown": {
-                    "below_deductible": result.plan_pay_below_deduct,
-                    "deductible_to_moop": result.plan_pay_deduct_to_moop,
-                    "above_moop": result.plan_pay_above_moop,
-                },
-                "adjusted_values": {
-                    "deductible": result.adjusted_deductible,
-                    "moop": result.adjusted_moop,
-                },
-                "performance": {
-                    "iterations_outer": result.iterations_outer,
-                    "iterations_inner": result.iterations_inner,
-                },
-            },
-            warnings=result.warnings if result.warnings else None,
+        ))
+
+    except SolvePoolFull:
+        raise
+    except Exception as e:
+        logger.error(f"Batch calculation error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "success": False,
+                "error": "CALCULATION_ERROR",
+                "message": f"Failed to calculate batch: {str(e)}",
+            }
         )
 
-        return response
 
-    except HTTPException:
+# Streaming batch calculation endpoint
+@app.post(
+    "/api/av-calculator/batch/stream",
+    response_class=BodyStreamingResponse,
+    responses={
+        200: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": "One BatchItemResult per line, in request order",
+        },
+    },
+    tags=["Calculator"],
+)
+async def calculate_batch_stream(request: Request):
+    """
+    Calculate Actuarial Values for a stream of plans.
+
+    The request body is NDJSON: one plan per line in /calculate format.
+    Plans are parsed as the body arrives and solved in chunks of up to
+    500 with the vectorized engine; each chunk's results are streamed back
+    straight away as NDJSON lines, in the /batch item format and in request
+    order. Memory use is bounded by the chunk size, whatever the upload
+    size, and a client can stop reading at any point.
+
+    Invalid lines get `is_valid: false` with their errors. If the rate
+    limit runs out mid-stream, a final line with `error:
+    RATE_LIMIT_EXCEEDED` gives the index of the first plan not calculated
+    and the stream ends.
+
+    **Rate Limit:** Shared with /batch; each plan counts
+    """
+    async def results():
+        index = 0
+        valid_count = 0
+        start_time = time.time()
+        items: List[BatchItemResult] = []
+        pending = []
+
+        async def flush() -> bytes:
+            nonlocal valid_count
+            charge_rate_limit(request, BATCH_PLAN_RATE_LIMIT, "batch", len(items))
+            if pending:
+                first = items[0].index
+                solved = await solve_pool.run(solve_batch_items, pending)
+                record_batch_solves(solved)
+                for item in solved:
+                    items[item.index - first] = item
+            valid_count += sum(item.is_valid for item in items)
+            lines = b"".join(model_json(item) + b"\n" for item in items)
+            items.clear()
+            pending.clear()
+            return lines
+
+        try:
+            async for lines in ndjson_lines(request.stream()):
+                for line in lines:
+                    try:
+                        item, plan = validate_batch_plan(index, json.loads(line))
+                    except ValueError as e:
+                        item, plan = BatchItemResult(
+                            index=index,
+                            is_valid=False,
+                            errors=[ValidationError(field="plan", error="INVALID_JSON", message=str(e))],
+                        ), None
+                    items.append(item)
+                    if plan is not None:
+                        pending.append((item, plan))
+                    index += 1
+                    if len(items) >= STREAM_CHUNK_SIZE:
+                        yield await flush()
+                # Solve whatever has arrived before waiting for more
+                if items:
+                    yield await flush()
+            if items:
+                yield await flush()
+
+        except HTTPException as e:
+            yield json.dumps({**e.detail, "index": index - len(items)}) + "\n"
+        except SolvePoolFull as e:
+            yield json.dumps({
+                "success": False,
+                "error": "SERVICE_OVERLOADED",
+                "message": str(e),
+                "retry_after": e.retry_after,
+                "index": index - len(items),
+            }) + "\n"
+        except ValueError as e:
+            yield json.dumps({
+                "success": False,
+                "error": "INVALID_INPUT",
+                "message": str(e),
+                "index": index - len(items),
+            }) + "\n"
+        except ClientDisconnect:
+            logger.info(f"Streaming batch cancelled by client after {index} plans")
+            return
+
+        logger.info(
+            f"Streaming batch calculated: {valid_count}/{index} plans "
+            f"in {(time.time() - start_time) * 1000:.2f}ms"
+        )
+
+    return BodyStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
+
+
+# Parameter sweep endpoint
+@app.post(
+    "/api/av-calculator/sweep",
+    response_model=SweepResponse,
+    responses={
+        200: {"content": {NPY_MEDIA_TYPE: {}, ARROW_MEDIA_TYPE: {}}},
+        413: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+    tags=["Calculator"],
+)
+async def calculate_sweep(request: Request, sweep: SweepRequest):
+    """
+    Calculate the AV surface of a plan over a grid of parameter values.
+
+    The base plan is solved once per cell of the cartesian product of up to
+    3 axes (at most 10,000 cells), all in one vectorized engine call. Each
+    cell is validated like a /batch plan; cells that fail get NaN.
+
+    **Formats:**
+    - `json`: shape, axes and the surface as base64 of little-endian
+      float32 values in C order (last axis fastest)
+    - `npy`: the float32 NumPy array; axis fields are in the `X-Sweep-Axes`
+      header (JSON array), in dimension order, and the values are those
+      of the request
+    - `arrow` (when pyarrow is installed): an Arrow IPC stream with one
+      column per axis plus `av_percentage`, one row per cell in C order
+
+    **Rate Limit:** 20000 cells per minute per IP address (each cell counts)
+    """
+    formats = sweep_formats()
+    if sweep.format not in formats:
+        raise ValueError(f"Format must be one of {formats}, got {sweep.format!r}")
+
+    axes = [(axis.field, axis.values) for axis in sweep.axes]
+    cells = 1
+    for _, values in axes:
+        cells *= len(values)
+    charge_rate_limit(request, SWEEP_CELL_RATE_LIMIT, "sweep", cells)
+
+    try:
+        start_time = time.time()
+
+        result = await solve_pool.run(solve_sweep, sweep.base_plan, axes)
+        record_sweep_solves(result)
+
+        calculation_time_ms = (time.time() - start_time) * 1000
+
+        logger.info(
+            f"Sweep calculated: {result.valid_count}/{cells} cells "
+            f"of {list(result.av.shape)} in {calculation_time_ms:.2f}ms"
+        )
+
+        headers = {
+            "X-Sweep-Axes": json.dumps([field for field, _ in axes]),
+            "X-Invalid-Count": str(result.invalid_count),
+        }
+        if sweep.format == "npy":
+            return Response(content=render_npy(result.av), media_type=NPY_MEDIA_TYPE, headers=headers)
+        if sweep.format == "arrow":
+            return Response(
+                content=render_sweep_arrow(axes, result.av),
+                media_type=ARROW_MEDIA_TYPE,
+                headers=headers,
+            )
+
+        return PrebuiltJSONResponse(SweepResponse.model_construct(
+            success=result.invalid_count == 0,
+            axes=sweep.axes,
+            shape=list(result.av.shape),
+            dtype="float32",
+            data=encode_surface(result.av),
+            valid_count=result.valid_count,
+            invalid_count=result.invalid_count,
+            errors=result.errors,
+            calculation_time_ms=calculation_time_ms,
+        ))
+
+    except SolvePoolFull:
         raise
     except Exception as e:
-        logger.error(f"Calculation error: {str(e)}", exc_info=True)
+        logger.error(f"Sweep calculation error: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
                 "success": False,
                 "error": "CALCULATION_ERROR",
-                "message": f"Failed to calculate AV: {str(e)}",
+                "message": f"Failed to calculate sweep: {str(e)}",
             }
         )
 
@@ -239,30 +854,12 @@ async def validate_with_test_001(request: Request):
     Use this endpoint to verify the calculator is working correctly.
     """
     try:
-        # TEST-001: SLI-SBC-4000 parameters
-        test_plan = CalculateRequest(
-            deductible_individual=4000.0,
-            deductible_family=10000.0,
-            moop_individual=9100.0,
-            moop_family=18200.0,
-            coinsurance_medical=0.20,
-            primary_care_copay=45.0,
-            specialist_copay=45.0,
-            er_copay=350.0,
-            urgent_care_copay=0.0,
-            generic_copay=10.0,
-            preferred_brand_copay=50.0,
-            non_preferred_copay=75.0,
-            specialty_drug_copay=0.0,
-            lab_work_copay=30.0,
-            imaging_copay=0.0,
-            inpatient_copay=0.0,
-            metal_tier="Silver",
-        )
+        test_plan = TEST_001_PLAN
 
         # Calculate
         start_time = time.time()
-        result = calculate_av_from_request(test_plan)
+        result = await solve_pool.run(calculate_av_from_request, test_plan)
+        record_scalar_solve(result)
         calculation_time_ms = (time.time() - start_time) * 1000
 
         # Check result
@@ -298,6 +895,8 @@ async def validate_with_test_001(request: Request):
 
         return response
 
+    except SolvePoolFull:
+        raise
     except Exception as e:
         logger.error(f"Validation error: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -310,6 +909,135 @@ async def validate_with_test_001(request: Request):
         )
 
 
+def send_table(
+    request: Request,
+    etag: str,
+    render: Callable[[], bytes],
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Conditional, content-negotiated response for table data.
+
+    The body is only rendered when the client's If-None-Match does not
+    already match; each content coding gets its own strong ETag.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding:
+        etag = f'{etag[:-1]}-{encoding}"'
+    headers = {
+        **(headers or {}),
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={TABLE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=encode_body(render(), encoding), media_type=media_type, headers=headers)
+
+
+# Continuance table endpoints
+@app.get(
+    "/api/av-calculator/tables",
+    response_model=TableListResponse,
+    tags=["Tables"],
+)
+@limiter.limit("100/minute")
+async def list_continuance_tables(request: Request):
+    """
+    List the continuance tables the calculator uses.
+
+    Returns every metal tier and table type (med, rx, combined) with its row
+    count and column names, plus the table bundle checksum (`version`).
+    Supports `If-None-Match` and gzip/br compression.
+    """
+    return send_table(
+        request,
+        table_etag("tables"),
+        lambda: dumps(table_listing()),
+        "application/json",
+    )
+
+
+@app.get(
+    "/api/av-calculator/tables/{metal_tier}/{table_type}",
+    response_model=TableResponse,
+    responses={
+        200: {"content": {NPY_MEDIA_TYPE: {}}},
+        404: {"model": ErrorResponse},
+    },
+    tags=["Tables"],
+)
+@limiter.limit("100/minute")
+async def get_continuance_table_data(
+    request: Request,
+    metal_tier: str,
+    table_type: str,
+    columns: Optional[str] = Query(
+        None, description="Comma-separated column names (default: all columns)"
+    ),
+    start: int = Query(0, ge=0, description="First row to return"),
+    stop: Optional[int] = Query(None, ge=0, description="Row to stop before (default: end of table)"),
+    format: str = Query("json", description=f"Response format: {', '.join(TABLE_FORMATS)}"),
+):
+    """
+    Get rows of one continuance table, e.g. `/tables/silver/combined`.
+
+    **Formats:**
+    - `json`: column names plus one array of values per row
+    - `npy`: a float64 NumPy array of shape (columns, rows), one row per
+      selected column; column names and row range are in the
+      `X-Table-Columns` (JSON array), `X-Row-Start` and `X-Total-Rows` headers
+
+    Responses carry a strong `ETag` derived from the table bundle checksum
+    and the selection, so `If-None-Match` returns 304 until the tables
+    change. gzip and br (when brotli is installed) are negotiated from
+    `Accept-Encoding`.
+    """
+    try:
+        tier, kind = normalize_table_name(metal_tier, table_type)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "success": False,
+                "error": "TABLE_NOT_FOUND",
+                "message": str(e.args[0]),
+            }
+        )
+    if format not in TABLE_FORMATS:
+        raise ValueError(f"Format must be one of {TABLE_FORMATS}, got {format!r}")
+
+    selected = select_columns(tier, kind, columns)
+    etag = table_etag("table", tier, kind, selected, start, stop, format)
+    total_rows = table_row_count(tier, kind)
+
+    if format == "npy":
+        headers = {
+            "X-Table-Columns": json.dumps(selected),
+            "X-Row-Start": str(start),
+            "X-Total-Rows": str(total_rows),
+        }
+        return send_table(
+            request,
+            etag,
+            lambda: render_npy(table_slice(tier, kind, selected, start, stop)),
+            NPY_MEDIA_TYPE,
+            headers,
+        )
+
+    return send_table(
+        request,
+        etag,
+        lambda: render_json(tier, kind, selected, table_slice(tier, kind, selected, start, stop),
+                            start, total_rows),
+        "application/json",
+    )
+
+
 # Error handler for validation errors
 @app.exception_handler(ValueError)
 async def value_error_handler(request: Request, exc: ValueError):
@@ -325,6 +1053,22 @@ async def value_error_handler(request: Request, exc: ValueError):
     )
 
 
+# Load shedding when the solve queue is full
+@app.exception_handler(SolvePoolFull)
+async def solve_pool_full_handler(request: Request, exc: SolvePoolFull):
+    """Refuse the request with 503 until the solve queue drains."""
+    logger.warning(f"Solve queue full, shedding {request.url.path}: {solve_pool.stats()}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "success": False,
+            "error": "SERVICE_OVERLOADED",
+            "message": str(exc),
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -334,6 +1078,7 @@ async def root():
         "version": "1.0.0",
         "docs": "/api/av-calculator/docs",
         "health": "/api/av-calculator/health",
+        "tables": "/api/av-calculator/tables",
     }
 
 
@@ -0,0 +1,402 @@
+"""
+Prometheus Metrics
+
+Low-overhead in-process collectors (counters, gauges, histograms) and their
+Prometheus text exposition, with no client library dependency. Recording is
+a dict update under a lock; everything else happens at scrape time.
+
+Several uvicorn workers are separate processes, each with its own
+collectors. When AV_METRICS_DIR is set, every worker periodically writes a
+snapshot of its collectors to that directory, and /metrics on any worker
+merges the snapshots of all workers: counters and histograms are summed
+(including those of workers that have exited, so totals never go
+backwards), gauges only over workers whose snapshot is recent. Clear the
+directory when the server starts.
+
+Configuration (environment):
+    AV_METRICS_DIR: Directory shared by the workers (default: unset, this
+        process only)
+    AV_METRICS_INTERVAL: Seconds between snapshots (default 5)
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_SNAPSHOT_INTERVAL = 5.0
+
+# Request and phase durations, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Convergence loop iterations per solve. calculator_v2's MAX_ITERATIONS is
+# 500 and a capped loop stops at 501, so only capped solves land in +Inf
+ITERATION_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 500)
+
+
+class _Metric:
+    """Base for metric families: one value per tuple of label values."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def set(self, value: float, *labels: object) -> None:
+        """Set the value for labels (for counters: a total kept elsewhere)."""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def snapshot(self) -> dict:
+        """Serializable copy of the family and its samples."""
+        with self._lock:
+            samples = {json.dumps(key): value for key, value in self._values.items()}
+        return {
+            'type': self.kind,
+            'help': self.documentation,
+            'labels': list(self.labelnames),
+            'samples': samples,
+        }
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+
+    kind = 'counter'
+
+    def inc(self, *labels: object, amount: float = 1.0) -> None:
+        """Add amount to the total for labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Current value per label set."""
+
+    kind = 'gauge'
+
+
+class Histogram(_Metric):
+    """
+    Distribution per label set over fixed bucket upper bounds.
+
+    Samples are stored as per-bucket counts (non-cumulative, with a final
+    overflow bucket) followed by the sum and the count.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: object) -> None:
+        """Record one observation for labels."""
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {json.dumps(key): list(value) for key, value in self._values.items()}
+        return {
+            'type': self.kind,
+            'help': self.documentation,
+            'labels': list(self.labelnames),
+            'buckets': list(self.buckets),
+            'samples': samples,
+        }
+
+
+class MetricsRegistry:
+    """
+    Named metric families plus collectors that sample other state at scrape time.
+
+    Collectors are callables run before each snapshot, typically to copy
+    statistics kept elsewhere (cache, worker pool) into gauges and counters.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run collector before every snapshot."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """All families of this process, after running the collectors."""
+        for collector in self._collectors:
+            collector()
+        return {
+            'pid': os.getpid(),
+            'time': time.time(),
+            'metrics': {name: metric.snapshot() for name, metric in self._metrics.items()},
+        }
+
+
+def write_snapshot(directory: Path, snapshot: dict) -> None:
+    """Atomically write a worker's snapshot to directory."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"metrics-{snapshot['pid']}.json"
+    partial = path.with_suffix('.tmp')
+    partial.write_text(json.dumps(snapshot, separators=(',', ':')))
+    os.replace(partial, path)
+
+
+def read_snapshots(directory: Path, exclude_pid: Optional[int] = None) -> List[dict]:
+    """Snapshots written by the workers, except exclude_pid's; unreadable files are skipped."""
+    snapshots = []
+    for path in sorted(Path(directory).glob('metrics-*.json')):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if snapshot.get('pid') != exclude_pid:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def merge_snapshots(snapshots: List[dict], max_age: Optional[float] = None) -> Dict[str, dict]:
+    """
+    Combine worker snapshots into one set of families.
+
+    Counters and histograms are summed over all snapshots; gauges only over
+    snapshots taken within max_age seconds (all when max_age is None).
+    """
+    now = time.time()
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        live = max_age is None or now - snapshot['time'] <= max_age
+        for name, family in snapshot['metrics'].items():
+            if family['type'] == 'gauge' and not live:
+                continue
+            target = merged.setdefault(name, {**family, 'samples': {}})
+            for key, value in family['samples'].items():
+                if key not in target['samples']:
+                    target['samples'][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target['samples'][key] = [a + b for a, b in zip(target['samples'][key], value)]
+                else:
+                    target['samples'][key] += value
+    return merged
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_prometheus(families: Dict[str, dict]) -> str:
+    """Prometheus text exposition (format 0.0.4) of merged families."""
+    lines = []
+    for name, family in families.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key in sorted(family['samples']):
+            values = json.loads(key)
+            sample = family['samples'][key]
+            if family['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(family['labels'], values)} {_format_value(sample)}")
+                continue
+
+            cumulative = 0
+            bounds = list(family['buckets']) + [math.inf]
+            for bound, count in zip(bounds, sample):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{name}_bucket{_format_labels(family['labels'], values, le)} {cumulative}")
+            labels = _format_labels(family['labels'], values)
+            lines.append(f"{name}_sum{labels} {_format_value(sample[-2])}")
+            lines.append(f"{name}_count{labels} {sample[-1]}")
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """
+    Publishes this worker's snapshot and renders /metrics for all workers.
+
+    Args:
+        registry: This process's metrics
+        directory: Directory shared by the workers, or None for this
+            process only
+        interval: Seconds between published snapshots
+
+    Raises:
+        ValueError: If interval is not positive
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Optional[Path] = None,
+                 interval: float = DEFAULT_SNAPSHOT_INTERVAL):
+        if interval <= 0:
+            raise ValueError(f"Snapshot interval must be positive, got {interval}")
+        self.registry = registry
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+
+    @classmethod
+    def from_env(cls, registry: MetricsRegistry) -> 'MetricsExporter':
+        """Exporter configured from AV_METRICS_DIR and AV_METRICS_INTERVAL."""
+        return cls(
+            registry,
+            directory=os.environ.get('AV_METRICS_DIR') or None,
+            interval=float(os.environ.get('AV_METRICS_INTERVAL', DEFAULT_SNAPSHOT_INTERVAL)),
+        )
+
+    def publish(self) -> None:
+        """Write this worker's snapshot to the shared directory, if any."""
+        if self.directory is not None:
+            write_snapshot(self.directory, self.registry.snapshot())
+
+    def render(self) -> str:
+        """Prometheus text for this worker merged with the other workers' snapshots."""
+        snapshots = [self.registry.snapshot()]
+        if self.directory is not None and self.directory.exists():
+            snapshots += read_snapshots(self.directory, exclude_pid=os.getpid())
+        return render_prometheus(merge_snapshots(snapshots, max_age=3 * self.interval))
+
+
+# Process-wide registry and the API's metric families
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'av_http_request_duration_seconds',
+    'HTTP request latency by method, route template and status code',
+    ('method', 'route', 'status'),
+)
+SOLVE_PHASES = REGISTRY.histogram(
+    'av_solve_phase_seconds',
+    'Engine time per phase of single-plan solves',
+    ('phase',),
+    PHASE_BUCKETS,
+)
+SOLVE_ITERATIONS = REGISTRY.histogram(
+    'av_solve_iterations',
+    'Convergence loop iterations per solved plan (outer: deductible/MOOP, inner: coinsurance)',
+    ('engine', 'loop'),
+    ITERATION_BUCKETS,
+)
+CONVERGENCE_FAILURES = REGISTRY.counter(
+    'av_solve_convergence_failures_total',
+    'Solved plans whose deductible/MOOP loop did not converge',
+    ('engine',),
+)
+
+
+def record_solve(engine: str, iterations_outer: int, iterations_inner: int, converged: bool,
+                 phase_ns: Optional[Dict[str, int]] = None) -> None:
+    """
+    Record one solved plan.
+
+    Args:
+        engine: 'scalar' or 'vectorized'
+        iterations_outer: Deductible/MOOP loop iterations
+        iterations_inner: Coinsurance loop iterations per outer iteration
+        converged: Whether the outer loop converged
+        phase_ns: Nanoseconds per engine phase, when timings were collected
+    """
+    SOLVE_ITERATIONS.observe(iterations_outer, engine, 'outer')
+    SOLVE_ITERATIONS.observe(iterations_inner, engine, 'inner')
+    if not converged:
+        CONVERGENCE_FAILURES.inc(engine)
+    for phase, ns in (phase_ns or {}).items():
+        if ns:  # Phases the solve's entry point does not time stay at 0
+            SOLVE_PHASES.observe(ns / 1e9, phase)
+
+
+# Statistics kept elsewhere, copied in at scrape time by a collector
+SOLVE_POOL_SOLVES = REGISTRY.gauge(
+    'av_solve_pool_solves',
+    'Solves in the worker pool by state (running, queued)',
+    ('state',),
+)
+SOLVE_POOL_TOTAL = REGISTRY.counter(
+    'av_solve_pool_solves_total',
+    'Solves completed by the worker pool or rejected because its queue was full',
+    ('outcome',),
+)
+RESPONSE_CACHE_ENTRIES = REGISTRY.gauge(
+    'av_response_cache_entries',
+    'Responses held in the /calculate response cache',
+)
+RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    'av_response_cache_lookups_total',
+    'Response cache lookups by result (hit, miss)',
+    ('result',),
+)
+RESPONSE_CACHE_REMOVALS = REGISTRY.counter(
+    'av_response_cache_removals_total',
+    'Responses dropped from the response cache by reason (eviction, expiration)',
+    ('reason',),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    'av_coalesced_requests_total',
+    '/calculate requests by whether they started a solve or joined one in flight',
+    ('role',),
+)
+TABLE_CACHE_ENTRIES = REGISTRY.gauge(
+    'av_table_cache_entries',
+    'Continuance tables loaded (base) and cost-adjusted table views cached (adjusted)',
+    ('kind',),
+)
+TABLE_CACHE_EVENTS = REGISTRY.counter(
+    'av_table_cache_events_total',
+    'Adjusted table view cache hits, misses and evictions',
+    ('event',),
+)
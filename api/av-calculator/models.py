@@ -344,6 +344,18 @@ class HealthCheckResponse(BaseModel):
     status: str = Field(..., description="API status")
     timestamp: str = Field(..., description="Current timestamp (ISO format)")
     version: str = Field(..., description="API version")
+    solve_pool: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Solve worker pool: workers, running, queued, rejected, wait and solve times"
+    )
+    response_cache: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Response cache: entries, hits, misses, hit rate, evictions"
+    )
+    coalescing: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Single-flight coalescing: computations in flight, started and coalesced"
+    )
 
     class Config:
         schema_extra = {
@@ -353,3 +365,251 @@ class HealthCheckResponse(BaseModel):
                 "version": "1.0.0"
             }
         }
+
+
+class ReadyResponse(BaseModel):
+    """Readiness check response model."""
+
+    ready: bool = Field(..., description="Whether the API is ready for traffic")
+    status: str = Field(..., description="starting, ready or failed")
+    timestamp: str = Field(..., description="Current timestamp (ISO format)")
+    warm_up: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Warm-up result: AV per metal tier and duration, or the error"
+    )
+
+
+# Most plans accepted in one /batch request
+MAX_BATCH_PLANS = 1000
+
+
+class BatchRequest(BaseModel):
+    """Request model for batch AV calculation."""
+
+    plans: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_PLANS,
+        description=(
+            f"Plans in CalculateRequest format (1-{MAX_BATCH_PLANS}). Each plan is "
+            "validated on its own, so invalid plans (including entries that are not "
+            "JSON objects) fail without failing the batch."
+        )
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "plans": [
+                    {
+                        "deductible_individual": 4000,
+                        "deductible_family": 10000,
+                        "moop_individual": 9100,
+                        "moop_family": 18200,
+                        "coinsurance_medical": 0.20,
+                        "metal_tier": "Silver"
+                    },
+                    {
+                        "deductible_individual": 2000,
+                        "deductible_family": 4000,
+                        "moop_individual": 6000,
+                        "moop_family": 12000,
+                        "coinsurance_medical": 0.30,
+                        "metal_tier": "Bronze"
+                    }
+                ]
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """Result for one plan of a batch."""
+
+    index: int = Field(..., description="Position of the plan in the request")
+    is_valid: bool = Field(
+        ...,
+        description="Whether the plan passed validation and was calculated"
+    )
+    av_percentage: Optional[float] = Field(
+        default=None,
+        description="Calculated actuarial value as percentage (valid plans only)"
+    )
+    metal_tier: Optional[str] = Field(
+        default=None,
+        description="Calculated metal tier classification (valid plans only)"
+    )
+    details: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Detailed breakdown of calculation, as in /calculate"
+    )
+    errors: List[ValidationError] = Field(
+        default_factory=list,
+        description="Validation or calculation errors (empty if valid)"
+    )
+    warnings: List[str] = Field(
+        default_factory=list,
+        description="Non-critical warnings"
+    )
+
+
+class BatchResponse(BaseModel):
+    """Response model for batch AV calculation."""
+
+    success: bool = Field(
+        ...,
+        description="Whether every plan was calculated"
+    )
+    results: List[BatchItemResult] = Field(
+        ...,
+        description="One result per plan, in request order"
+    )
+    valid_count: int = Field(..., description="Plans calculated")
+    invalid_count: int = Field(..., description="Plans rejected")
+    calculation_time_ms: float = Field(
+        ...,
+        description="Time taken to validate and calculate the batch in milliseconds"
+    )
+
+
+class TableInfo(BaseModel):
+    """Summary of one continuance table."""
+
+    metal_tier: str = Field(..., description="Bronze, Silver, Gold or Platinum")
+    table_type: str = Field(..., description="med, rx or combined")
+    row_count: int = Field(..., description="Number of rows (spending levels)")
+    columns: List[str] = Field(..., description="Source column names, in table order")
+
+
+class TableListResponse(BaseModel):
+    """Response model for the continuance table listing."""
+
+    plan_year: int = Field(..., description="Plan year of the tables")
+    version: str = Field(..., description="Table bundle checksum")
+    tables: List[TableInfo] = Field(..., description="Available tables")
+
+
+class TableResponse(BaseModel):
+    """Response model for a slice of a continuance table (JSON format)."""
+
+    metal_tier: str = Field(..., description="Bronze, Silver, Gold or Platinum")
+    table_type: str = Field(..., description="med, rx or combined")
+    plan_year: int = Field(..., description="Plan year of the table")
+    version: str = Field(..., description="Table bundle checksum")
+    columns: List[str] = Field(..., description="Selected column names")
+    row_start: int = Field(..., description="Index of the first returned row")
+    row_count: int = Field(..., description="Number of returned rows")
+    total_rows: int = Field(..., description="Number of rows in the whole table")
+    rows: List[List[float]] = Field(
+        ...,
+        description="One array per row, with values in the order of columns"
+    )
+
+
+# Largest grid a sweep may request, in cells (plans solved)
+MAX_SWEEP_CELLS = 10000
+
+MAX_SWEEP_AXES = 3
+
+# CalculateRequest fields a sweep can vary
+SWEEP_FIELDS = tuple(
+    name for name, field in CalculateRequest.model_fields.items()
+    if field.annotation in (float, Optional[float])
+)
+
+
+class SweepAxis(BaseModel):
+    """One parameter a sweep varies, with the values it takes."""
+
+    field: str = Field(..., description="Numeric CalculateRequest field, e.g. deductible_individual")
+    values: List[float] = Field(
+        ...,
+        min_length=1,
+        description="Values of the field along this axis, in order"
+    )
+
+    @validator('field')
+    def validate_field(cls, v):
+        """Validate the field is a numeric plan parameter."""
+        if v not in SWEEP_FIELDS:
+            raise ValueError(f"field must be one of {list(SWEEP_FIELDS)}")
+        return v
+
+
+class SweepRequest(BaseModel):
+    """Request model for an AV surface sweep."""
+
+    base_plan: Dict[str, Any] = Field(
+        ...,
+        description="Plan in CalculateRequest format; axis fields override its values"
+    )
+    axes: List[SweepAxis] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_SWEEP_AXES,
+        description=(
+            f"Parameters to vary (1-{MAX_SWEEP_AXES}). The grid is their cartesian product, "
+            f"at most {MAX_SWEEP_CELLS} cells."
+        )
+    )
+    format: str = Field(
+        default="json",
+        description="Response format: json (base64 float32), npy or arrow"
+    )
+
+    @validator('axes')
+    def validate_axes(cls, v):
+        """Validate axes are distinct and the grid is within MAX_SWEEP_CELLS."""
+        fields = [axis.field for axis in v]
+        if len(set(fields)) != len(fields):
+            raise ValueError("Each field may only appear on one axis")
+        cells = 1
+        for axis in v:
+            cells *= len(axis.values)
+        if cells > MAX_SWEEP_CELLS:
+            raise ValueError(f"Grid has {cells} cells, more than the maximum of {MAX_SWEEP_CELLS}")
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "base_plan": {
+                    "deductible_individual": 4000,
+                    "deductible_family": 10000,
+                    "moop_individual": 9100,
+                    "moop_family": 18200,
+                    "coinsurance_medical": 0.20,
+                    "metal_tier": "Silver"
+                },
+                "axes": [
+                    {"field": "deductible_individual", "values": [2000, 3000, 4000, 5000]},
+                    {"field": "coinsurance_medical", "values": [0.1, 0.2, 0.3]}
+                ],
+                "format": "json"
+            }
+        }
+
+
+class SweepResponse(BaseModel):
+    """Response model for an AV surface sweep (JSON format)."""
+
+    success: bool = Field(..., description="Whether every cell was calculated")
+    axes: List[SweepAxis] = Field(..., description="Axes of the surface, in array dimension order")
+    shape: List[int] = Field(..., description="Array shape: number of values on each axis")
+    dtype: str = Field(default="float32", description="Element type of data")
+    data: str = Field(
+        ...,
+        description=(
+            "Base64 of the little-endian float32 AV percentages in C (row-major) order; "
+            "NaN for cells that could not be calculated"
+        )
+    )
+    valid_count: int = Field(..., description="Cells calculated")
+    invalid_count: int = Field(..., description="Cells rejected")
+    errors: List[BatchItemResult] = Field(
+        default_factory=list,
+        description="Errors of up to 20 rejected cells; index is the flat C-order cell index"
+    )
+    calculation_time_ms: float = Field(
+        ...,
+        description="Time taken to validate and calculate the grid in milliseconds"
+    )
@@ -0,0 +1,56 @@
+"""
+Fast JSON Responses
+
+Endpoints whose results are already validated (engine output, or models
+built from it) return them as PrebuiltJSONResponse. That skips FastAPI's
+response_model pass, which validates the whole result again and then
+encodes it, while the response_model on the route still documents the
+schema in OpenAPI. Models are serialized by pydantic's own JSON
+serializer; plain data uses orjson when it is installed.
+"""
+
+import json
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes of plain data (dicts, lists, numbers, NumPy arrays with orjson)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(',', ':')).encode()
+
+
+def model_json(model: BaseModel) -> bytes:
+    """
+    JSON bytes of a model, without validating it.
+
+    Use with models from model_construct() whose fields come from trusted
+    code, to skip validation entirely.
+    """
+    return model.__pydantic_serializer__.to_json(model)
+
+
+class PrebuiltJSONResponse(Response):
+    """
+    JSON response for content that needs no validation.
+
+    Content may be JSON bytes (e.g. from the response cache), a model, or
+    plain data.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return model_json(content)
+        return dumps(content)
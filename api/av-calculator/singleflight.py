@@ -0,0 +1,78 @@
+"""
+Single-Flight Request Coalescing
+
+Deduplicates identical in-flight work: while a computation for a key is
+running, further callers with the same key await that computation instead
+of starting their own, and all of them get its result or its exception.
+Nothing is kept once the computation finishes; completed results are the
+response cache's job.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one computation.
+
+    The computation runs as its own task, so a caller that is cancelled
+    (e.g. its client disconnected) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await func() once per key across concurrent callers.
+
+        Args:
+            key: Identity of the computation (e.g. a canonical request hash)
+            func: Starts the computation; only called by the first caller
+
+        Returns:
+            (result, shared): shared is True if this caller joined a
+            computation started by another caller
+
+        Raises:
+            Whatever func() raises, in every caller sharing the computation
+        """
+        loop = asyncio.get_running_loop()
+        # Tasks belong to a loop; calls on different loops never coalesce
+        flight = (id(loop), key)
+        with self._lock:
+            task = self._calls.get(flight)
+            shared = task is not None
+            if shared:
+                self._coalesced += 1
+            else:
+                self._leaders += 1
+                task = loop.create_task(func())
+                self._calls[flight] = task
+                task.add_done_callback(lambda _: self._forget(flight, task))
+
+        return await asyncio.shield(task), shared
+
+    def _forget(self, flight: Tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._calls.get(flight) is task:
+                del self._calls[flight]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight computations and how many calls joined one."""
+        with self._lock:
+            calls = self._leaders + self._coalesced
+            return {
+                'in_flight': len(self._calls),
+                'computations': self._leaders,
+                'coalesced': self._coalesced,
+                'coalesced_rate': self._coalesced / calls if calls else 0.0,
+            }
@@ -0,0 +1,77 @@
+"""
+NDJSON Streaming Support
+
+Incremental reading of newline-delimited JSON request bodies, and a
+streaming response that can keep reading the request body while it writes
+results, so large uploads are solved as they arrive in bounded memory.
+"""
+
+from typing import AsyncIterator, List
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Longest accepted line; a plan is well under 1 KB of JSON
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def ndjson_lines(
+    body: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[List[bytes]]:
+    """
+    Split a request body stream into NDJSON lines as it arrives.
+
+    Yields the complete, non-blank lines of each body piece together, so a
+    caller can process whatever has arrived before waiting for more. Only
+    the unfinished last line is carried over between pieces.
+
+    Args:
+        body: Request body pieces (e.g. Request.stream())
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        Lists of lines, without line endings
+
+    Raises:
+        ValueError: If a line exceeds max_line_bytes
+    """
+    partial = b""
+    async for piece in body:
+        lines = (partial + piece).split(b"\n")
+        partial = lines.pop()
+        if len(partial) > max_line_bytes:
+            raise ValueError(f"Line exceeds {max_line_bytes:,} bytes")
+        lines = [line for line in lines if line.strip()]
+        if any(len(line) > max_line_bytes for line in lines):
+            raise ValueError(f"Line exceeds {max_line_bytes:,} bytes")
+        if lines:
+            yield lines
+
+    if partial.strip():
+        yield [partial]
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator also reads the request body.
+
+    StreamingResponse normally watches receive() for a client disconnect
+    while streaming, which would take request body messages away from the
+    iterator. This response leaves receive() to the iterator: a client that
+    disconnects mid-upload surfaces as ClientDisconnect from
+    Request.stream(), which ends the iterator.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,178 @@
+"""
+AV Surface Sweeps
+
+Solves a base plan over a grid of parameter values (the cartesian product
+of up to three axes) in one vectorized engine call, and returns the AV of
+every cell as a dense float32 array shaped by the axes. Cells are in C
+(row-major) order: the last axis varies fastest.
+
+Representations are base64 inside JSON, NPY, or Arrow IPC (a stream with
+one column per axis plus av_percentage, one row per cell) when pyarrow is
+installed.
+"""
+
+import base64
+import itertools
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+from .calculator import calculate_batch_from_requests
+from .models import BatchItemResult, ValidationError
+from .validation import validate_batch_plan
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+SWEEP_FORMATS = ("json", "npy", "arrow")
+
+# Rejected cells whose errors are returned; the rest are only counted
+MAX_SWEEP_ERRORS = 20
+
+
+@dataclass
+class SweepResult:
+    """
+    AV surface of a sweep, plus what is needed to report on its solves.
+
+    av has NaN for cells that failed validation or calculation. The
+    iteration and convergence arrays cover solved cells only.
+    """
+    av: np.ndarray
+    iterations_outer: np.ndarray
+    iterations_inner: np.ndarray
+    converged: np.ndarray
+    errors: List[BatchItemResult]
+    invalid_count: int
+
+    @property
+    def valid_count(self) -> int:
+        return self.av.size - self.invalid_count
+
+
+def sweep_formats() -> Tuple[str, ...]:
+    """Formats this installation can produce (arrow needs pyarrow)."""
+    if pyarrow is None:
+        return tuple(name for name in SWEEP_FORMATS if name != "arrow")
+    return SWEEP_FORMATS
+
+
+def sweep_plans(base_plan: Dict[str, Any], axes: List[Tuple[str, List[float]]]) -> List[Dict[str, Any]]:
+    """
+    One plan per grid cell, in C order.
+
+    Args:
+        base_plan: Plan in CalculateRequest format
+        axes: (field, values) pairs; each field overrides the base plan
+
+    Returns:
+        Plans in CalculateRequest format, one per cell
+    """
+    fields = [field for field, _ in axes]
+    return [
+        {**base_plan, **dict(zip(fields, cell))}
+        for cell in itertools.product(*(values for _, values in axes))
+    ]
+
+
+def solve_sweep(base_plan: Dict[str, Any], axes: List[Tuple[str, List[float]]]) -> SweepResult:
+    """
+    Validate and solve every cell of a sweep in one vectorized solve.
+
+    Each cell is validated like a /batch plan; cells that fail validation
+    or calculation get NaN instead of failing the sweep.
+
+    Args:
+        base_plan: Plan in CalculateRequest format
+        axes: (field, values) pairs, in array dimension order
+
+    Returns:
+        SweepResult with av shaped (len(values) of each axis)
+    """
+    shape = tuple(len(values) for _, values in axes)
+    av = np.full(int(np.prod(shape)), np.nan, dtype=np.float32)
+    errors: List[BatchItemResult] = []
+    invalid_count = 0
+
+    lanes = []
+    pending = []
+    for index, raw_plan in enumerate(sweep_plans(base_plan, axes)):
+        item, plan = validate_batch_plan(index, raw_plan)
+        if plan is None:
+            invalid_count += 1
+            if len(errors) < MAX_SWEEP_ERRORS:
+                errors.append(item)
+            continue
+        lanes.append(index)
+        pending.append(plan)
+
+    iterations_outer = iterations_inner = np.empty(0, dtype=np.int64)
+    converged = np.empty(0, dtype=bool)
+    if pending:
+        solved = calculate_batch_from_requests(pending)
+        failed = solved.failed
+        lanes = np.asarray(lanes)
+        # Engine AV is a fraction; the surface is in percent, like av_percentage
+        av[lanes[~failed]] = solved.av[~failed] * 100
+        for lane in np.flatnonzero(failed):
+            invalid_count += 1
+            if len(errors) < MAX_SWEEP_ERRORS:
+                errors.append(BatchItemResult(
+                    index=int(lanes[lane]),
+                    is_valid=False,
+                    errors=[ValidationError(
+                        field="plan",
+                        error="CALCULATION_ERROR",
+                        message=solved.errors[lane],
+                    )],
+                ))
+        iterations_outer = solved.iterations_outer[~failed]
+        iterations_inner = solved.iterations_inner[~failed]
+        converged = solved.converged[~failed]
+
+    errors.sort(key=lambda item: item.index)
+    return SweepResult(
+        av=av.reshape(shape),
+        iterations_outer=iterations_outer,
+        iterations_inner=iterations_inner,
+        converged=converged,
+        errors=errors[:MAX_SWEEP_ERRORS],
+        invalid_count=invalid_count,
+    )
+
+
+def encode_surface(av: np.ndarray) -> str:
+    """Base64 of the little-endian float32 values in C order."""
+    return base64.b64encode(np.ascontiguousarray(av, dtype='<f4').tobytes()).decode('ascii')
+
+
+def render_sweep_arrow(axes: List[Tuple[str, List[float]]], av: np.ndarray) -> bytes:
+    """
+    Arrow IPC stream body: one column per axis field and av_percentage.
+
+    Rows are cells in C order; the surface shape is kept in the schema
+    metadata ('shape', a JSON array) so readers can reshape av_percentage.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise RuntimeError("Arrow format requires pyarrow")
+
+    grids = np.meshgrid(*(np.asarray(values, dtype=np.float64) for _, values in axes), indexing='ij')
+    columns = {field: grid.ravel() for (field, _), grid in zip(axes, grids)}
+    columns['av_percentage'] = av.ravel()
+    table = pyarrow.table(columns).replace_schema_metadata({'shape': json.dumps(list(av.shape))})
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
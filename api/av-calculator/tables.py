@@ -0,0 +1,190 @@
+"""
+Continuance Table Access
+
+Serves slices of the continuance tables the engine uses, straight from the
+process-wide table registry (memory-mapped from the compiled bundle when
+there is one), so front ends no longer need their own copy.
+
+Representations are JSON or NPY, optionally gzip or brotli encoded. Every
+representation has a strong ETag derived from the table bundle checksum and
+the selection, so it only changes when the tables do.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# calculator puts the engine package on sys.path
+from .calculator import table_version
+from .responses import dumps
+
+from av_calculator.bundle import table_key
+from av_calculator.constants import DEFAULT_PLAN_YEAR, METAL_TIERS, TABLE_TYPES
+from av_calculator.continuance import get_continuance_table, get_registry
+
+
+NPY_MEDIA_TYPE = "application/x-npy"
+
+TABLE_FORMATS = ("json", "npy")
+
+# Seconds clients may reuse a table without revalidating its ETag
+TABLE_MAX_AGE = 3600
+
+
+def normalize_table_name(metal_tier: str, table_type: str) -> Tuple[str, str]:
+    """
+    Canonical (metal tier, table type) for path parameters such as 'silver'.
+
+    Raises:
+        KeyError: If the tier or table type does not exist
+    """
+    tier = metal_tier.capitalize()
+    kind = table_type.lower()
+    if tier not in METAL_TIERS or kind not in TABLE_TYPES:
+        raise KeyError(f"No continuance table {metal_tier}/{table_type}")
+    return tier, kind
+
+
+@lru_cache(maxsize=None)
+def table_columns(metal_tier: str, table_type: str) -> Tuple[str, ...]:
+    """All source column names of a table, in table order."""
+    registry = get_registry()
+    manifest = registry.manifest(DEFAULT_PLAN_YEAR)
+    if manifest is not None:
+        return tuple(manifest['tables'][table_key(metal_tier, table_type)]['columns'])
+
+    path = registry.vintage_dir(DEFAULT_PLAN_YEAR) / f"{table_key(metal_tier, table_type)}.json"
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return tuple(data.get('columns') or data['data'][0].keys())
+
+
+def table_row_count(metal_tier: str, table_type: str) -> int:
+    """Number of rows in a table."""
+    return len(get_continuance_table(metal_tier, table_type))
+
+
+def table_listing() -> dict:
+    """Plan year, version and the tier, type, row count and columns of every table."""
+    tables = []
+    for metal_tier in METAL_TIERS:
+        for table_type in TABLE_TYPES:
+            tables.append({
+                'metal_tier': metal_tier,
+                'table_type': table_type,
+                'row_count': table_row_count(metal_tier, table_type),
+                'columns': list(table_columns(metal_tier, table_type)),
+            })
+    return {'plan_year': DEFAULT_PLAN_YEAR, 'version': table_version(), 'tables': tables}
+
+
+def select_columns(metal_tier: str, table_type: str, columns: Optional[str]) -> List[str]:
+    """
+    Resolve a comma-separated column selection (all columns if empty).
+
+    Raises:
+        ValueError: If a selected column does not exist in the table
+    """
+    available = table_columns(metal_tier, table_type)
+    if not columns:
+        return list(available)
+
+    selected = [name.strip() for name in columns.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns for {metal_tier} {table_type}: {unknown}")
+    return selected
+
+
+def table_slice(
+    metal_tier: str,
+    table_type: str,
+    columns: List[str],
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Rows start:stop of the selected columns.
+
+    Returns:
+        float64 matrix of shape (len(columns), rows), one row per column
+    """
+    table = get_continuance_table(metal_tier, table_type, columns=columns)
+    rows = range(len(table))[start:stop]
+    matrix = np.empty((len(columns), len(rows)))
+    for j, name in enumerate(columns):
+        matrix[j] = table.column(name)[start:stop]
+    return matrix
+
+
+def table_etag(*selection) -> str:
+    """Strong ETag for a table representation from the tables version and selection."""
+    digest = hashlib.sha256(json.dumps(selection, separators=(',', ':')).encode()).hexdigest()
+    return f'"{table_version()[:16]}-{digest[:16]}"'
+
+
+def render_json(
+    metal_tier: str,
+    table_type: str,
+    columns: List[str],
+    matrix: np.ndarray,
+    start: int,
+    total_rows: int,
+) -> bytes:
+    """JSON body: column names plus one array of values per row."""
+    return dumps({
+        'metal_tier': metal_tier,
+        'table_type': table_type,
+        'plan_year': DEFAULT_PLAN_YEAR,
+        'version': table_version(),
+        'columns': columns,
+        'row_start': start,
+        'row_count': int(matrix.shape[1]),
+        'total_rows': total_rows,
+        'rows': matrix.T.tolist(),
+    })
+
+
+def render_npy(matrix: np.ndarray) -> bytes:
+    """NPY body: the column-major float64 matrix."""
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(matrix), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Preferred content coding the client accepts: 'br', 'gzip' or None."""
+    accepted = set()
+    for coding in (accept_encoding or '').split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        weight = next((param[2:] for param in params if param.startswith('q=')), '1')
+        try:
+            if float(weight) > 0:
+                accepted.add(name.lower())
+        except ValueError:
+            continue
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def encode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress body with a coding from negotiate_encoding."""
+    if encoding == 'br':
+        return brotli.compress(body)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
@@ -4,6 +4,8 @@ Test Suite for AV Calculator API
 Tests all endpoints, validation, error handling, and integration.
 """
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 from .main import app
@@ -32,6 +34,52 @@ class TestHealthCheckEndpoint:
         assert data["version"] == "1.0.0"
 
 
+class TestReadyEndpoint:
+    """Test startup warm-up and the readiness endpoint."""
+
+    def test_ready_after_warm_up(self):
+        """Test that /ready turns 200 once every tier has been warmed up."""
+        import time
+
+        with TestClient(app) as started:
+            deadline = time.time() + 30
+            response = started.get("/api/av-calculator/ready")
+            while response.status_code == 503 and time.time() < deadline:
+                assert response.json()["status"] == "starting"
+                time.sleep(0.05)
+                response = started.get("/api/av-calculator/ready")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["ready"] == True
+            assert sorted(data["warm_up"]["av_by_tier"]) == ["Bronze", "Gold", "Platinum", "Silver"]
+
+        # Shutting down: no longer ready
+        response = client.get("/api/av-calculator/ready")
+        assert response.status_code == 503
+
+    def test_failed_warm_up_is_not_ready(self, monkeypatch):
+        """Test that a failing warm-up keeps /ready at 503 with the error."""
+        import time
+        from . import main
+
+        def broken_warm_up(request):
+            raise FileNotFoundError("Continuance table not found")
+
+        monkeypatch.setattr(main, "warm_up", broken_warm_up)
+        with TestClient(app) as started:
+            deadline = time.time() + 30
+            response = started.get("/api/av-calculator/ready")
+            while response.json()["status"] == "starting" and time.time() < deadline:
+                time.sleep(0.05)
+                response = started.get("/api/av-calculator/ready")
+
+            assert response.status_code == 503
+            assert response.json()["status"] == "failed"
+            assert "not found" in response.json()["warm_up"]["error"]
+            assert started.get("/api/av-calculator/health").status_code == 200
+
+
 class TestCalculateEndpoint:
     """Test POST /api/av-calculator/calculate endpoint."""
 
@@ -205,6 +253,749 @@ class TestCalculateEndpoint:
         assert "adjusted_values" in details
 
 
+class TestResponseCache:
+    """Test response caching and ETags on /calculate."""
+
+    PLAN = {
+        "deductible_individual": 2500,
+        "deductible_family": 5000,
+        "moop_individual": 7000,
+        "moop_family": 14000,
+        "coinsurance_medical": 0.25,
+        "metal_tier": "Silver"
+    }
+
+    def test_identical_requests_hit_cache(self, monkeypatch):
+        """Test that the same plan, however formatted, is served from cache."""
+        from . import main
+        from .cache import ResponseCache
+
+        monkeypatch.setattr(main, "response_cache", ResponseCache())
+
+        first = client.post("/api/av-calculator/calculate", json=self.PLAN)
+        # Same plan: different key order, float formatting and explicit defaults
+        reordered = dict(reversed(list(self.PLAN.items())), deductible_individual=2500.0, er_copay=0)
+        second = client.post("/api/av-calculator/calculate", json=reordered)
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert first.headers["etag"] == second.headers["etag"]
+        assert "max-age" in first.headers["cache-control"]
+        assert first.json() == second.json()
+
+        other = client.post("/api/av-calculator/calculate", json=dict(self.PLAN, coinsurance_medical=0.3))
+        assert other.headers["etag"] != first.headers["etag"]
+
+        stats = client.get("/api/av-calculator/health").json()["response_cache"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_engine_change_changes_etag(self, monkeypatch, tmp_path):
+        """Test that a change to the engine source changes cache keys and ETags."""
+        from . import calculator, main
+        from .cache import ResponseCache
+
+        source = tmp_path / "vectorized.py"
+        source.write_text("CHUNK_SIZE = 1\n")
+        before = calculator.source_version([source])
+        source.write_text("CHUNK_SIZE = 2\n")
+        assert calculator.source_version([source]) != before
+        engine_source = calculator.source_version(calculator.ENGINE_SOURCE_FILES)
+        assert calculator.engine_version().endswith(engine_source[:16])
+
+        monkeypatch.setattr(main, "response_cache", ResponseCache())
+        etag = client.post("/api/av-calculator/calculate", json=self.PLAN).headers["etag"]
+        monkeypatch.setattr(calculator, "engine_version", lambda: "v2-next")
+
+        response = client.post("/api/av-calculator/calculate", json=self.PLAN,
+                               headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["x-cache"] == "MISS"
+        assert response.headers["etag"] != etag
+
+    def test_if_none_match_returns_304(self, monkeypatch):
+        """Test that a matching If-None-Match gets 304 without a calculation."""
+        from . import main
+        from .cache import ResponseCache
+
+        etag = client.post("/api/av-calculator/calculate", json=self.PLAN).headers["etag"]
+        monkeypatch.setattr(main, "response_cache", ResponseCache())
+
+        response = client.post("/api/av-calculator/calculate", json=self.PLAN,
+                               headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert main.response_cache.stats()["misses"] == 0
+
+        response = client.post("/api/av-calculator/calculate", json=self.PLAN,
+                               headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    def test_eviction_and_expiry(self, monkeypatch):
+        """Test LRU eviction and TTL expiry."""
+        from . import cache
+        from .cache import ResponseCache
+
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+        lru = ResponseCache(max_entries=2, ttl=60)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        assert lru.get("a") == 1  # b is now least recently used
+        lru.put("c", 3)
+        assert lru.get("b") is None
+        assert lru.get("c") == 3
+
+        now[0] += 61
+        assert lru.get("a") is None
+        stats = lru.stats()
+        assert (stats["evictions"], stats["expirations"], stats["entries"]) == (1, 1, 1)
+
+
+class TestSingleFlight:
+    """Test coalescing of identical concurrent calculations."""
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that callers with the same key share one result or error."""
+        import asyncio
+        from .singleflight import SingleFlight
+
+        calls = []
+
+        async def solve(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            if value is None:
+                raise ValueError("no plan")
+            return value
+
+        async def scenario():
+            flights = SingleFlight()
+            results = await asyncio.gather(
+                *(flights.run("a", lambda: solve(1)) for _ in range(4)),
+                flights.run("b", lambda: solve(2)),
+            )
+            errors = await asyncio.gather(
+                *(flights.run("c", lambda: solve(None)) for _ in range(3)),
+                return_exceptions=True,
+            )
+            return results, errors, flights.stats()
+
+        results, errors, stats = asyncio.run(scenario())
+
+        assert results == [(1, False), (1, True), (1, True), (1, True), (2, False)]
+        assert all(isinstance(e, ValueError) for e in errors)
+        assert calls == [1, 2, None]
+        assert stats["in_flight"] == 0
+        assert (stats["computations"], stats["coalesced"]) == (3, 5)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """Test that a caller going away leaves the shared computation running."""
+        import asyncio
+        from .singleflight import SingleFlight
+
+        async def solve():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            flights = SingleFlight()
+            leader = asyncio.ensure_future(flights.run("a", solve))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.run("a", solve))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(scenario()) == ("done", True)
+
+    def test_identical_requests_solve_once(self, monkeypatch):
+        """Test that parallel identical /calculate requests run a single solve."""
+        import asyncio
+        import time
+        import httpx
+        from . import main
+        from .cache import ResponseCache
+        from .calculator import calculate_av_from_request
+        from .singleflight import SingleFlight
+
+        solves = []
+
+        def slow_calculate(plan):
+            solves.append(plan)
+            time.sleep(0.2)
+            return calculate_av_from_request(plan)
+
+        monkeypatch.setattr(main, "calculate_av_from_request", slow_calculate)
+        monkeypatch.setattr(main, "response_cache", ResponseCache())
+        monkeypatch.setattr(main, "calculation_flights", SingleFlight())
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await asyncio.gather(*(
+                    http.post("/api/av-calculator/calculate", json=TestResponseCache.PLAN)
+                    for _ in range(5)
+                ))
+
+        responses = asyncio.run(scenario())
+
+        assert len(solves) == 1
+        assert all(r.status_code == 200 for r in responses)
+        assert sorted(r.headers["x-cache"] for r in responses) == ["COALESCED"] * 4 + ["MISS"]
+        assert len({r.text for r in responses}) == 1
+
+        stats = client.get("/api/av-calculator/health").json()["coalescing"]
+        assert (stats["computations"], stats["coalesced"]) == (1, 4)
+
+
+class TestBatchEndpoint:
+    """Test POST /api/av-calculator/batch endpoint."""
+
+    PLAN = {
+        "deductible_individual": 2000,
+        "deductible_family": 4000,
+        "moop_individual": 6000,
+        "moop_family": 12000,
+        "coinsurance_medical": 0.20,
+        "metal_tier": "Silver"
+    }
+
+    def test_batch_matches_calculate(self):
+        """Test that batch results match /calculate for the same plans, in order."""
+        plans = [
+            self.PLAN,
+            dict(self.PLAN, deductible_individual=4000, moop_individual=9100,
+                 moop_family=18200, primary_care_copay=45, generic_copay=10),
+            dict(self.PLAN, deductible_individual=3000, hsa_contribution=1000, metal_tier="Bronze"),
+        ]
+
+        response = client.post("/api/av-calculator/batch", json={"plans": plans})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["success"] == True
+        assert data["valid_count"] == 3
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+
+        for plan, item in zip(plans, data["results"]):
+            single = client.post("/api/av-calculator/calculate", json=plan).json()
+            assert item["is_valid"] == True
+            assert item["av_percentage"] == single["av_percentage"]
+            assert item["details"]["breakdown"] == single["details"]["breakdown"]
+
+    def test_batch_partial_failure(self):
+        """Test that invalid plans are reported per item without failing the batch."""
+        plans = [
+            self.PLAN,
+            dict(self.PLAN, deductible_individual=8000),  # MOOP < deductible
+            {"deductible_individual": 2000},  # Missing required fields
+            dict(self.PLAN, deductible_family=1000),  # Family deductible < individual
+            5,  # Not a JSON object
+        ]
+
+        response = client.post("/api/av-calculator/batch", json={"plans": plans})
+        assert response.status_code == 200
+
+        data = response.json()
+        results = data["results"]
+        assert [item["is_valid"] for item in results] == [True, False, False, False, False]
+        assert data["invalid_count"] == 4
+        assert results[0]["av_percentage"] > 0
+        assert results[1]["errors"][0]["field"] == "moop_individual"
+        assert {error["field"] for error in results[2]["errors"]} >= {"moop_individual", "coinsurance_medical"}
+        assert results[3]["errors"][0]["error"] == "INVALID_RELATIONSHIP"
+        assert results[3]["av_percentage"] is None
+        assert results[4]["errors"][0]["error"] == "INVALID_TYPE"
+
+    def test_batch_size_limits(self):
+        """Test that empty and oversized batches are rejected."""
+        from .models import MAX_BATCH_PLANS
+
+        response = client.post("/api/av-calculator/batch", json={"plans": []})
+        assert response.status_code == 422
+
+        response = client.post("/api/av-calculator/batch",
+                               json={"plans": [self.PLAN] * (MAX_BATCH_PLANS + 1)})
+        assert response.status_code == 422
+
+    def test_batch_rate_limited_by_plan_count(self, monkeypatch):
+        """Test that each plan counts against the batch rate limit."""
+        from . import main
+
+        monkeypatch.setattr(main, "BATCH_PLAN_RATE_LIMIT", "5/minute")
+        main.limiter.reset()
+
+        response = client.post("/api/av-calculator/batch", json={"plans": [self.PLAN] * 3})
+        assert response.status_code == 200
+
+        response = client.post("/api/av-calculator/batch", json={"plans": [self.PLAN] * 3})
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+        main.limiter.reset()
+
+
+class TestBatchStreamEndpoint:
+    """Test POST /api/av-calculator/batch/stream endpoint."""
+
+    PLAN = TestBatchEndpoint.PLAN
+
+    def test_stream_results_in_order(self):
+        """Test that every NDJSON line gets a result line, in order."""
+        import json
+
+        lines = [
+            json.dumps(self.PLAN),
+            "not json",
+            "",
+            json.dumps(dict(self.PLAN, deductible_individual=8000)),
+            json.dumps([1, 2]),
+            json.dumps(self.PLAN),
+        ]
+        response = client.post("/api/av-calculator/batch/stream", content="\n".join(lines))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        results = [json.loads(line) for line in response.text.splitlines()]
+        single = client.post("/api/av-calculator/calculate", json=self.PLAN).json()
+
+        assert [item["index"] for item in results] == [0, 1, 2, 3, 4]
+        assert [item["is_valid"] for item in results] == [True, False, False, False, True]
+        assert results[0]["av_percentage"] == single["av_percentage"]
+        assert results[1]["errors"][0]["error"] == "INVALID_JSON"
+        assert results[3]["errors"][0]["error"] == "INVALID_TYPE"
+
+    def test_stream_chunks_and_line_splitting(self, monkeypatch):
+        """Test that plans split across body pieces and chunks are all solved."""
+        import asyncio
+        import json
+        from . import main
+        from .streaming import ndjson_lines
+
+        async def pieces():
+            for piece in (b'{"a": 1}\n{"b"', b': 2}\n\n', b'{"c": 3}'):
+                yield piece
+
+        async def collect():
+            return [lines async for lines in ndjson_lines(pieces())]
+
+        assert asyncio.run(collect()) == [[b'{"a": 1}'], [b'{"b": 2}'], [b'{"c": 3}']]
+
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 2)
+        body = "\n".join(json.dumps(dict(self.PLAN, deductible_individual=1000 + 100 * i)) for i in range(5))
+        response = client.post("/api/av-calculator/batch/stream", content=body)
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [item["index"] for item in results] == [0, 1, 2, 3, 4]
+        assert all(item["is_valid"] for item in results)
+
+    def test_stream_rate_limit_ends_stream(self, monkeypatch):
+        """Test that running out of rate limit ends the stream with an error line."""
+        import json
+        from . import main
+
+        monkeypatch.setattr(main, "BATCH_PLAN_RATE_LIMIT", "2/minute")
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 2)
+        main.limiter.reset()
+
+        body = "\n".join(json.dumps(self.PLAN) for _ in range(4))
+        with client.stream("POST", "/api/av-calculator/batch/stream", content=body) as response:
+            results = [json.loads(line) for line in response.iter_lines()]
+        main.limiter.reset()
+
+        assert [item.get("index") for item in results] == [0, 1, 2]
+        assert results[-1]["error"] == "RATE_LIMIT_EXCEEDED"
+
+
+class TestSweepEndpoint:
+    """Test POST /api/av-calculator/sweep endpoint."""
+
+    PLAN = TestBatchEndpoint.PLAN
+
+    AXES = [
+        {"field": "deductible_individual", "values": [1000, 2000, 8000]},
+        {"field": "er_copay", "values": [100, 300]},
+    ]
+
+    def test_sweep_matches_calculate(self):
+        """Test that the decoded surface matches /calculate cell by cell, NaN where invalid."""
+        import base64
+        import math
+        import numpy as np
+
+        response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": self.AXES})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["shape"] == [3, 2]
+        assert data["dtype"] == "float32"
+        surface = np.frombuffer(base64.b64decode(data["data"]), dtype="<f4").reshape(data["shape"])
+
+        for i, deductible in enumerate(self.AXES[0]["values"]):
+            for j, er_copay in enumerate(self.AXES[1]["values"]):
+                plan = dict(self.PLAN, deductible_individual=deductible, er_copay=er_copay)
+                single = client.post("/api/av-calculator/calculate", json=plan)
+                if single.status_code == 200:
+                    assert surface[i, j] == pytest.approx(single.json()["av_percentage"], rel=1e-6)
+                else:
+                    assert math.isnan(surface[i, j])
+
+        # Deductible 8000 exceeds the base plan's MOOP
+        assert data["invalid_count"] == 2
+        assert [item["index"] for item in data["errors"]] == [4, 5]
+        assert data["errors"][0]["errors"][0]["field"] == "moop_individual"
+
+    def test_sweep_npy_format(self):
+        """Test that npy returns the float32 surface with axis fields in a header."""
+        import io
+        import json
+        import numpy as np
+
+        response = client.post("/api/av-calculator/sweep",
+                               json={"base_plan": self.PLAN, "axes": self.AXES, "format": "npy"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-npy"
+        assert json.loads(response.headers["x-sweep-axes"]) == ["deductible_individual", "er_copay"]
+        assert response.headers["x-invalid-count"] == "2"
+
+        surface = np.load(io.BytesIO(response.content))
+        assert surface.dtype == np.float32
+        assert surface.shape == (3, 2)
+
+    def test_sweep_grid_limits(self):
+        """Test that bad axes and oversized grids are rejected."""
+        from .models import MAX_SWEEP_CELLS
+
+        for axes in [
+            [],
+            [{"field": "metal_tier", "values": [1]}],
+            [{"field": "er_copay", "values": []}],
+            [{"field": "er_copay", "values": [1]}, {"field": "er_copay", "values": [2]}],
+            [{"field": "er_copay", "values": list(range(MAX_SWEEP_CELLS // 2 + 1))},
+             {"field": "generic_copay", "values": [10, 20]}],
+        ]:
+            response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": axes})
+            assert response.status_code == 422
+
+        response = client.post("/api/av-calculator/sweep",
+                               json={"base_plan": self.PLAN, "axes": self.AXES, "format": "csv"})
+        assert response.status_code == 400
+
+    def test_sweep_rate_limited_by_cell_count(self, monkeypatch):
+        """Test that each cell counts against the sweep rate limit."""
+        from . import main
+
+        monkeypatch.setattr(main, "SWEEP_CELL_RATE_LIMIT", "10/minute")
+        main.limiter.reset()
+
+        response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": self.AXES})
+        assert response.status_code == 200
+
+        response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": self.AXES})
+        assert response.status_code == 429
+        main.limiter.reset()
+
+    def test_sweep_larger_than_batch_limit(self):
+        """Test that any sweep within MAX_SWEEP_CELLS fits the rate limit window."""
+        from limits import parse as parse_rate_limit
+        from . import main
+        from .models import MAX_SWEEP_CELLS
+
+        assert parse_rate_limit(main.SWEEP_CELL_RATE_LIMIT).amount >= MAX_SWEEP_CELLS
+        main.limiter.reset()
+
+        axes = [{"field": "er_copay", "values": list(range(0, 2500, 2))},
+                {"field": "generic_copay", "values": [10, 20]}]
+        response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": axes})
+        assert response.status_code == 200
+        assert response.json()["shape"] == [1250, 2]
+        main.limiter.reset()
+
+    def test_sweep_over_whole_limit_rejected(self, monkeypatch):
+        """Test that a sweep that could never fit the limit is 413, not 429."""
+        from . import main
+
+        monkeypatch.setattr(main, "SWEEP_CELL_RATE_LIMIT", "5/minute")
+        main.limiter.reset()
+
+        response = client.post("/api/av-calculator/sweep", json={"base_plan": self.PLAN, "axes": self.AXES})
+        assert response.status_code == 413
+        assert response.json()["detail"]["error"] == "REQUEST_TOO_LARGE"
+        assert "retry-after" not in response.headers
+        main.limiter.reset()
+
+
+class TestSolvePool:
+    """Test the bounded solve worker pool and load shedding."""
+
+    def test_pool_bounds_and_stats(self):
+        """Test that solves beyond workers + queue are refused, and stats track them."""
+        import asyncio
+        import threading
+        from .workers import SolvePool, SolvePoolFull
+
+        release = threading.Event()
+
+        async def scenario():
+            pool = SolvePool(workers=1, queue_size=1)
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(sum, [1, 2]))
+            await asyncio.sleep(0.05)
+            stats = pool.stats()
+
+            with pytest.raises(SolvePoolFull) as excinfo:
+                await pool.run(sum, [3])
+
+            release.set()
+            results = await asyncio.gather(running, queued)
+            pool.shutdown()
+            return stats, excinfo.value, results, pool.stats()
+
+        busy, error, results, done = asyncio.run(scenario())
+
+        assert (busy["running"], busy["queued"]) == (1, 1)
+        assert error.retry_after >= 1
+        assert results == [True, 3]
+        assert done["completed"] == 2
+        assert done["rejected"] == 1
+        assert done["wait_ms_max"] > 0
+
+    def test_process_pool(self):
+        """Test that a process pool runs solves in worker processes."""
+        import asyncio
+        from .workers import SolvePool
+
+        async def scenario():
+            pool = SolvePool(kind="process", workers=1)
+            try:
+                return await pool.run(pow, 2, 10)
+            finally:
+                pool.shutdown()
+
+        assert asyncio.run(scenario()) == 1024
+
+    def test_full_queue_returns_503(self, monkeypatch):
+        """Test that a full queue sheds /calculate with 503 while /health answers."""
+        from . import main
+        from .cache import ResponseCache
+        from .workers import SolvePool
+
+        pool = SolvePool(workers=1, queue_size=0)
+        pool._in_flight = 1  # Worker busy
+        monkeypatch.setattr(main, "solve_pool", pool)
+        monkeypatch.setattr(main, "response_cache", ResponseCache())
+
+        response = client.post("/api/av-calculator/calculate", json=TestBatchEndpoint.PLAN)
+        assert response.status_code == 503
+        assert response.json()["error"] == "SERVICE_OVERLOADED"
+        assert int(response.headers["retry-after"]) >= 1
+
+        response = client.get("/api/av-calculator/health")
+        assert response.status_code == 200
+        assert response.json()["solve_pool"]["rejected"] == 1
+
+
+class TestContinuanceTablesEndpoint:
+    """Test GET /api/av-calculator/tables endpoints."""
+
+    def test_list_available_tables(self):
+        """Test listing available continuance tables."""
+        response = client.get("/api/av-calculator/tables")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["tables"]) >= 12
+        silver = next(t for t in data["tables"]
+                      if (t["metal_tier"], t["table_type"]) == ("Silver", "combined"))
+        assert silver["row_count"] == 166
+        assert silver["columns"][0] == "Up To"
+
+    def test_get_specific_table(self):
+        """Test retrieving a whole table, matching the engine's data."""
+        from .tables import table_slice
+
+        response = client.get("/api/av-calculator/tables/silver/combined")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["rows"]) == 166
+        assert data["total_rows"] == 166
+        assert len(data["rows"][0]) == len(data["columns"])
+        assert [row[0] for row in data["rows"]] == list(
+            table_slice("Silver", "combined", ["Up To"])[0]
+        )
+
+    def test_column_selection_and_row_range(self):
+        """Test selecting columns and a row range."""
+        response = client.get(
+            "/api/av-calculator/tables/gold/med",
+            params={"columns": "Up To, Percent of Enrollees", "start": 10, "stop": 20},
+        )
+        data = response.json()
+        assert data["columns"] == ["Up To", "Percent of Enrollees"]
+        assert (data["row_start"], data["row_count"]) == (10, 10)
+        assert len(data["rows"]) == 10 and len(data["rows"][0]) == 2
+
+    def test_npy_format(self):
+        """Test the binary NPY response."""
+        import io
+        import json
+        import numpy as np
+
+        response = client.get(
+            "/api/av-calculator/tables/bronze/rx",
+            params={"columns": "Up To,Percent of Enrollees", "stop": 50, "format": "npy"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-npy"
+
+        matrix = np.load(io.BytesIO(response.content), allow_pickle=False)
+        assert matrix.shape == (2, 50)
+        assert json.loads(response.headers["x-table-columns"]) == ["Up To", "Percent of Enrollees"]
+
+        data = client.get(
+            "/api/av-calculator/tables/bronze/rx",
+            params={"columns": "Up To,Percent of Enrollees", "stop": 50},
+        ).json()
+        assert matrix.T.tolist() == data["rows"]
+
+    def test_etag_and_compression(self):
+        """Test strong ETags, If-None-Match and gzip encoding."""
+        url = "/api/av-calculator/tables/silver/combined"
+        gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert gzipped.json() == plain.json()
+        assert not gzipped.headers["etag"].startswith("W/")
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+        assert plain.headers["etag"] != client.get(url + "?stop=10").headers["etag"]
+
+        response = client.get(url, headers={"If-None-Match": gzipped.headers["etag"]})
+        assert response.status_code == 304
+        assert not response.content
+
+    def test_unknown_table_and_column(self):
+        """Test 404 for unknown tables and 400 for bad selections."""
+        assert client.get("/api/av-calculator/tables/copper/combined").status_code == 404
+        assert client.get("/api/av-calculator/tables/silver/dental").status_code == 404
+        assert client.get("/api/av-calculator/tables/silver/med?columns=Nope").status_code == 400
+        assert client.get("/api/av-calculator/tables/silver/med?format=csv").status_code == 400
+        assert client.get("/api/av-calculator/tables/silver/med?start=-1").status_code == 422
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus /metrics endpoint and collectors."""
+
+    def test_metrics_after_requests(self):
+        """Test that requests and solves show up in Prometheus format."""
+        client.post("/api/av-calculator/calculate", json=dict(TestResponseCache.PLAN, coinsurance_medical=0.35))
+        client.post("/api/av-calculator/batch", json={"plans": [TestBatchEndpoint.PLAN]})
+        client.get("/api/av-calculator/tables/nowhere/med")
+
+        response = client.get("/api/av-calculator/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+        text = response.text
+        assert "# TYPE av_http_request_duration_seconds histogram" in text
+        assert ('av_http_request_duration_seconds_count{method="POST",'
+                'route="/api/av-calculator/calculate",status="200"}') in text
+        assert 'route="/api/av-calculator/tables/{metal_tier}/{table_type}",status="404"' in text
+        assert 'av_solve_iterations_count{engine="scalar",loop="outer"}' in text
+        assert 'av_solve_iterations_count{engine="vectorized",loop="inner"}' in text
+        assert 'av_solve_phase_seconds_count{phase="outer_loop"}' in text
+        assert "# TYPE av_solve_convergence_failures_total counter" in text
+        assert 'av_solve_pool_solves{state="queued"}' in text
+        assert 'av_response_cache_lookups_total{result="miss"}' in text
+        assert 'av_table_cache_entries{kind="base"}' in text
+
+    def test_histogram_exposition(self):
+        """Test cumulative buckets, sum and count of a histogram."""
+        from .metrics import MetricsRegistry, merge_snapshots, render_prometheus
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("x_seconds", "X", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, 'a"b')
+
+        text = render_prometheus(merge_snapshots([registry.snapshot()]))
+        assert 'x_seconds_bucket{route="a\\"b",le="0.1"} 1' in text
+        assert 'x_seconds_bucket{route="a\\"b",le="1.0"} 2' in text
+        assert 'x_seconds_bucket{route="a\\"b",le="+Inf"} 3' in text
+        assert 'x_seconds_sum{route="a\\"b"} 5.55' in text
+        assert 'x_seconds_count{route="a\\"b"} 3' in text
+
+    def test_iteration_buckets_reach_engine_cap(self):
+        """Test that only solves past MAX_ITERATIONS fall in the +Inf iteration bucket."""
+        from av_calculator.calculator_v2 import MAX_ITERATIONS
+        from .metrics import ITERATION_BUCKETS
+
+        assert ITERATION_BUCKETS[-1] == MAX_ITERATIONS
+
+    def test_merges_workers(self, tmp_path):
+        """Test that snapshots of other workers are summed, and stale gauges dropped."""
+        from .metrics import MetricsExporter, MetricsRegistry, write_snapshot
+
+        def worker(pid, requests, queued, age):
+            registry = MetricsRegistry()
+            registry.counter("req_total", "Requests").inc(amount=requests)
+            registry.gauge("queued", "Queued").set(queued)
+            registry.histogram("lat", "Latency", buckets=(1.0,)).observe(0.5)
+            return dict(registry.snapshot(), pid=pid, time=time.time() - age)
+
+        write_snapshot(tmp_path, worker(1, 2, 3, age=0))
+        write_snapshot(tmp_path, worker(2, 5, 7, age=60))  # Exited a minute ago
+
+        local = MetricsRegistry()
+        local.counter("req_total", "Requests").inc()
+        exporter = MetricsExporter(local, directory=tmp_path, interval=5)
+
+        text = exporter.render()
+        assert "req_total 8.0" in text
+        assert "queued 3.0" in text
+        assert 'lat_bucket{le="1.0"} 2' in text
+
+        exporter.publish()
+        assert len(list(tmp_path.glob("metrics-*.json"))) == 3
+
+
+class TestResponseSerialization:
+    """Test the prebuilt JSON response path."""
+
+    def test_openapi_schema_keeps_response_models(self):
+        """Test that fast-path routes still document their response models."""
+        schema = client.get("/api/av-calculator/openapi.json").json()
+        for path, model in [("/api/av-calculator/calculate", "CalculateResponse"),
+                            ("/api/av-calculator/batch", "BatchResponse")]:
+            content = schema["paths"][path]["post"]["responses"]["200"]["content"]
+            assert content["application/json"]["schema"]["$ref"].endswith(f"/{model}")
+
+    def test_bodies_match_response_models(self):
+        """Test that prebuilt bodies validate against the documented models."""
+        from .models import BatchResponse, CalculateResponse
+
+        response = client.post("/api/av-calculator/calculate", json=TestBatchEndpoint.PLAN)
+        assert response.headers["content-type"] == "application/json"
+        calculated = CalculateResponse.model_validate(response.json())
+
+        response = client.post("/api/av-calculator/batch",
+                               json={"plans": [TestBatchEndpoint.PLAN, {"metal_tier": "Silver"}]})
+        batch = BatchResponse.model_validate(response.json())
+        assert batch.results[0].av_percentage == calculated.av_percentage
+        assert batch.results[1].errors
+
+    def test_dumps_without_orjson(self, monkeypatch):
+        """Test that plain data serializes the same with and without orjson."""
+        import json
+        from . import responses
+
+        content = {"rows": [[0.1, 2.0], [3.5, 1e-07]], "name": "Max'd \u00e9"}
+        fast = responses.dumps(content)
+        monkeypatch.setattr(responses, "orjson", None)
+        assert json.loads(responses.dumps(content)) == json.loads(fast) == content
+
+
 class TestValidateEndpoint:
     """Test GET /api/av-calculator/validate endpoint."""
 
@@ -4,8 +4,11 @@ Input Validation Logic
 Comprehensive validation of plan parameters beyond basic type checking.
 """
 
-from typing import List
-from .models import CalculateRequest, ValidateResponse, ValidationError
+from typing import Any, List, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from .models import BatchItemResult, CalculateRequest, ValidateResponse, ValidationError
 
 
 def validate_plan_parameters(plan: CalculateRequest) -> ValidateResponse:
@@ -155,7 +158,7 @@ def validate_plan_parameters(plan: CalculateRequest) -> ValidateResponse:
         )
 
     # Check family multipliers
-    if plan.deductible_family > 0:
+    if plan.deductible_family > 0 and plan.deductible_individual > 0:
         family_ratio = plan.deductible_family / plan.deductible_individual
         if family_ratio > 3:
             warnings.append(
@@ -236,3 +239,56 @@ def validate_av_result(av_percent: float, metal_tier: str) -> List[str]:
             )
 
     return warnings
+
+
+def validate_batch_plan(index: int, raw_plan: Any) -> Tuple[BatchItemResult, Optional[CalculateRequest]]:
+    """
+    Parse and validate one plan of a batch.
+
+    Request model errors (missing fields, out-of-range values) and
+    validate_plan_parameters errors are both reported on the item, so one
+    bad plan never fails the batch.
+
+    Args:
+        index: Position of the plan in the batch
+        raw_plan: Plan in CalculateRequest format, as decoded from JSON
+
+    Returns:
+        Tuple of (item result, parsed request); the request is None when
+        the plan is invalid and should not be calculated
+    """
+    if not isinstance(raw_plan, dict):
+        return BatchItemResult(
+            index=index,
+            is_valid=False,
+            errors=[ValidationError(
+                field="plan",
+                error="INVALID_TYPE",
+                message="Plan must be a JSON object",
+            )],
+        ), None
+
+    try:
+        plan = CalculateRequest(**raw_plan)
+    except PydanticValidationError as e:
+        return BatchItemResult(
+            index=index,
+            is_valid=False,
+            errors=[
+                ValidationError(
+                    field=".".join(str(part) for part in error["loc"]) or "plan",
+                    error=error["type"].upper(),
+                    message=error["msg"],
+                )
+                for error in e.errors()
+            ],
+        ), None
+
+    validation_result = validate_plan_parameters(plan)
+    item = BatchItemResult(
+        index=index,
+        is_valid=validation_result.is_valid,
+        errors=validation_result.errors,
+        warnings=validation_result.warnings,
+    )
+    return item, plan if validation_result.is_valid else None
@@ -0,0 +1,173 @@
+"""
+Solve Worker Pool
+
+Runs CPU-bound AV solves off the asyncio event loop, on a bounded thread
+or process pool. When every worker is busy and the wait queue is full, new
+solves are refused with SolvePoolFull instead of queueing without limit,
+so the API sheds load (503 + Retry-After) while I/O endpoints such as
+/health stay responsive.
+
+Configuration (environment):
+    AV_SOLVE_EXECUTOR: "thread" (default) or "process"
+    AV_SOLVE_WORKERS: Worker count (default: CPU count, at most 4)
+    AV_SOLVE_QUEUE: Solves allowed to wait for a worker (default 32)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+DEFAULT_QUEUE_SIZE = 32
+
+
+class SolvePoolFull(RuntimeError):
+    """Raised when a solve is submitted to a pool with no free queue slot."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Calculation queue is full, retry later")
+        self.retry_after = retry_after
+
+
+def _timed_call(func: Callable, args: Tuple) -> Tuple[float, Any]:
+    """Run func(*args) in a worker; returns (start time, result)."""
+    started = time.time()
+    return started, func(*args)
+
+
+class SolvePool:
+    """
+    Bounded executor for CPU-bound solves.
+
+    Args:
+        kind: "thread" or "process"
+        workers: Number of workers
+        queue_size: Solves allowed to wait for a free worker
+        initializer: Run in each worker process as it starts (process
+            pools only; thread workers share the API process)
+        initargs: Arguments for initializer
+
+    Raises:
+        ValueError: If kind is unknown or a size is out of range
+    """
+
+    def __init__(self, kind: str = 'thread', workers: int = 1, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 initializer: Optional[Callable] = None, initargs: Tuple = ()):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Executor must be one of {EXECUTOR_KINDS}, got {kind!r}")
+        if workers < 1:
+            raise ValueError(f"Workers must be at least 1, got {workers}")
+        if queue_size < 0:
+            raise ValueError(f"Queue size cannot be negative, got {queue_size}")
+
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        # Solves submitted and not yet finished (running + waiting)
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._solve_total = 0.0
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable] = None, initargs: Tuple = ()) -> 'SolvePool':
+        """Pool configured from AV_SOLVE_EXECUTOR, AV_SOLVE_WORKERS and AV_SOLVE_QUEUE."""
+        return cls(
+            kind=os.environ.get('AV_SOLVE_EXECUTOR', 'thread'),
+            workers=int(os.environ.get('AV_SOLVE_WORKERS', min(os.cpu_count() or 1, 4))),
+            queue_size=int(os.environ.get('AV_SOLVE_QUEUE', DEFAULT_QUEUE_SIZE)),
+            initializer=initializer,
+            initargs=initargs,
+        )
+
+    @property
+    def executor(self) -> Executor:
+        """The underlying executor, started on first use."""
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=self.initializer, initargs=self.initargs
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='av-solve'
+                    )
+            return self._executor
+
+    def _retry_after(self) -> int:
+        """Seconds until a queue slot is likely free, from the mean solve time."""
+        mean_solve = self._solve_total / self._completed if self._completed else 1.0
+        waiting = max(self._in_flight - self.workers, 0) + 1
+        return max(math.ceil(mean_solve * waiting / self.workers), 1)
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Run func(*args) on a worker and await its result.
+
+        With a process pool, func, its arguments and its result must be
+        picklable, and mutations func makes to its arguments are not seen
+        by the caller.
+
+        Raises:
+            SolvePoolFull: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                self._rejected += 1
+                raise SolvePoolFull(self._retry_after())
+            self._in_flight += 1
+
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(self.executor, _timed_call, func, args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        finished = time.time()
+        wait = max(started - submitted, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._solve_total += finished - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and cumulative wait/solve times."""
+        with self._lock:
+            completed = self._completed
+            return {
+                'executor': self.kind,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'running': min(self._in_flight, self.workers),
+                'queued': max(self._in_flight - self.workers, 0),
+                'completed': completed,
+                'rejected': self._rejected,
+                'wait_ms_mean': self._wait_total / completed * 1000 if completed else 0.0,
+                'wait_ms_max': self._wait_max * 1000,
+                'solve_ms_mean': self._solve_total / completed * 1000 if completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the executor; the next solve starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -6,11 +6,37 @@ Main exports:
 - calculate_av: Main calculation function
 - PlanDesign: Data class for plan parameters
 - ContinuanceTable: Data class for continuance tables
+- get_adjusted_table: Cost trend / area factor adjusted table views
+- warm_start: Memory-map compiled continuance tables ahead of first use
+
+Exports are imported on first access, so ``import av_calculator`` does not
+pull in NumPy or the engines until something is actually used.
 """
 
-from .calculator import calculate_av
-from .models import PlanDesign, ContinuanceTable, AVResult
-from .continuance import load_continuance_tables, get_continuance_table
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .calculator import calculate_av
+    from .models import PlanDesign, ContinuanceTable, AVResult
+    from .continuance import (
+        load_continuance_tables,
+        get_continuance_table,
+        get_adjusted_table,
+        warm_start,
+    )
+
+# Exported name -> submodule that defines it
+_LAZY_EXPORTS = {
+    'calculate_av': 'calculator',
+    'PlanDesign': 'models',
+    'ContinuanceTable': 'models',
+    'AVResult': 'models',
+    'load_continuance_tables': 'continuance',
+    'get_continuance_table': 'continuance',
+    'get_adjusted_table': 'continuance',
+    'warm_start': 'continuance',
+}
 
 __all__ = [
     'calculate_av',
@@ -19,6 +45,21 @@ __all__ = [
     'AVResult',
     'load_continuance_tables',
     'get_continuance_table',
+    'get_adjusted_table',
+    'warm_start',
 ]
 
 __version__ = '1.0.0'
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
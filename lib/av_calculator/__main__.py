@@ -0,0 +1,32 @@
+"""
+Command-line interface for the AV calculator.
+
+Usage:
+    python -m av_calculator batch plans.csv --out results.jsonl
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from . import batch
+
+
+COMMANDS = {
+    'batch': (batch, "Calculate AV for a file of plan designs"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Dispatch to a subcommand."""
+    parser = argparse.ArgumentParser(prog='python -m av_calculator', description="2026 AV Calculator")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (module, help_text) in COMMANDS.items():
+        module.add_arguments(subparsers.add_parser(name, help=help_text, description=help_text))
+
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command][0].run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Streaming batch AV calculation over plan files.
+
+Reads plan rows from CSV, JSONL or Parquet, solves them in chunks with the
+vectorized engine (optionally across worker processes), and writes one
+result per row, in input order, to CSV or JSONL. Only a bounded number of
+chunks is held in memory at once, whatever the file size.
+
+Input rows use the calculate_av plan_params keys: deductible, moop and
+coinsurance (required), and metal_tier, family_deductible, family_moop,
+embedded_deductible, hsa_contribution, trend_factor, area_factor,
+plan_year and service_params (optional). In CSV files
+service_params is a JSON object. An optional ``id`` column is copied to the
+output. Rows that cannot be parsed or solved get an ``error`` instead of a
+result; the rest of the batch is unaffected. With --explain each result
+also carries its per-service attribution of plan payment (a JSON column in
+CSV output), and with --family-size N each result carries the plan's
+family-tier AV for families of N members.
+
+Usage:
+    python -m av_calculator batch plans.csv --out results.jsonl --workers 4
+    python -m av_calculator batch plans.csv --out results.jsonl --explain
+    python -m av_calculator batch plans.csv --out results.csv --family-size 3
+    python -m av_calculator batch plans.csv --out results.csv --profile batch.collapsed
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .vectorized import calculate_av_batch
+from .profiling import profile_call
+
+
+DEFAULT_CHUNK_SIZE = 4096
+FORMATS = ('csv', 'jsonl', 'parquet')
+OUTPUT_FORMATS = ('csv', 'jsonl')
+
+_SUFFIX_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+
+
+def _parse_bool(text: str) -> bool:
+    value = text.strip().lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"not a boolean: {text!r}")
+
+
+# Plan parameter parsers for text (CSV) input
+_FIELD_TYPES = {
+    'deductible': float,
+    'moop': float,
+    'coinsurance': float,
+    'family_deductible': float,
+    'family_moop': float,
+    'embedded_deductible': _parse_bool,
+    'hsa_contribution': float,
+    'trend_factor': float,
+    'area_factor': float,
+    'plan_year': int,
+    'metal_tier': str,
+    'service_params': json.loads,
+}
+
+CSV_RESULT_COLUMNS = [
+    'row', 'id', 'av', 'av_percent', 'metal_tier', 'total_plan_payment',
+    'below_deductible', 'deductible_to_moop', 'above_moop',
+    'adjusted_deductible', 'adjusted_moop', 'iterations_outer', 'iterations_inner',
+    'warnings', 'error',
+]
+
+# Appended to CSV_RESULT_COLUMNS with --family-size
+CSV_FAMILY_COLUMNS = ['family_av', 'family_plan_payment']
+
+
+@dataclass
+class PlanRow:
+    """
+    One input row: plan_params, or the error that prevented parsing it.
+
+    id is the row's raw id column, kept even when the row fails to parse.
+    """
+    index: int
+    params: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    id: Optional[Any] = None
+
+
+def detect_format(path: Path, default: str = 'jsonl') -> str:
+    """Infer the file format from its suffix."""
+    return _SUFFIX_FORMATS.get(Path(path).suffix.lower(), default)
+
+
+# ============================================================================
+# READERS
+# ============================================================================
+
+def _parse_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert CSV text fields to plan_params, skipping empty cells."""
+    params = {}
+    for key, value in row.items():
+        if key is None or value is None or value.strip() == '':
+            continue
+        parse = _FIELD_TYPES.get(key)
+        try:
+            params[key] = parse(value) if parse is not None else value
+        except ValueError as e:
+            raise ValueError(f"Invalid {key}: {value!r}") from e
+    return params
+
+
+# Readers yield (raw id, plan_params or the ValueError that rejected the row)
+
+def _read_csv(f: TextIO) -> Iterator[Tuple[Any, Any]]:
+    for row in csv.DictReader(f):
+        row_id = (row.get('id') or '').strip() or None
+        try:
+            yield row_id, _parse_csv_row(row)
+        except ValueError as e:
+            yield row_id, e
+
+
+def _read_jsonl(f: TextIO) -> Iterator[Tuple[Any, Any]]:
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            params = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(params, dict):
+            yield None, ValueError("Row is not a JSON object")
+            continue
+        yield params.get('id'), params
+
+
+def _read_parquet(path: Path, batch_size: int) -> Iterator[Tuple[Any, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required for Parquet input: pip install pyarrow") from e
+
+    parquet_file = pq.ParquetFile(path)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        for params in record_batch.to_pylist():
+            params = {key: value for key, value in params.items() if value is not None}
+            if isinstance(params.get('service_params'), str):
+                try:
+                    params['service_params'] = json.loads(params['service_params'])
+                except json.JSONDecodeError as e:
+                    yield params.get('id'), ValueError(f"Invalid service_params: {e}")
+                    continue
+            yield params.get('id'), params
+
+
+def read_plans(path: Path, fmt: Optional[str] = None,
+               batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[PlanRow]:
+    """
+    Stream plan rows from a file ('-' reads JSONL/CSV from stdin).
+
+    Args:
+        path: Input file
+        fmt: 'csv', 'jsonl' or 'parquet' (default: from the file suffix)
+        batch_size: Parquet record batch size
+
+    Yields:
+        PlanRow per input row, numbered from 0
+
+    Raises:
+        ValueError: If the format is unknown
+        ImportError: If Parquet input is requested without pyarrow
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown input format: {fmt}")
+
+    if fmt == 'parquet':
+        rows: Iterable = _read_parquet(path, batch_size)
+        yield from _number(rows)
+        return
+
+    if str(path) == '-':
+        yield from _number(_read_csv(sys.stdin) if fmt == 'csv' else _read_jsonl(sys.stdin))
+        return
+
+    with open(path, 'r', newline='') as f:
+        yield from _number(_read_csv(f) if fmt == 'csv' else _read_jsonl(f))
+
+
+def _number(rows: Iterable[Tuple[Any, Any]]) -> Iterator[PlanRow]:
+    for index, (row_id, row) in enumerate(rows):
+        if isinstance(row, Exception):
+            yield PlanRow(index, error=str(row), id=row_id)
+        else:
+            yield PlanRow(index, params=row, id=row_id)
+
+
+def chunked(rows: Iterable[PlanRow], size: int) -> Iterator[List[PlanRow]]:
+    """Group rows into lists of at most size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============================================================================
+# SOLVING
+# ============================================================================
+
+def solve_chunk(rows: List[PlanRow], explain: bool = False,
+                family_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Solve a chunk of rows with the vectorized engine.
+
+    Returns:
+        One record per row, in order: {'row', 'id'?, ...result} or
+        {'row', 'id'?, 'error'}
+    """
+    valid = [row for row in rows if row.error is None]
+    batch = calculate_av_batch([row.params for row in valid], explain=explain,
+                               family_size=family_size) if valid else None
+    solved = iter(batch.to_dicts()) if batch is not None else iter(())
+
+    records = []
+    for row in rows:
+        record: Dict[str, Any] = {'row': row.index}
+        if row.id is not None:
+            record['id'] = row.id
+        if row.error is not None:
+            record['error'] = row.error
+        else:
+            record.update(next(solved))
+        records.append(record)
+    return records
+
+
+def solve_stream(rows: Iterable[PlanRow], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: int = 0, explain: bool = False,
+                 family_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Solve a stream of rows, yielding result records in input order.
+
+    With workers > 0, chunks are solved in that many processes, with at
+    most two chunks per worker in flight so memory stays bounded.
+    """
+    chunks = chunked(rows, chunk_size)
+    solve = partial(solve_chunk, explain=explain, family_size=family_size)
+
+    if workers <= 0:
+        for chunk in chunks:
+            yield from solve(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(solve, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+def _csv_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a result record to CSV_RESULT_COLUMNS."""
+    if 'error' in record:
+        return {'row': record['row'], 'id': record.get('id'), 'error': record['error']}
+    return {
+        'row': record['row'],
+        'id': record.get('id'),
+        'av': record['av'],
+        'av_percent': record['av_percent'],
+        'metal_tier': record['metal_tier'],
+        'total_plan_payment': record['total_plan_payment'],
+        'below_deductible': record['breakdown']['below_deductible'],
+        'deductible_to_moop': record['breakdown']['deductible_to_moop'],
+        'above_moop': record['breakdown']['above_moop'],
+        'adjusted_deductible': record['adjusted_values']['deductible'],
+        'adjusted_moop': record['adjusted_values']['moop'],
+        'iterations_outer': record['performance']['iterations_outer'],
+        'iterations_inner': record['performance']['iterations_inner'],
+        'warnings': '; '.join(record['warnings']),
+        **({'family_av': record['family']['av'],
+            'family_plan_payment': record['family']['total_plan_payment']} if 'family' in record else {}),
+        **({'explanation': json.dumps(record['explanation'])} if 'explanation' in record else {}),
+    }
+
+
+def write_results(records: Iterable[Dict[str, Any]], f: TextIO, fmt: str = 'jsonl',
+                  explain: bool = False, family: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Write records as they arrive, passing each one through.
+
+    With family, CSV output gets the CSV_FAMILY_COLUMNS; with explain, a
+    trailing 'explanation' JSON column.
+
+    Raises:
+        ValueError: If the output format is unknown
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    if fmt == 'csv':
+        fieldnames = (CSV_RESULT_COLUMNS + (CSV_FAMILY_COLUMNS if family else [])
+                      + (['explanation'] if explain else []))
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(_csv_record(record))
+            yield record
+    else:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+            yield record
+
+
+class Progress:
+    """Periodic rows/s readout on stderr."""
+
+    def __init__(self, enabled: bool = True, interval: float = 1.0, stream: TextIO = sys.stderr):
+        self.enabled = enabled
+        self.interval = interval
+        self.stream = stream
+        self.rows = 0
+        self.errors = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, record: Dict[str, Any]) -> None:
+        self.rows += 1
+        self.errors += 'error' in record
+        if self.enabled:
+            now = time.perf_counter()
+            if now - self._last >= self.interval:
+                self._last = now
+                self._print(now, end='\r')
+
+    def finish(self) -> None:
+        if self.enabled:
+            self._print(time.perf_counter(), end='\n')
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def _print(self, now: float, end: str) -> None:
+        rate = self.rows / (now - self.start) if now > self.start else 0.0
+        print(f"{self.rows} rows  {rate:,.1f} rows/s  {self.errors} errors",
+              end=end, file=self.stream, flush=True)
+
+
+def run_batch(input_path: Path, output: TextIO, input_format: Optional[str] = None,
+              output_format: str = 'jsonl', chunk_size: int = DEFAULT_CHUNK_SIZE,
+              workers: int = 0, progress: bool = True, explain: bool = False,
+              family_size: Optional[int] = None) -> Progress:
+    """
+    Solve every plan in a file and stream the results to output.
+
+    Returns:
+        The Progress tracker, holding final row and error counts
+    """
+    tracker = Progress(enabled=progress)
+    rows = read_plans(input_path, input_format, batch_size=chunk_size)
+    records = solve_stream(rows, chunk_size=chunk_size, workers=workers, explain=explain,
+                           family_size=family_size)
+    for record in write_results(records, output, output_format, explain=explain,
+                                family=family_size is not None):
+        tracker.update(record)
+    tracker.finish()
+    return tracker
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the batch command's arguments."""
+    parser.add_argument('input', type=Path, help="Plan file (CSV, JSONL or Parquet; '-' for stdin)")
+    parser.add_argument('--out', type=Path, default=None, help="Result file (default: stdout)")
+    parser.add_argument('--input-format', choices=FORMATS, default=None,
+                        help="Input format (default: from the file suffix)")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=None,
+                        help="Output format (default: from the --out suffix, else jsonl)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Plans solved per vectorized chunk (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Worker processes (default 0: solve in this process)")
+    parser.add_argument('--quiet', action='store_true', help="No progress readout")
+    parser.add_argument('--explain', action='store_true',
+                        help="Attribute each plan's payment to service codes")
+    parser.add_argument('--family-size', type=_positive_int, default=None, metavar='N',
+                        help="Also calculate family-tier AV for families of N members")
+    parser.add_argument('--profile', type=Path, default=None, metavar='FILE',
+                        help="Profile the run (in process), write collapsed stacks to FILE "
+                             "and print the hot functions")
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the batch command; returns the exit status."""
+    output_format = args.output_format or (detect_format(args.out) if args.out else 'jsonl')
+    workers = args.workers
+    if args.profile and workers:
+        print("--profile solves in process; ignoring --workers", file=sys.stderr)
+        workers = 0
+
+    def solve(output: TextIO) -> Progress:
+        return run_batch(args.input, output, args.input_format, output_format,
+                         args.chunk_size, workers, progress=not args.quiet, explain=args.explain,
+                         family_size=args.family_size)
+
+    with (open(args.out, 'w', newline='') if args.out else contextlib.nullcontext(sys.stdout)) as f:
+        if args.profile:
+            tracker, report = profile_call(solve, f)
+            report.write_collapsed(args.profile)
+            print(report.format(), file=sys.stderr)
+            print(f"Collapsed stacks written to {args.profile}", file=sys.stderr)
+        else:
+            tracker = solve(f)
+
+    if not args.quiet:
+        print(f"Solved {tracker.rows} rows ({tracker.errors} errors) in {tracker.elapsed:.2f}s",
+              file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Calculate AV for a file of plan designs")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Compiled continuance table bundles.
+
+A bundle is a directory holding one ``.npy`` matrix per table plus a
+``manifest.json`` describing column order, row counts and checksums. Each
+matrix is stored column-major (one row per table column) so every column is
+a contiguous slice that can be memory-mapped without copying.
+
+Layout:
+    <vintage_dir>/compiled/manifest.json
+    <vintage_dir>/compiled/silver_combined.npy
+    ...
+
+Usage:
+    python -m av_calculator.bundle data/continuance-tables --plan-year 2026
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .models import ContinuanceTable
+from .constants import (
+    METAL_TIERS,
+    TABLE_TYPES,
+    CORE_COLUMNS,
+    SERVICE_COLUMN_MAPPING,
+    BUNDLE_DIRNAME,
+    BUNDLE_FORMAT_VERSION,
+)
+from .utils import parse_table_value
+
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def table_key(metal_tier: str, table_type: str) -> str:
+    """Build the bundle key for a table, e.g. 'silver_combined'."""
+    return f"{metal_tier.lower()}_{table_type}"
+
+
+def compile_table_json(file_path: Path) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse a continuance table JSON file into a column-major matrix.
+
+    Args:
+        file_path: Path to a table JSON file (e.g., silver_combined.json)
+
+    Returns:
+        Tuple of (column names, float64 matrix of shape (columns, rows))
+    """
+    with open(file_path, 'r') as f:
+        data = json.load(f)
+
+    rows = data['data']
+    columns = data.get('columns') or list(rows[0].keys())
+
+    matrix = np.zeros((len(columns), len(rows)))
+    for j, column in enumerate(columns):
+        for i, row in enumerate(rows):
+            matrix[j, i] = parse_table_value(column, row.get(column))
+
+    return columns, matrix
+
+
+def write_bundle(
+    out_dir: Path,
+    plan_year: int,
+    tables: Dict[str, Tuple[List[str], np.ndarray]],
+    source: Optional[str] = None,
+) -> dict:
+    """
+    Write compiled tables and a manifest to a bundle directory.
+
+    Args:
+        out_dir: Bundle directory to create or overwrite
+        plan_year: Plan year of this vintage
+        tables: Mapping of table key to (column names, column-major matrix)
+        source: Optional description of where the tables came from
+
+    Returns:
+        The manifest dictionary that was written
+    """
+    import hashlib  # Only needed when writing; keeps table loading imports light
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = {}
+    for key in sorted(tables):
+        columns, matrix = tables[key]
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        file_name = f"{key}.npy"
+        np.save(out_dir / file_name, matrix, allow_pickle=False)
+
+        entries[key] = {
+            'file': file_name,
+            'columns': list(columns),
+            'row_count': int(matrix.shape[1]),
+            'sha256': hashlib.sha256((out_dir / file_name).read_bytes()).hexdigest(),
+        }
+
+    checksum = hashlib.sha256(
+        ''.join(f"{key}:{entry['sha256']}\n" for key, entry in entries.items()).encode()
+    ).hexdigest()
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'plan_year': plan_year,
+        'source': source,
+        'compiled_at': datetime.now(timezone.utc).isoformat(),
+        'checksum': checksum,
+        'tables': entries,
+    }
+
+    with open(out_dir / MANIFEST_FILENAME, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def compile_bundle(source_dir: Path, plan_year: int, out_dir: Optional[Path] = None) -> dict:
+    """
+    Compile every table JSON in a vintage directory into a bundle.
+
+    Args:
+        source_dir: Directory holding <tier>_<type>.json files
+        plan_year: Plan year of this vintage
+        out_dir: Bundle directory (default: <source_dir>/compiled)
+
+    Returns:
+        The manifest dictionary that was written
+    """
+    source_dir = Path(source_dir)
+    out_dir = Path(out_dir) if out_dir is not None else source_dir / BUNDLE_DIRNAME
+
+    tables = {}
+    for metal_tier in METAL_TIERS:
+        for table_type in TABLE_TYPES:
+            key = table_key(metal_tier, table_type)
+            file_path = source_dir / f"{key}.json"
+            if file_path.exists():
+                tables[key] = compile_table_json(file_path)
+
+    if not tables:
+        raise FileNotFoundError(f"No continuance table JSON files found in {source_dir}")
+
+    return write_bundle(out_dir, plan_year, tables, source=str(source_dir.name))
+
+
+def read_manifest(bundle_dir: Path) -> Optional[dict]:
+    """Read a bundle manifest, or return None if the directory has no bundle."""
+    manifest_path = Path(bundle_dir) / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported bundle format {manifest.get('format_version')} in {bundle_dir}"
+        )
+
+    return manifest
+
+
+def load_bundle_matrix(bundle_dir: Path, entry: dict) -> np.ndarray:
+    """Memory-map a compiled table matrix read-only."""
+    return np.load(Path(bundle_dir) / entry['file'], mmap_mode='r', allow_pickle=False)
+
+
+def load_table_from_bundle(
+    bundle_dir: Path,
+    manifest: dict,
+    metal_tier: str,
+    table_type: str,
+) -> ContinuanceTable:
+    """
+    Build a ContinuanceTable whose columns are views into a memory-mapped matrix.
+
+    No column data is read from disk until the engine touches it.
+
+    Args:
+        bundle_dir: Bundle directory
+        manifest: Manifest returned by read_manifest
+        metal_tier: Bronze, Silver, Gold, or Platinum
+        table_type: 'med', 'rx', or 'combined'
+
+    Returns:
+        ContinuanceTable backed by the memory-mapped bundle
+
+    Raises:
+        FileNotFoundError: If the bundle does not contain this table
+    """
+    key = table_key(metal_tier, table_type)
+    entry = manifest['tables'].get(key)
+    if entry is None:
+        raise FileNotFoundError(f"Table {key} not found in bundle {bundle_dir}")
+
+    matrix = load_bundle_matrix(bundle_dir, entry)
+    index = {column: j for j, column in enumerate(entry['columns'])}
+
+    def column_loader(names: List[str]) -> Dict[str, np.ndarray]:
+        missing = [name for name in names if name not in index]
+        if missing:
+            raise KeyError(f"Columns not found in bundle table {key}: {missing}")
+        return {name: np.asarray(matrix[index[name]]) for name in names}
+
+    columns = column_loader(list(CORE_COLUMNS))
+    services = {}
+    for col_name, service_code in SERVICE_COLUMN_MAPPING.items():
+        if col_name in index:
+            columns.update(column_loader([col_name]))
+            services[service_code] = columns[col_name]
+
+    return ContinuanceTable(
+        metal_tier=metal_tier,
+        table_type=table_type,
+        up_to=columns[CORE_COLUMNS[0]],
+        pct_enrollees=columns[CORE_COLUMNS[1]],
+        maxd=columns[CORE_COLUMNS[2]],
+        bucket=columns[CORE_COLUMNS[3]],
+        services=services,
+        columns=columns,
+        column_loader=column_loader,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Compile a vintage directory of table JSON files into a bundle."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile continuance tables into a bundle")
+    parser.add_argument('source_dir', type=Path, help="Directory with <tier>_<type>.json files")
+    parser.add_argument('--plan-year', type=int, required=True, help="Plan year of this vintage")
+    parser.add_argument('--out', type=Path, default=None, help="Bundle directory")
+    args = parser.parse_args(argv)
+
+    manifest = compile_bundle(args.source_dir, args.plan_year, args.out)
+    print(f"Compiled {len(manifest['tables'])} tables (checksum {manifest['checksum'][:12]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,21 +6,32 @@ Implements the nested convergence algorithm for Path 1 (Combined Deductible/MOOP
 
 import math
 import time
+from time import perf_counter_ns
 from typing import Optional
 
-from .models import PlanDesign, ContinuanceTable, AVResult, Accumulators
-from .continuance import get_continuance_table
+from .models import PlanDesign, ContinuanceTable, AVResult, Accumulators, ServiceAttribution
+from .continuance import get_adjusted_table
 from .services import process_all_services
 from .utils import (
     get_continuance_table_row,
     compute_row_value,
+    attribute_above_moop,
+    hsa_funding_used,
     determine_metal_tier,
     validate_plan_design,
 )
 from .constants import MAX_ITERATIONS, TOLERANCE, COINSURANCE_DAMPING
+from .tracing import Tracer, NULL_TRACER, ITERATION_HISTOGRAM
+from .metrics import PhaseTimings, METRICS
 
 
-def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVResult:
+def calculate_av_combined(
+    plan: PlanDesign,
+    cont_table: ContinuanceTable,
+    tracer: Optional[Tracer] = None,
+    timings: Optional[PhaseTimings] = None,
+    explain: bool = False,
+) -> AVResult:
     """
     Calculate Actuarial Value for a plan with combined medical+drug deductible and MOOP.
 
@@ -31,6 +42,9 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
     Args:
         plan: PlanDesign object with all parameters
         cont_table: ContinuanceTable with spending distributions
+        tracer: Optional convergence tracer (default: no tracing)
+        timings: Optional PhaseTimings to fill (default: only when metrics are enabled)
+        explain: Attribute plan payment in each range to service codes
 
     Returns:
         AVResult object with calculated AV and breakdown
@@ -52,6 +66,12 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
     """
     start_time = time.time()
     warnings = validate_plan_design(plan)
+    if tracer is None:
+        tracer = NULL_TRACER
+    tracing = tracer.enabled
+    if timings is None and METRICS.enabled:
+        timings = PhaseTimings()
+    timing = timings is not None
 
     # ========================================================================
     # STEP 1: INITIALIZE VARIABLES
@@ -76,14 +96,20 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
     iter_deduct = 0
     total_iter_coins = 0
     num_inner_loops = 0
+    sweeps = 0
 
     # Initialize accumulators (will be updated in loops)
     accumulators = Accumulators()
 
+    # Per-service plan payment from the latest sweep, when explaining
+    sweep_by_service = {} if explain else None
+
     # ========================================================================
     # STEP 2: OUTER LOOP - DEDUCTIBLE/MOOP ADJUSTMENT
     # ========================================================================
 
+    if timing:
+        outer_start = perf_counter_ns()
 
     while iter_deduct <= MAX_ITERATIONS:
 
@@ -102,6 +128,8 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
         # ====================================================================
 
         iter_coins = 0
+        if timing:
+            inner_start = perf_counter_ns()
 
         while iter_coins <= MAX_ITERATIONS:
 
@@ -134,7 +162,13 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
             # STEP 6: PROCESS ALL SERVICES AT DEDUCTIBLE LEVEL
             # ================================================================
 
-            process_all_services(cont_table, plan, deduct_row, accumulators)
+            if timing:
+                sweep_start = perf_counter_ns()
+                process_all_services(cont_table, plan, deduct_row, accumulators, sweep_by_service)
+                timings.phase_ns['service_sweep'] += perf_counter_ns() - sweep_start
+            else:
+                process_all_services(cont_table, plan, deduct_row, accumulators, sweep_by_service)
+            sweeps += 1
 
             # ================================================================
             # STEP 7: CALCULATE ACHIEVED COINSURANCE RATE
@@ -162,6 +196,9 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
                 coins = (COINSURANCE_DAMPING * coins +
                         (1 - COINSURANCE_DAMPING) * actual_coins_achieved)
 
+            if tracing:
+                tracer.inner(iter_deduct, iter_coins, coins, actual_coins_achieved)
+
             # ================================================================
             # STEP 10: CHECK INNER LOOP CONVERGENCE
             # ================================================================
@@ -174,6 +211,8 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
         # End of inner loop
         total_iter_coins += iter_coins
         num_inner_loops += 1
+        if timing:
+            timings.phase_ns['inner_loop'] += perf_counter_ns() - inner_start
 
         # ====================================================================
         # STEP 11: CALCULATE MOOP ADJUSTMENT
@@ -209,14 +248,9 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
         # STEP 13: ADJUST DEDUCTIBLE TARGET IF NEEDED (VBA lines 2122-2131)
         # ====================================================================
 
-        # Debug output for first few iterations
-        if iter_deduct < 3:
-            print(f"\n--- Outer iteration {iter_deduct} ---")
-            print(f"  deduct_target: ${deduct_target:,.2f}")
-            print(f"  adjusted_deduct: ${adjusted_deduct:,.2f}")
-            print(f"  adjusted_moop: ${adjusted_moop:,.2f}")
-            print(f"  total_beneficiary_pay: ${total_beneficiary_pay:,.2f}")
-            print(f"  Inner iterations: {iter_coins}")
+        if tracing:
+            tracer.outer(iter_deduct, deduct_target, adjusted_deduct, adjusted_moop,
+                         total_beneficiary_pay, moop_target, iter_coins)
 
         # If beneficiary would pay more than MOOP, adjust deductible target
         if total_beneficiary_pay > moop_target or (adjusted_deduct > 0 and coins == 0) or deduct_eq_moop:
@@ -244,6 +278,10 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
         iter_deduct += 1
 
     # End of outer loop
+    if timing:
+        range_start = perf_counter_ns()
+        timings.phase_ns['outer_loop'] += range_start - outer_start
+    range_lookups = 2
 
     # If loop didn't run, ensure adjusted_deduct is set properly
     if iter_deduct == 0 and adjusted_deduct < 0:
@@ -253,9 +291,12 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
     # Scale by ratio of expected cost at deductible to total cost processed
     if accumulators.total_pay > 0:
         deduct_row = get_continuance_table_row(cont_table.up_to, adjusted_deduct)
+        range_lookups += 1
         ded_maxd = compute_row_value(cont_table.maxd, deduct_row)
+        below_scale = ded_maxd / accumulators.total_pay
         accumulators.plan_pay = ded_maxd * accumulators.plan_pay / accumulators.total_pay
     else:
+        below_scale = 0.0
         accumulators.plan_pay = 0.0
 
     # ========================================================================
@@ -267,6 +308,7 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
 
     # Range 2: Deductible to MOOP
     plan_pay_deduct_to_moop = 0.0
+    range_by_service = {}
 
     moop_row = get_continuance_table_row(cont_table.up_to, adjusted_moop)
     deduct_row = get_continuance_table_row(cont_table.up_to, adjusted_deduct)
@@ -281,16 +323,34 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
             service_coinsurance = plan.get_service_coinsurance(service_code)
 
             # Plan pays (1 - coinsurance) of costs in this range
-            plan_pay_deduct_to_moop += cost_in_range * (1 - service_coinsurance)
+            plan_pay = cost_in_range * (1 - service_coinsurance)
+            plan_pay_deduct_to_moop += plan_pay
+            range_by_service[service_code] = plan_pay
 
     # Range 3: Above MOOP (plan pays 100%)
     total_cost_at_moop = compute_row_value(cont_table.maxd, moop_row)
     plan_pay_above_moop = total_expected_cost - total_cost_at_moop
 
+    explanation = None
+    if explain:
+        codes = [code for code, data in cont_table.services.items() if data is not None and len(data) > 0]
+        explanation = ServiceAttribution(
+            below_deductible={code: float(sweep_by_service.get(code, 0.0) * below_scale) for code in codes},
+            deductible_to_moop={code: float(range_by_service.get(code, 0.0)) for code in codes},
+            above_moop=attribute_above_moop(cont_table, moop_row, plan_pay_above_moop),
+        )
+
+    # Employer HSA/HRA dollars spent on cost-sharing count as plan payment
+    plan_pay_hsa = hsa_funding_used(
+        cont_table, plan.hsa_contribution, adjusted_deduct, adjusted_moop,
+        plan_pay_below_deduct, plan_pay_deduct_to_moop,
+    )
+
     # Total plan payment
     total_plan_pay = (plan_pay_below_deduct +
                      plan_pay_deduct_to_moop +
-                     plan_pay_above_moop)
+                     plan_pay_above_moop +
+                     plan_pay_hsa)
 
     # ========================================================================
     # STEP 15: CALCULATE FINAL AV
@@ -307,6 +367,15 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
     # Calculate performance metrics
     calc_time = (time.time() - start_time) * 1000  # Convert to milliseconds
     avg_inner_iterations = total_iter_coins / num_inner_loops if num_inner_loops > 0 else 0
+    ITERATION_HISTOGRAM.record(iter_deduct, int(avg_inner_iterations))
+    if timing:
+        timings.phase_ns['range_integration'] += perf_counter_ns() - range_start
+        timings.counters['sweeps'] += sweeps
+        timings.counters['row_lookups'] += sweeps + range_lookups
+        if METRICS.enabled:
+            METRICS.record(timings)
+    if tracing:
+        tracer.finish()
 
     # Create result object
     return AVResult(
@@ -320,10 +389,13 @@ def calculate_av_combined(plan: PlanDesign, cont_table: ContinuanceTable) -> AVR
         plan_pay_above_moop=plan_pay_above_moop,
         adjusted_deductible=adjusted_deduct,
         adjusted_moop=adjusted_moop,
+        plan_pay_hsa=plan_pay_hsa,
         iterations_outer=iter_deduct,
         iterations_inner=int(avg_inner_iterations),
         calculation_time=calc_time,
         warnings=warnings,
+        timings=timings,
+        explanation=explanation,
     )
 
 
@@ -342,6 +414,13 @@ def calculate_av(plan_params: dict) -> dict:
             - metal_tier: str (optional, default 'Silver')
             - service_params: dict (optional, service-specific overrides)
             - hsa_contribution: float (optional, default 0.0)
+            - trend_factor: float (optional, multiplicative cost trend, default 1.0)
+            - area_factor: float (optional, regional cost adjustment, default 1.0)
+            - plan_year: int (optional, continuance table vintage, default 2026)
+            - timings: bool (optional, include per-phase timings in the result)
+            - explain: bool (optional, attribute plan payment to services under 'explanation')
+            - profile: bool (optional, profile the calculation; summary under 'profile')
+            - profile_file: str (optional, with profile: write collapsed stacks here)
 
     Returns:
         Dictionary with AV result and breakdown
@@ -358,6 +437,10 @@ def calculate_av(plan_params: dict) -> dict:
         ... })
         >>> print(f"AV: {result['av_percent']}%")
     """
+    if plan_params.get('profile'):
+        from .profiling import profile_calculation  # cProfile only when asked for
+        return profile_calculation(calculate_av, plan_params)
+
     # Create PlanDesign object from parameters
     plan = PlanDesign(
         deductible=plan_params['deductible'],
@@ -368,11 +451,25 @@ def calculate_av(plan_params: dict) -> dict:
         service_params=plan_params.get('service_params', {}),
     )
 
-    # Load continuance table
-    cont_table = get_continuance_table(plan.metal_tier, 'combined')
+    timings = PhaseTimings() if plan_params.get('timings') or METRICS.enabled else None
+    if timings is not None:
+        fetch_start = perf_counter_ns()
+
+    # Load continuance table (cost-adjusted view if trend/area factors given)
+    cont_table = get_adjusted_table(
+        plan.metal_tier,
+        'combined',
+        trend_factor=plan_params.get('trend_factor', 1.0),
+        area_factor=plan_params.get('area_factor', 1.0),
+        plan_year=plan_params.get('plan_year'),
+    )
+
+    if timings is not None:
+        timings.phase_ns['table_fetch'] += perf_counter_ns() - fetch_start
 
     # Calculate AV
-    result = calculate_av_combined(plan, cont_table)
+    result = calculate_av_combined(plan, cont_table, timings=timings,
+                                   explain=plan_params.get('explain', False))
 
     # Return as dictionary
     return result.to_dict()
@@ -6,19 +6,25 @@ based on direct mapping from the VBA code.
 """
 
 import math
-import json
 import warnings
-from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple
 import time
+from time import perf_counter_ns
 
-from .models import PlanDesign, ContinuanceTable, AVResult, Accumulators, TableRow
-from .continuance import get_continuance_table
+from .models import PlanDesign, ContinuanceTable, AVResult, Accumulators, ServiceAttribution, TableRow
+from .continuance import get_adjusted_table
 from .utils import (
     get_continuance_table_row,
     compute_row_value,
+    attribute_above_moop,
+    hsa_funding_used,
     determine_metal_tier,
 )
+from .constants import MAX_BENEFIT_THRESHOLD
+from .thresholds import ThresholdValues, get_threshold_arrays
+from .tracing import Tracer, make_tracer, ITERATION_HISTOGRAM
+from .metrics import PhaseTimings, METRICS
 
 
 # ============================================================================
@@ -50,6 +56,20 @@ class ServiceConfig:
     copay_after_deductible: bool = False  # CAD flag
     subject_to_deductible: bool = True    # STD flag
     subject_to_coinsurance: bool = True   # STC flag
+    first_visits: int = 0  # PC only: first N visits at first_visits_copay, not subject to deductible
+    first_visits_copay: float = 0.0
+    per_day_limit: int = 0  # IP only: copay charged per day for days 1..N
+
+    def __post_init__(self):
+        """Validate threshold benefit settings."""
+        if not 0 <= self.first_visits <= MAX_BENEFIT_THRESHOLD:
+            raise ValueError(f"first_visits must be between 0 and {MAX_BENEFIT_THRESHOLD}")
+        if not 0 <= self.per_day_limit <= MAX_BENEFIT_THRESHOLD:
+            raise ValueError(f"per_day_limit must be between 0 and {MAX_BENEFIT_THRESHOLD}")
+        if self.first_visits and self.code != 'PC':
+            raise ValueError("first_visits is only supported for primary care (PC)")
+        if self.per_day_limit and self.code != 'IP':
+            raise ValueError("per_day_limit is only supported for inpatient (IP)")
 
     def process_below_deductible(self, cost: float, freq: float) -> Tuple[float, float, float]:
         """Process service cost-sharing below deductible.
@@ -116,67 +136,17 @@ class ServiceConfig:
 
         return plan_pay, bene_pay
 
+    def process_first_visits(self, cost: float, freq: float) -> Tuple[float, float]:
+        """Process the first-N-visits portion of a visit-threshold benefit.
 
-# ============================================================================
-# CONVERGENCE TRACKER
-# ============================================================================
+        These visits are covered at first_visits_copay regardless of the
+        deductible, and the copay does not count toward the deductible.
 
-@dataclass
-class ConvergenceTracker:
-    """Tracks and logs convergence behavior for debugging."""
-
-    verbose: bool = False
-    trace_file: Optional[str] = None
-    iterations: List[Dict] = field(default_factory=list)
-
-    def log_outer_iteration(self, iter_num: int, data: Dict):
-        """Log outer loop state."""
-        entry = {
-            'outer_iter': iter_num,
-            'deduct_target': data.get('deduct_target', 0),
-            'adjusted_deduct': data.get('adjusted_deduct', 0),
-            'adjusted_moop': data.get('adjusted_moop', 0),
-            'total_beneficiary_pay': data.get('total_beneficiary_pay', 0),
-            'moop_target': data.get('moop_target', 0),
-            'convergence_gap': abs(data.get('total_beneficiary_pay', 0) - data.get('moop_target', 0)),
-            'inner_iterations': data.get('inner_iterations', 0),
-        }
-        self.iterations.append(entry)
-
-        if self.verbose:
-            print(f"\n=== Outer Iteration {iter_num} ===")
-            print(f"  Deduct Target: ${entry['deduct_target']:,.2f}")
-            print(f"  Adjusted Deduct: ${entry['adjusted_deduct']:,.2f}")
-            print(f"  Adjusted MOOP: ${entry['adjusted_moop']:,.2f}")
-            print(f"  Total Bene Pay: ${entry['total_beneficiary_pay']:,.2f}")
-            print(f"  MOOP Target: ${entry['moop_target']:,.2f}")
-            print(f"  Convergence Gap: ${entry['convergence_gap']:,.2f}")
-            print(f"  Inner Iterations: {entry['inner_iterations']}")
-
-    def log_inner_iteration(self, outer_iter: int, inner_iter: int, data: Dict):
-        """Log inner loop convergence."""
-        if self.verbose and (inner_iter < 3 or inner_iter % 10 == 0):
-            print(f"    Inner {inner_iter}: coins={data['coins']:.4f}, "
-                  f"actual={data['actual_coins']:.4f}, "
-                  f"gap={abs(data['coins'] - data['actual_coins']):.6f}")
-
-    def save_trace(self):
-        """Save full convergence trace to file."""
-        if self.trace_file:
-            with open(self.trace_file, 'w') as f:
-                json.dump(self.iterations, f, indent=2)
-
-    def get_summary(self) -> Dict:
-        """Get convergence summary statistics."""
-        if not self.iterations:
-            return {}
-
-        return {
-            'total_outer_iterations': len(self.iterations),
-            'total_inner_iterations': sum(it.get('inner_iterations', 0) for it in self.iterations),
-            'final_convergence_gap': self.iterations[-1].get('convergence_gap', 0),
-            'converged': self.iterations[-1].get('convergence_gap', float('inf')) < TOLERANCE,
-        }
+        Returns:
+            Tuple of (plan_pay, beneficiary_pay)
+        """
+        copay_amount = min(cost, freq * self.first_visits_copay)
+        return max(0, cost - copay_amount), copay_amount
 
 
 # ============================================================================
@@ -187,17 +157,22 @@ def process_all_services_v2(
     services: Dict[str, ServiceConfig],
     cont_table: ContinuanceTable,
     deduct_row,  # TableRow object, not int
-    accumulators: Accumulators
+    accumulators: Accumulators,
+    per_service: Optional[Dict[str, float]] = None,
 ) -> None:
     """Process all services at deductible level.
 
-    Implements the service processing loop from VBA lines 1818-2087.
+    Implements the service processing loop from VBA lines 1818-2087. When
+    per_service is given it is filled with each service's plan payment.
     """
     # Reset accumulators for this iteration
     plan_pay_total = 0.0
     bene_pay_to_deduct_total = 0.0
     total_pay_total = 0.0
 
+    # Interpolate all visit/day thresholds at this level in one pass
+    thresholds = _thresholds_at(services, cont_table, deduct_row)
+
     for service_code, service_config in services.items():
         # Get service data from continuance table
         service_data = cont_table.services.get(service_code)
@@ -214,10 +189,34 @@ def process_all_services_v2(
         freq = 1.0
 
         if cost <= 0:
+            if per_service is not None:
+                per_service[service_code] = 0.0
             continue
 
-        # Process service below deductible
-        plan_pay, bene_to_deduct, total_pay = service_config.process_below_deductible(cost, freq)
+        if thresholds is not None and service_config.first_visits:
+            # Visit threshold: first N visits at copay, remainder per service flags
+            n = service_config.first_visits - 1
+            cost_after = min(cost, thresholds.pc_visit_cost[n])
+            freq_after = thresholds.pc_visit_freq[n]
+            first_plan_pay, _ = service_config.process_first_visits(
+                cost - cost_after, max(0.0, thresholds.pc_freq - freq_after)
+            )
+            plan_pay, bene_to_deduct, total_pay = service_config.process_below_deductible(
+                cost_after, freq_after
+            )
+            plan_pay_total += first_plan_pay
+            total_pay_total += cost - cost_after
+            if per_service is not None:
+                per_service[service_code] = first_plan_pay + plan_pay
+        else:
+            if thresholds is not None and service_config.per_day_limit:
+                # Per-day copay: frequency is inpatient days capped at the limit
+                freq = thresholds.ip_days[service_config.per_day_limit - 1]
+
+            # Process service below deductible
+            plan_pay, bene_to_deduct, total_pay = service_config.process_below_deductible(cost, freq)
+            if per_service is not None:
+                per_service[service_code] = plan_pay
 
         # Accumulate
         plan_pay_total += plan_pay
@@ -230,6 +229,19 @@ def process_all_services_v2(
     accumulators.total_pay = total_pay_total
 
 
+def _thresholds_at(
+    services: Dict[str, ServiceConfig],
+    cont_table: ContinuanceTable,
+    table_row: TableRow,
+) -> Optional[ThresholdValues]:
+    """Interpolate threshold arrays at a table position if any service uses them."""
+    if not any(cfg.first_visits or cfg.per_day_limit for cfg in services.values()):
+        return None
+
+    arrays = get_threshold_arrays(cont_table)
+    return arrays.at_row(table_row) if arrays is not None else None
+
+
 def calculate_effective_coinsurance(
     services: Dict[str, ServiceConfig],
     cont_table: ContinuanceTable
@@ -271,7 +283,10 @@ def calculate_av_combined_v2(
     cont_table: ContinuanceTable,
     services: Optional[Dict[str, ServiceConfig]] = None,
     debug: bool = False,
-    trace_file: Optional[str] = None
+    trace_file: Optional[str] = None,
+    tracer: Optional[Tracer] = None,
+    timings: Optional[PhaseTimings] = None,
+    explain: bool = False,
 ) -> AVResult:
     """Calculate Actuarial Value using properly mapped VBA algorithm.
 
@@ -281,9 +296,21 @@ def calculate_av_combined_v2(
     - Service processing: Lines 1818-2087
     - MOOP adjustment: Lines 2105-2120
     - Deductible target adjustment: Lines 2122-2131
+
+    Convergence is reported to ``tracer`` (default: a RingBufferTracer when
+    debug or trace_file is set, otherwise the no-op NullTracer). Per-phase
+    timings are collected into ``timings`` when given, or when the metrics
+    registry is enabled, and attached to the result. With ``explain`` the
+    result carries a ServiceAttribution built from the final sweep and the
+    coinsurance-range pass, without extra solves.
     """
     start_time = time.time()
-    tracker = ConvergenceTracker(verbose=debug, trace_file=trace_file)
+    if tracer is None:
+        tracer = make_tracer(debug, trace_file)
+    tracing = tracer.enabled
+    if timings is None and METRICS.enabled:
+        timings = PhaseTimings()
+    timing = timings is not None
 
     # ========================================================================
     # STEP 1: INITIALIZE VARIABLES (VBA lines 1773-1796)
@@ -315,10 +342,16 @@ def calculate_av_combined_v2(
     # Initialize accumulators
     accumulators = Accumulators()
 
+    # Per-service plan payment from the latest sweep, when explaining
+    sweep_by_service = {} if explain else None
+
     # ========================================================================
     # STEP 2: OUTER LOOP - DEDUCTIBLE/MOOP ADJUSTMENT (VBA lines 1797-2141)
     # ========================================================================
 
+    if timing:
+        outer_start = perf_counter_ns()
+
     # VBA line 1797: Do Until conditions
     while iter_deduct <= MAX_ITERATIONS:
 
@@ -337,6 +370,8 @@ def calculate_av_combined_v2(
         # ====================================================================
 
         iter_coins = 0
+        if timing:
+            inner_start = perf_counter_ns()
 
         while iter_coins <= MAX_ITERATIONS:
 
@@ -358,7 +393,12 @@ def calculate_av_combined_v2(
             deduct_row = get_continuance_table_row(cont_table.up_to, adjusted_deduct)
 
             # Process all services at deductible level (VBA lines 1818-2087)
-            process_all_services_v2(services, cont_table, deduct_row, accumulators)
+            if timing:
+                sweep_start = perf_counter_ns()
+                process_all_services_v2(services, cont_table, deduct_row, accumulators, sweep_by_service)
+                timings.phase_ns['service_sweep'] += perf_counter_ns() - sweep_start
+            else:
+                process_all_services_v2(services, cont_table, deduct_row, accumulators, sweep_by_service)
 
             # Calculate achieved coinsurance rate (VBA lines 2088-2089)
             denominator = accumulators.total_pay
@@ -378,16 +418,15 @@ def calculate_av_combined_v2(
                 coins = (prior_coins + actual_coins_achieved) / 2 * \
                         (1 - math.exp(-iter_coins / TUNING_PARAMETER))
 
-            # Log inner iteration
-            tracker.log_inner_iteration(iter_deduct, iter_coins, {
-                'coins': coins,
-                'actual_coins': actual_coins_achieved,
-            })
+            if tracing:
+                tracer.inner(iter_deduct, iter_coins, coins, actual_coins_achieved)
 
             iter_coins += 1
 
         # End of inner loop
         total_iter_coins += iter_coins
+        if timing:
+            timings.phase_ns['inner_loop'] += perf_counter_ns() - inner_start
 
         # ====================================================================
         # STEP 4: CALCULATE MOOP ADJUSTMENT (VBA lines 2105-2120)
@@ -418,14 +457,9 @@ def calculate_av_combined_v2(
         # ====================================================================
 
         # Log outer iteration before adjustment
-        tracker.log_outer_iteration(iter_deduct, {
-            'deduct_target': deduct_target,
-            'adjusted_deduct': adjusted_deduct,
-            'adjusted_moop': adjusted_moop,
-            'total_beneficiary_pay': total_beneficiary_pay,
-            'moop_target': moop_target,
-            'inner_iterations': iter_coins,
-        })
+        if tracing:
+            tracer.outer(iter_deduct, deduct_target, adjusted_deduct, adjusted_moop,
+                         total_beneficiary_pay, moop_target, iter_coins)
 
         # Check convergence BEFORE adjustment
         # If we've converged, no need to adjust further
@@ -460,6 +494,12 @@ def calculate_av_combined_v2(
         iter_deduct += 1
 
     # End of outer loop
+    if timing:
+        range_start = perf_counter_ns()
+        timings.phase_ns['outer_loop'] += range_start - outer_start
+
+    # Row lookups after convergence, for metrics
+    range_lookups = 0
 
     # ========================================================================
     # STEP 6: RECALCULATE PLAN PAYMENT (VBA lines 2147-2148)
@@ -468,9 +508,12 @@ def calculate_av_combined_v2(
     # This critical step was missing in the original Python implementation!
     if accumulators.total_pay > 0:
         deduct_row = get_continuance_table_row(cont_table.up_to, adjusted_deduct)
+        range_lookups += 1
         ded_maxd = compute_row_value(cont_table.maxd, deduct_row)
+        below_scale = ded_maxd / accumulators.total_pay
         accumulators.plan_pay = ded_maxd * accumulators.plan_pay / accumulators.total_pay
     else:
+        below_scale = 0.0
         accumulators.plan_pay = 0.0
 
     plan_pay_below_deduct = accumulators.plan_pay
@@ -502,6 +545,7 @@ def calculate_av_combined_v2(
     warnings_list = []
 
     plan_pay_deduct_to_moop = 0.0
+    range_by_service = {}
 
     # Check for valid coinsurance range
     if adjusted_moop < plan.deductible:
@@ -515,6 +559,10 @@ def calculate_av_combined_v2(
         # For coinsurance range, we need to use the point where the original deductible is satisfied
         deduct_spending_level = plan.deductible  # Use original deductible amount for coinsurance range start
         deduct_row_for_coins = get_continuance_table_row(cont_table.up_to, deduct_spending_level)
+        range_lookups += 2
+
+        thresholds_at_moop = _thresholds_at(services, cont_table, moop_row)
+        thresholds_at_deduct = _thresholds_at(services, cont_table, deduct_row_for_coins)
 
         for service_code, service_config in services.items():
             service_data = cont_table.services.get(service_code)
@@ -531,46 +579,95 @@ def calculate_av_combined_v2(
 
             cost_in_range = cost_at_moop - cost_at_deduct
 
-            if cost_in_range > 0:
+            if cost_in_range > 0 and thresholds_at_moop is not None and service_config.first_visits:
+                # Split the range into first-N visits and visits beyond N
+                n = service_config.first_visits - 1
+                after_in_range = max(0.0, min(
+                    cost_in_range,
+                    thresholds_at_moop.pc_visit_cost[n] - thresholds_at_deduct.pc_visit_cost[n],
+                ))
+                freq_after = thresholds_at_moop.pc_visit_freq[n] - thresholds_at_deduct.pc_visit_freq[n]
+                freq_first = (thresholds_at_moop.pc_freq - thresholds_at_deduct.pc_freq) - freq_after
+
+                first_plan_pay, _ = service_config.process_first_visits(
+                    cost_in_range - after_in_range, max(0.0, freq_first)
+                )
+                plan_pay, _ = service_config.process_coinsurance_range(after_in_range, max(0.0, freq_after))
+                plan_pay_deduct_to_moop += first_plan_pay + plan_pay
+                range_by_service[service_code] = first_plan_pay + plan_pay
+            elif cost_in_range > 0:
+                if thresholds_at_moop is not None and service_config.per_day_limit:
+                    n = service_config.per_day_limit - 1
+                    freq_in_range = max(0.0, thresholds_at_moop.ip_days[n] - thresholds_at_deduct.ip_days[n])
+
                 plan_pay, _ = service_config.process_coinsurance_range(cost_in_range, freq_in_range)
                 plan_pay_deduct_to_moop += plan_pay
+                range_by_service[service_code] = plan_pay
 
     # ========================================================================
     # STEP 9: CALCULATE ABOVE MOOP (Plan pays 100%)
     # ========================================================================
 
     if deduct_eq_moop:
-        total_cost_at_moop = compute_row_value(cont_table.maxd, deduct_row)
+        moop_row = deduct_row
     else:
         moop_row = get_continuance_table_row(cont_table.up_to, troop)
-        total_cost_at_moop = compute_row_value(cont_table.maxd, moop_row)
+        range_lookups += 1
+    total_cost_at_moop = compute_row_value(cont_table.maxd, moop_row)
 
     plan_pay_above_moop = total_expected_cost - total_cost_at_moop
 
+    explanation = None
+    if explain:
+        codes = [code for code in services
+                 if code in cont_table.services and len(cont_table.services[code]) > 0]
+        explanation = ServiceAttribution(
+            below_deductible={code: float(sweep_by_service.get(code, 0.0) * below_scale) for code in codes},
+            deductible_to_moop={code: float(range_by_service.get(code, 0.0)) for code in codes},
+            above_moop=attribute_above_moop(cont_table, moop_row, plan_pay_above_moop),
+        )
+
+    # Employer HSA/HRA dollars spent on cost-sharing count as plan payment
+    plan_pay_hsa = hsa_funding_used(
+        cont_table, plan.hsa_contribution, adjusted_deduct,
+        adjusted_deduct if deduct_eq_moop else troop,
+        plan_pay_below_deduct, plan_pay_deduct_to_moop,
+    )
+
     # ========================================================================
     # STEP 10: CALCULATE FINAL AV
     # ========================================================================
 
     total_plan_pay = (plan_pay_below_deduct +
                      plan_pay_deduct_to_moop +
-                     plan_pay_above_moop)
+                     plan_pay_above_moop +
+                     plan_pay_hsa)
 
     av = total_plan_pay / total_expected_cost if total_expected_cost > 0 else 0.0
     av = min(av, 1.0)  # Cap at 100%
 
+    if timing:
+        timings.phase_ns['range_integration'] += perf_counter_ns() - range_start
+        timings.counters['sweeps'] += total_iter_coins
+        timings.counters['row_lookups'] += total_iter_coins + range_lookups
+        if METRICS.enabled:
+            METRICS.record(timings)
+
     # Save trace if requested
-    tracker.save_trace()
+    if tracing:
+        tracer.finish()
 
-    # Get convergence summary
-    conv_summary = tracker.get_summary()
+    iterations_inner = total_iter_coins // max(iter_deduct, 1)
+    ITERATION_HISTOGRAM.record(iter_deduct, iterations_inner)
 
     # Calculate performance metrics
     calc_time = (time.time() - start_time) * 1000  # milliseconds
 
     # Create warnings if convergence failed
     warnings_list = []
-    if not conv_summary.get('converged', False):
-        warnings_list.append(f"Convergence not achieved. Final gap: {conv_summary.get('final_convergence_gap', 0):.6f}")
+    final_gap = abs(total_beneficiary_pay - moop_target) if iter_deduct else 0.0
+    if iter_deduct == 0 or final_gap >= TOLERANCE:
+        warnings_list.append(f"Convergence not achieved. Final gap: {final_gap:.6f}")
     if iter_deduct >= MAX_ITERATIONS:
         warnings_list.append(f"Outer loop hit max iterations ({MAX_ITERATIONS})")
 
@@ -588,13 +685,43 @@ def calculate_av_combined_v2(
         plan_pay_above_moop=plan_pay_above_moop,
         adjusted_deductible=adjusted_deduct,
         adjusted_moop=adjusted_moop,
-        iterations_outer=conv_summary.get('total_outer_iterations', iter_deduct),
-        iterations_inner=conv_summary.get('total_inner_iterations', total_iter_coins) // max(iter_deduct, 1),
+        plan_pay_hsa=plan_pay_hsa,
+        iterations_outer=iter_deduct,
+        iterations_inner=iterations_inner,
         calculation_time=calc_time,
         warnings=warnings_list,
+        timings=timings,
+        explanation=explanation,
     )
 
 
+# Standard services with typical configurations; coinsurance None means
+# the plan's base coinsurance. These should be customized based on actual
+# plan design.
+DEFAULT_SERVICE_DEFINITIONS = [
+    # Medical services (copay, coinsurance, CAD, STD, STC)
+    ('ER', 350, None, False, True, True),      # Emergency Room - subject to deductible
+    ('IP', 1500, None, True, True, True),      # Inpatient - copay after deductible
+    ('PC', 45, None, False, True, True),       # Primary Care - subject to deductible
+    ('SP', 75, None, False, True, True),       # Specialist - subject to deductible
+    ('PSY', 45, None, False, True, True),      # Mental Health - subject to deductible
+    ('IMG', 100, None, False, True, True),     # Imaging - subject to deductible
+    ('ST', 50, None, False, True, True),       # Speech Therapy - subject to deductible
+    ('OT', 50, None, False, True, True),       # Occupational/Physical Therapy - subject to deductible
+    ('PV', 0, 0.0, False, False, False),       # Preventive - ONLY service not subject to deductible
+    ('LAB', 25, None, False, True, True),      # Laboratory - subject to deductible
+    ('XRAY', 50, None, False, True, True),     # X-ray - subject to deductible
+    ('OP', 500, None, False, True, True),      # Outpatient - subject to deductible
+    ('SNF', 300, None, False, True, True),     # Skilled Nursing - subject to deductible
+
+    # Drug services
+    ('GENRX', 10, None, False, True, True),    # Generic - subject to deductible
+    ('PREFRX', 40, None, False, True, True),   # Preferred Brand - subject to deductible
+    ('NONPREFRX', 80, None, False, True, True),      # Non-Preferred Brand - subject to deductible
+    ('SPECRX', 200, None, False, True, True),        # Specialty - subject to deductible
+]
+
+
 def create_default_services(plan: PlanDesign) -> Dict[str, ServiceConfig]:
     """Create default service configurations based on plan design.
 
@@ -605,30 +732,9 @@ def create_default_services(plan: PlanDesign) -> Dict[str, ServiceConfig]:
     # Get base coinsurance from plan
     base_coins = plan.coinsurance
 
-    # Define standard services with typical configurations
-    # These should be customized based on actual plan design
-
     service_definitions = [
-        # Medical services (copay, coinsurance, CAD, STD, STC)
-        ('ER', 350, base_coins, False, True, True),      # Emergency Room - subject to deductible
-        ('IP', 1500, base_coins, True, True, True),      # Inpatient - copay after deductible
-        ('PC', 45, base_coins, False, True, True),       # Primary Care - subject to deductible
-        ('SP', 75, base_coins, False, True, True),       # Specialist - subject to deductible
-        ('PSY', 45, base_coins, False, True, True),      # Mental Health - subject to deductible
-        ('IMG', 100, base_coins, False, True, True),     # Imaging - subject to deductible
-        ('ST', 50, base_coins, False, True, True),       # Speech Therapy - subject to deductible
-        ('OT', 50, base_coins, False, True, True),       # Occupational/Physical Therapy - subject to deductible
-        ('PV', 0, 0.0, False, False, False),             # Preventive - ONLY service not subject to deductible
-        ('LAB', 25, base_coins, False, True, True),      # Laboratory - subject to deductible
-        ('XRAY', 50, base_coins, False, True, True),     # X-ray - subject to deductible
-        ('OP', 500, base_coins, False, True, True),      # Outpatient - subject to deductible
-        ('SNF', 300, base_coins, False, True, True),     # Skilled Nursing - subject to deductible
-
-        # Drug services
-        ('GENRX', 10, base_coins, False, True, True),    # Generic - subject to deductible
-        ('PREFRX', 40, base_coins, False, True, True),   # Preferred Brand - subject to deductible
-        ('NONPREFRX', 80, base_coins, False, True, True),      # Non-Preferred Brand - subject to deductible
-        ('SPECRX', 200, base_coins, False, True, True),        # Specialty - subject to deductible
+        (code, copay, base_coins if coins is None else coins, cad, std, stc)
+        for code, copay, coins, cad, std, stc in DEFAULT_SERVICE_DEFINITIONS
     ]
 
     # Override with plan-specific parameters
@@ -643,6 +749,9 @@ def create_default_services(plan: PlanDesign) -> Dict[str, ServiceConfig]:
                 copay_after_deductible=params.get('copay_after_deductible', cad),
                 subject_to_deductible=params.get('subject_to_deductible', std),
                 subject_to_coinsurance=params.get('subject_to_coinsurance', stc),
+                first_visits=params.get('first_visits', 0),
+                first_visits_copay=params.get('first_visits_copay', 0.0),
+                per_day_limit=params.get('per_day_limit', 0),
             )
         else:
             services[code] = ServiceConfig(
@@ -668,12 +777,23 @@ def calculate_av(plan_params: dict) -> dict:
             - metal_tier: str (optional, default 'Silver')
             - service_params: dict (optional, service-specific overrides)
             - hsa_contribution: float (optional, default 0.0)
+            - trend_factor: float (optional, multiplicative cost trend, default 1.0)
+            - area_factor: float (optional, regional cost adjustment, default 1.0)
+            - plan_year: int (optional, continuance table vintage, default 2026)
             - debug: bool (optional, enable debug output)
             - trace_file: str (optional, save convergence trace)
+            - timings: bool (optional, include per-phase timings in the result)
+            - explain: bool (optional, attribute plan payment to services under 'explanation')
+            - profile: bool (optional, profile the calculation; summary under 'profile')
+            - profile_file: str (optional, with profile: write collapsed stacks here)
 
     Returns:
         Dictionary with AV result and breakdown
     """
+    if plan_params.get('profile'):
+        from .profiling import profile_calculation  # cProfile only when asked for
+        return profile_calculation(calculate_av, plan_params)
+
     # Create PlanDesign object
     plan = PlanDesign(
         deductible=plan_params['deductible'],
@@ -684,15 +804,30 @@ def calculate_av(plan_params: dict) -> dict:
         service_params=plan_params.get('service_params', {}),
     )
 
-    # Load continuance table
-    cont_table = get_continuance_table(plan.metal_tier, 'combined')
+    timings = PhaseTimings() if plan_params.get('timings') or METRICS.enabled else None
+    if timings is not None:
+        fetch_start = perf_counter_ns()
+
+    # Load continuance table (cost-adjusted view if trend/area factors given)
+    cont_table = get_adjusted_table(
+        plan.metal_tier,
+        'combined',
+        trend_factor=plan_params.get('trend_factor', 1.0),
+        area_factor=plan_params.get('area_factor', 1.0),
+        plan_year=plan_params.get('plan_year'),
+    )
+
+    if timings is not None:
+        timings.phase_ns['table_fetch'] += perf_counter_ns() - fetch_start
 
     # Calculate AV
     result = calculate_av_combined_v2(
         plan,
         cont_table,
         debug=plan_params.get('debug', False),
-        trace_file=plan_params.get('trace_file', None)
+        trace_file=plan_params.get('trace_file', None),
+        timings=timings,
+        explain=plan_params.get('explain', False),
     )
 
     # Return as dictionary
@@ -4,7 +4,7 @@ Constants for AV Calculator
 Service codes, metal tiers, and configuration parameters.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 # Metal tiers
 METAL_TIERS = ['Bronze', 'Silver', 'Gold', 'Platinum']
@@ -46,17 +46,37 @@ DRUG_SERVICES: List[str] = [
 # All service codes
 ALL_SERVICES: List[str] = MEDICAL_SERVICES + DRUG_SERVICES
 
+# Explanation bucket for plan payment on costs the table does not break out by service
+OTHER_SERVICE = 'OTHER'
+
 # Continuance table types
 TABLE_TYPES: List[str] = ['med', 'rx', 'combined']
 
+# Plan year of the tables in the top-level continuance-tables directory
+DEFAULT_PLAN_YEAR = 2026
+
+# Compiled bundle layout (see bundle.py)
+BUNDLE_DIRNAME = 'compiled'
+BUNDLE_FORMAT_VERSION = 1
+
+# Data rows in every CMS continuance table
+EXPECTED_ROW_COUNT = 166
+
+# Spending level used for the 'Unlimited' last row of the Up To column
+UNLIMITED_SPENDING = 1e12
+
 # Convergence parameters
 MAX_ITERATIONS = 200
 TOLERANCE = 0.01
 COINSURANCE_DAMPING = 0.5
 
+# Maximum number of cost-adjusted table views held in the LRU cache
+MAX_ADJUSTED_TABLES = 32
+
 # 2026 Federal limits
 FEDERAL_MOOP_INDIVIDUAL = 10600
 FEDERAL_MOOP_FAMILY = 21200
+HSA_MIN_DEDUCTIBLE = 1650  # Individual, for plans with HSA contributions
 
 # Continuance table column names
 CORE_COLUMNS = [
@@ -66,6 +86,55 @@ CORE_COLUMNS = [
     "Avg. Cost per Enrollee (Bucket)",
 ]
 
+# Substrings identifying non-dollar columns (frequencies, day counts, shares),
+# which cost trend and area factors do not scale
+NON_COST_COLUMN_MARKERS = ('Freq', 'Prescriptions', 'Days', 'Percent')
+
+# Service cost columns of the CMS AV Calculator continuance sheets, as the
+# workbook names them. Ingestion checks sheet headers against these; medical
+# sheets carry the medical columns, drug sheets the drug columns and
+# combined sheets both.
+WORKBOOK_MEDICAL_COLUMNS: List[str] = [
+    'ER',
+    'IP',
+    'Primary Care',
+    'Specialist',
+    'Mental Health and Sub. Use Disorder',
+    'Imaging',
+    'Speech Therapy',
+    'Occ. + Physical Therapy',
+    'Preventive (Combined)',
+    'Laboratory',
+    'X-rays (Combined)',
+    'SNF',
+    'Unclassified',
+    'Mental Health - OP Facility',
+    'Mental Health - OP Prof.',
+    'Imaging - OP Facility',
+    'Imaging - OP Prof.',
+    'Speech Therapy - OP Facility',
+    'Speech Therapy - OP Prof.',
+    'Occupational Therapy - OP Facility',
+    'Occupational Therapy - OP Prof.',
+    'Laboratory - OP Facility',
+    'Laboratory - OP Prof.',
+    'Unclassified - OP Facility',
+    'OP Surgery',
+]
+
+WORKBOOK_DRUG_COLUMNS: List[str] = [
+    'Generics',
+    'Preferred Brand',
+    'Non-Preferred Brand',
+    'Specialty High-Cost',
+]
+
+# Other spellings of workbook columns on some sheets
+WORKBOOK_COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    # Bronze_Combined in the 2026 workbook
+    'Mental Health and Sub. Use Disorder': ('Mental Health and Sub. Use Disoder',),
+}
+
 # Service column name mapping (from table to code)
 SERVICE_COLUMN_MAPPING: Dict[str, str] = {
     'ER': 'ER',
@@ -88,6 +157,25 @@ SERVICE_COLUMN_MAPPING: Dict[str, str] = {
     'Specialty': 'RXSPCLTY',
 }
 
+# Visit/day threshold benefits: the combined and medical tables carry
+# 'Primary Care >N Visits' and 'IP Max Days - N' columns for N = 1..10
+MAX_BENEFIT_THRESHOLD = 10
+
+PC_FREQ_COLUMN = 'Avg. Primary Care Freq'
+
+PC_VISIT_THRESHOLD_COLUMNS: List[str] = [
+    f"Primary Care >{n} Visit{'s' if n > 1 else ''}"
+    for n in range(1, MAX_BENEFIT_THRESHOLD + 1)
+]
+
+PC_VISIT_THRESHOLD_FREQ_COLUMNS: List[str] = [
+    f"{column} Freq." for column in PC_VISIT_THRESHOLD_COLUMNS
+]
+
+IP_MAX_DAYS_COLUMNS: List[str] = [
+    f"IP Max Days - {n}" for n in range(1, MAX_BENEFIT_THRESHOLD + 1)
+]
+
 # Default service parameters
 DEFAULT_SERVICE_PARAMS = {
     'copay': 0.0,
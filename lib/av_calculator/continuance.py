@@ -1,24 +1,62 @@
 """
 Continuance table loading and management.
 
-Handles loading continuance tables from JSON files and providing access.
+Handles loading continuance tables from JSON files or compiled bundles and
+providing access. Tables are organised into plan-year vintages:
+
+    data/continuance-tables/            DEFAULT_PLAN_YEAR tables
+    data/continuance-tables/<year>/     additional vintages (e.g. 2027)
+
+Each vintage may carry a compiled bundle (see bundle.py), in which case its
+tables are memory-mapped instead of parsed from JSON.
 """
 
 import json
+import math
+import numbers
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
 
-from .models import ContinuanceTable
-from .constants import METAL_TIERS, TABLE_TYPES, SERVICE_COLUMN_MAPPING
+from .models import ContinuanceTable, AdjustedContinuanceTable
+from .constants import (
+    METAL_TIERS,
+    TABLE_TYPES,
+    CORE_COLUMNS,
+    SERVICE_COLUMN_MAPPING,
+    MAX_ADJUSTED_TABLES,
+    DEFAULT_PLAN_YEAR,
+    BUNDLE_DIRNAME,
+)
+from .bundle import read_manifest, load_table_from_bundle
+from .utils import parse_table_value
+
 
+# LRU cache for cost-adjusted table views, keyed by (year, tier, type, factors)
+_ADJUSTED_CACHE: "OrderedDict[Tuple[int, str, str, float, float], AdjustedContinuanceTable]" = OrderedDict()
 
-# Cache for loaded tables
-_TABLE_CACHE: Dict[str, ContinuanceTable] = {}
+# Lookups of _ADJUSTED_CACHE, for table_cache_stats()
+_ADJUSTED_STATS = {'hits': 0, 'misses': 0, 'evictions': 0}
 
+# Guards _ADJUSTED_CACHE and _ADJUSTED_STATS; solves run on worker threads
+_ADJUSTED_LOCK = threading.Lock()
+
+
+def get_data_dir(plan_year: Optional[int] = None) -> Path:
+    """
+    Get the continuance tables data directory.
+
+    Args:
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
+
+    Raises:
+        FileNotFoundError: If the vintage directory doesn't exist
+    """
+    if plan_year is not None and plan_year != DEFAULT_PLAN_YEAR:
+        return _REGISTRY.vintage_dir(plan_year)
 
-def get_data_dir() -> Path:
-    """Get the continuance tables data directory."""
     # Get the path relative to this file
     current_dir = Path(__file__).parent
     data_dir = current_dir.parent.parent / 'data' / 'continuance-tables'
@@ -29,13 +67,64 @@ def get_data_dir() -> Path:
     return data_dir
 
 
-def load_table_from_json(metal_tier: str, table_type: str) -> ContinuanceTable:
+def read_json_columns(file_path: Path, names: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Read selected columns from a continuance table JSON file.
+
+    Row objects are projected while the file is parsed, so columns that were
+    not requested are dropped immediately instead of being kept in memory.
+
+    Args:
+        file_path: Path to a table JSON file
+        names: Source column names to read
+
+    Returns:
+        Mapping of column name to float array; columns absent from the file
+        are omitted
+    """
+    wanted = set(names)
+
+    def project(pairs):
+        # Row objects are keyed by column names; keep only requested ones.
+        # Top-level metadata objects pass through untouched.
+        if pairs and pairs[0][0] == CORE_COLUMNS[0]:
+            return {key: value for key, value in pairs if key in wanted}
+        return dict(pairs)
+
+    with open(file_path, 'r') as f:
+        data = json.load(f, object_pairs_hook=project)
+
+    rows = data['data']
+    present = [name for name in data.get('columns', wanted) if name in wanted]
+
+    columns = {}
+    for name in present:
+        column = np.zeros(len(rows))
+        for i, row in enumerate(rows):
+            column[i] = parse_table_value(name, row.get(name))
+        columns[name] = column
+
+    return columns
+
+
+def load_table_from_json(
+    metal_tier: str,
+    table_type: str,
+    data_dir: Optional[Path] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> ContinuanceTable:
     """
     Load a single continuance table from JSON file.
 
+    Only the core columns, the mapped service columns and any extra
+    ``columns`` requested are decoded and stored. Other columns are read
+    lazily on first access through ContinuanceTable.column().
+
     Args:
         metal_tier: Bronze, Silver, Gold, or Platinum
         table_type: 'med', 'rx', or 'combined'
+        data_dir: Vintage directory to read from (default: get_data_dir())
+        columns: Additional source columns to load up front
 
     Returns:
         ContinuanceTable object with loaded data
@@ -51,97 +140,156 @@ def load_table_from_json(metal_tier: str, table_type: str) -> ContinuanceTable:
 
     # Build filename: bronze_med.json, silver_combined.json, etc.
     filename = f"{metal_tier.lower()}_{table_type}.json"
-    data_dir = get_data_dir()
+    if data_dir is None:
+        data_dir = get_data_dir()
     file_path = data_dir / filename
 
     if not file_path.exists():
         raise FileNotFoundError(f"Table file not found: {file_path}")
 
-    # Load JSON data
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    projection = list(CORE_COLUMNS) + list(SERVICE_COLUMN_MAPPING)
+    if columns is not None:
+        projection += [name for name in columns if name not in projection]
 
-    # Extract core columns
-    rows = data['data']
-    row_count = len(rows)
-
-    up_to = np.zeros(row_count)
-    pct_enrollees = np.zeros(row_count)
-    maxd = np.zeros(row_count)
-    bucket = np.zeros(row_count)
-
-    for i, row in enumerate(rows):
-        # Handle 'Up To' - may be 'Unlimited' in last row
-        up_to_val = row['Up To']
-        if up_to_val is None or str(up_to_val).strip().lower() == 'unlimited':
-            up_to[i] = 1e12  # Use very large number for unlimited
-        else:
-            try:
-                up_to[i] = float(up_to_val)
-            except (ValueError, TypeError):
-                up_to[i] = 0.0
-
-        # Handle 'Percent of Enrollees'
-        pct_val = row['Percent of Enrollees']
-        if pct_val is None:
-            pct_enrollees[i] = 0.0
-        else:
-            try:
-                pct_enrollees[i] = float(pct_val)
-            except (ValueError, TypeError):
-                pct_enrollees[i] = 0.0
-
-        # Handle Max'd column - may have invalid values like '. '
-        maxd_val = row["Avg. Cost per Enrollee (Max'd)"]
-        if maxd_val is None or str(maxd_val).strip() in ('', '.', '. ', '.-'):
-            maxd[i] = 0.0
-        else:
-            try:
-                maxd[i] = float(maxd_val)
-            except (ValueError, TypeError):
-                maxd[i] = 0.0
-
-        # Handle Bucket column - may have invalid values like '. '
-        bucket_val = row["Avg. Cost per Enrollee (Bucket)"]
-        if bucket_val is None or str(bucket_val).strip() in ('', '.', '. ', '.-'):
-            bucket[i] = 0.0
-        else:
-            try:
-                bucket[i] = float(bucket_val)
-            except (ValueError, TypeError):
-                bucket[i] = 0.0
-
-    # Extract service data columns
-    services = {}
+    loaded = read_json_columns(file_path, projection)
 
     # Map service column names from table to service codes
-    for col_name, service_code in SERVICE_COLUMN_MAPPING.items():
-        # Check if this column exists in the table
-        if col_name in rows[0]:
-            service_data = np.zeros(row_count)
-            for i, row in enumerate(rows):
-                value = row.get(col_name)
-                # Handle None/null values
-                service_data[i] = float(value) if value is not None else 0.0
-            services[service_code] = service_data
+    services = {
+        service_code: loaded[col_name]
+        for col_name, service_code in SERVICE_COLUMN_MAPPING.items()
+        if col_name in loaded
+    }
+
+    def column_loader(names: List[str]) -> Dict[str, np.ndarray]:
+        found = read_json_columns(file_path, names)
+        missing = [name for name in names if name not in found]
+        if missing:
+            raise KeyError(f"Columns not found in {filename}: {missing}")
+        return found
 
     return ContinuanceTable(
         metal_tier=metal_tier,
         table_type=table_type,
-        up_to=up_to,
-        pct_enrollees=pct_enrollees,
-        maxd=maxd,
-        bucket=bucket,
+        up_to=loaded[CORE_COLUMNS[0]],
+        pct_enrollees=loaded[CORE_COLUMNS[1]],
+        maxd=loaded[CORE_COLUMNS[2]],
+        bucket=loaded[CORE_COLUMNS[3]],
         services=services,
+        columns=loaded,
+        column_loader=column_loader,
     )
 
 
-def load_continuance_tables(metal_tier: str) -> Dict[str, ContinuanceTable]:
+class TableRegistry:
+    """
+    Registry of continuance tables keyed by (plan year, metal tier, table type).
+
+    Vintages are discovered from the directory layout on first use; tables are
+    loaded lazily on first request. Vintages with a compiled bundle are
+    memory-mapped, so holding several years costs almost no resident memory
+    until their columns are actually read.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = Path(root) if root is not None else None
+        self._vintages: Optional[Dict[int, Path]] = None
+        self._manifests: Dict[int, Optional[dict]] = {}
+        self._tables: Dict[Tuple[int, str, str], ContinuanceTable] = {}
+
+    @property
+    def root(self) -> Path:
+        """Top-level continuance tables directory (the default vintage)."""
+        if self._root is None:
+            self._root = get_data_dir()
+        return self._root
+
+    def discover(self) -> Dict[int, Path]:
+        """
+        Find available plan-year vintages on disk.
+
+        The root directory holds DEFAULT_PLAN_YEAR; any subdirectory named
+        with a four-digit year holds that year's tables.
+        """
+        if self._vintages is None:
+            vintages = {DEFAULT_PLAN_YEAR: self.root}
+            for child in sorted(self.root.iterdir()):
+                if child.is_dir() and child.name.isdigit() and len(child.name) == 4:
+                    vintages[int(child.name)] = child
+            self._vintages = vintages
+        return self._vintages
+
+    @property
+    def plan_years(self) -> list:
+        """Sorted list of available plan years."""
+        return sorted(self.discover())
+
+    def vintage_dir(self, plan_year: int) -> Path:
+        """Directory holding a plan year's tables."""
+        vintages = self.discover()
+        if plan_year not in vintages:
+            raise FileNotFoundError(
+                f"No continuance tables for plan year {plan_year}. "
+                f"Available: {sorted(vintages)}"
+            )
+        return vintages[plan_year]
+
+    def manifest(self, plan_year: int) -> Optional[dict]:
+        """Compiled bundle manifest for a plan year, or None if not compiled."""
+        if plan_year not in self._manifests:
+            bundle_dir = self.vintage_dir(plan_year) / BUNDLE_DIRNAME
+            self._manifests[plan_year] = read_manifest(bundle_dir)
+        return self._manifests[plan_year]
+
+    def get(self, plan_year: int, metal_tier: str, table_type: str) -> ContinuanceTable:
+        """Get a table, loading it from the bundle or JSON on first use."""
+        key = (plan_year, metal_tier, table_type)
+        if key not in self._tables:
+            self._tables[key] = self._load(plan_year, metal_tier, table_type)
+        return self._tables[key]
+
+    def is_loaded(self, plan_year: int, metal_tier: str, table_type: str) -> bool:
+        """Whether a table has already been loaded."""
+        return (plan_year, metal_tier, table_type) in self._tables
+
+    def clear(self):
+        """Drop loaded tables and rediscover vintages on next use."""
+        self._vintages = None
+        self._manifests = {}
+        self._tables = {}
+
+    def _load(self, plan_year: int, metal_tier: str, table_type: str) -> ContinuanceTable:
+        if metal_tier not in METAL_TIERS:
+            raise ValueError(f"Invalid metal tier: {metal_tier}. Must be one of {METAL_TIERS}")
+        if table_type not in TABLE_TYPES:
+            raise ValueError(f"Invalid table type: {table_type}. Must be one of {TABLE_TYPES}")
+
+        manifest = self.manifest(plan_year)
+        if manifest is not None:
+            bundle_dir = self.vintage_dir(plan_year) / BUNDLE_DIRNAME
+            return load_table_from_bundle(bundle_dir, manifest, metal_tier, table_type)
+
+        return load_table_from_json(metal_tier, table_type, data_dir=self.vintage_dir(plan_year))
+
+
+# Process-wide registry of loaded tables
+_REGISTRY = TableRegistry()
+
+
+def get_registry() -> TableRegistry:
+    """Get the process-wide table registry."""
+    return _REGISTRY
+
+
+def load_continuance_tables(
+    metal_tier: str,
+    plan_year: Optional[int] = None,
+) -> Dict[str, ContinuanceTable]:
     """
     Load all three table types (med, rx, combined) for a metal tier.
 
     Args:
         metal_tier: Bronze, Silver, Gold, or Platinum
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
 
     Returns:
         Dictionary with keys 'med', 'rx', 'combined' mapping to ContinuanceTable objects
@@ -151,61 +299,174 @@ def load_continuance_tables(metal_tier: str) -> Dict[str, ContinuanceTable]:
         >>> silver_combined = tables['combined']
         >>> print(f"Total expected cost: ${silver_combined.total_expected_cost:.2f}")
     """
-    cache_key = f"{metal_tier}_all"
+    return {
+        table_type: get_continuance_table(metal_tier, table_type, plan_year)
+        for table_type in TABLE_TYPES
+    }
+
+
+def get_continuance_table(
+    metal_tier: str,
+    table_type: str = 'combined',
+    plan_year: Optional[int] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> ContinuanceTable:
+    """
+    Get a specific continuance table, loading from cache or file.
 
-    # Check cache first
-    if cache_key in _TABLE_CACHE:
-        return {
-            'med': _TABLE_CACHE.get(f"{metal_tier}_med"),
-            'rx': _TABLE_CACHE.get(f"{metal_tier}_rx"),
-            'combined': _TABLE_CACHE.get(f"{metal_tier}_combined"),
-        }
+    Args:
+        metal_tier: Bronze, Silver, Gold, or Platinum
+        table_type: 'med', 'rx', or 'combined' (default: 'combined')
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
+        columns: Additional source columns the caller needs loaded
 
-    # Load all three tables
-    tables = {}
-    for table_type in TABLE_TYPES:
-        table = load_table_from_json(metal_tier, table_type)
-        tables[table_type] = table
-        _TABLE_CACHE[f"{metal_tier}_{table_type}"] = table
+    Returns:
+        ContinuanceTable object
+
+    Example:
+        >>> silver = get_continuance_table('Silver', 'combined')
+        >>> print(f"Rows: {len(silver)}")
+    """
+    if plan_year is None:
+        plan_year = DEFAULT_PLAN_YEAR
 
-    return tables
+    table = _REGISTRY.get(plan_year, metal_tier, table_type)
+    if columns is not None:
+        table.load_columns(columns)
 
+    return table
 
-def get_continuance_table(metal_tier: str, table_type: str = 'combined') -> ContinuanceTable:
+
+def get_adjusted_table(
+    metal_tier: str,
+    table_type: str = 'combined',
+    trend_factor: float = 1.0,
+    area_factor: float = 1.0,
+    plan_year: Optional[int] = None,
+):
     """
-    Get a specific continuance table, loading from cache or file.
+    Get a continuance table with cost trend and area factors applied.
+
+    Returns a lazily-scaled view over the cached base table rather than a
+    copy. Views are cached per factor set and evicted least-recently-used
+    once more than MAX_ADJUSTED_TABLES are held.
 
     Args:
         metal_tier: Bronze, Silver, Gold, or Platinum
         table_type: 'med', 'rx', or 'combined' (default: 'combined')
+        trend_factor: Multiplicative cost trend (default: 1.0)
+        area_factor: Multiplicative regional cost adjustment (default: 1.0)
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
 
     Returns:
-        ContinuanceTable object
+        The base ContinuanceTable when both factors are 1.0, otherwise an
+        AdjustedContinuanceTable view
+
+    Raises:
+        ValueError: If a factor is not a finite positive number
 
     Example:
-        >>> silver = get_continuance_table('Silver', 'combined')
-        >>> print(f"Rows: {len(silver)}")
+        >>> trended = get_adjusted_table('Silver', trend_factor=1.07)
+        >>> print(f"Trended cost: ${trended.total_expected_cost:.2f}")
     """
-    cache_key = f"{metal_tier}_{table_type}"
+    if plan_year is None:
+        plan_year = DEFAULT_PLAN_YEAR
+
+    for name, factor in (('trend_factor', trend_factor), ('area_factor', area_factor)):
+        if (isinstance(factor, bool) or not isinstance(factor, numbers.Real)
+                or not math.isfinite(factor) or factor <= 0):
+            raise ValueError(f"{name} must be a positive number, got {factor!r}")
+
+    if trend_factor == 1.0 and area_factor == 1.0:
+        return get_continuance_table(metal_tier, table_type, plan_year)
 
-    if cache_key not in _TABLE_CACHE:
-        table = load_table_from_json(metal_tier, table_type)
-        _TABLE_CACHE[cache_key] = table
+    cache_key = (plan_year, metal_tier, table_type, round(trend_factor, 6), round(area_factor, 6))
 
-    return _TABLE_CACHE[cache_key]
+    with _ADJUSTED_LOCK:
+        view = _ADJUSTED_CACHE.get(cache_key)
+        if view is not None:
+            _ADJUSTED_STATS['hits'] += 1
+            _ADJUSTED_CACHE.move_to_end(cache_key)
+            return view
+        _ADJUSTED_STATS['misses'] += 1
+
+    # Build outside the lock; if two threads build one key, the first cached wins
+    base = get_continuance_table(metal_tier, table_type, plan_year)
+    view = AdjustedContinuanceTable(base, trend_factor=cache_key[3], area_factor=cache_key[4])
+
+    with _ADJUSTED_LOCK:
+        view = _ADJUSTED_CACHE.setdefault(cache_key, view)
+        _ADJUSTED_CACHE.move_to_end(cache_key)
+        while len(_ADJUSTED_CACHE) > MAX_ADJUSTED_TABLES:
+            _ADJUSTED_CACHE.popitem(last=False)
+            _ADJUSTED_STATS['evictions'] += 1
+
+    return view
+
+
+def table_cache_stats() -> dict:
+    """
+    Sizes of the loaded table registry and the adjusted-table view cache.
+
+    Returns:
+        Dictionary with tables_loaded, adjusted_views, adjusted_capacity and
+        the adjusted view cache's hits, misses and evictions
+    """
+    with _ADJUSTED_LOCK:
+        return {
+            'tables_loaded': len(_REGISTRY._tables),
+            'adjusted_views': len(_ADJUSTED_CACHE),
+            'adjusted_capacity': MAX_ADJUSTED_TABLES,
+            **_ADJUSTED_STATS,
+        }
 
 
 def clear_cache():
     """Clear the table cache. Useful for testing or memory management."""
-    global _TABLE_CACHE
-    _TABLE_CACHE = {}
+    _REGISTRY.clear()
+    with _ADJUSTED_LOCK:
+        _ADJUSTED_CACHE.clear()
 
 
-def preload_all_tables():
+def preload_all_tables(plan_year: Optional[int] = None):
     """
     Preload all 12 continuance tables into cache.
 
     Call this at application startup to avoid loading delays during calculations.
+
+    Args:
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
+    """
+    for metal_tier in METAL_TIERS:
+        load_continuance_tables(metal_tier, plan_year)
+
+
+def warm_start(plan_year: Optional[int] = None,
+               table_types: Iterable[str] = ('combined',)) -> int:
+    """
+    Memory-map a vintage's compiled tables into the registry.
+
+    Meant to run at import time of a serverless handler: with a compiled
+    bundle this only maps the .npy files (no JSON is parsed, and pages are
+    read on first touch), so the first request finds its table loaded.
+    Vintages without a bundle are left to load on first use.
+
+    Args:
+        plan_year: Plan year vintage (default: DEFAULT_PLAN_YEAR)
+        table_types: Table types to map for every metal tier
+
+    Returns:
+        Number of tables mapped (0 if the vintage has no bundle)
     """
+    if plan_year is None:
+        plan_year = DEFAULT_PLAN_YEAR
+
+    if _REGISTRY.manifest(plan_year) is None:
+        return 0
+
+    count = 0
     for metal_tier in METAL_TIERS:
-        load_continuance_tables(metal_tier)
+        for table_type in table_types:
+            _REGISTRY.get(plan_year, metal_tier, table_type)
+            count += 1
+    return count
@@ -0,0 +1,272 @@
+"""
+Family-tier AV with embedded or aggregate deductibles.
+
+A family is ``family_size`` members whose annual spending is drawn
+independently from the tier's continuance table (each row is a spending
+bucket: pct_enrollees of members at the bucket's expected cost). Family
+cost-sharing is evaluated from a member lane solved by the batch engine,
+so family results come out of the same vectorized solve as individual ones:
+
+1. The member lane (the plan itself when the deductible is embedded, the
+   plan at family deductible/MOOP when it is not) gives the member's
+   cost-sharing curve over spending: the deductible-range share up to the
+   adjusted deductible, the coinsurance-range share up to the MOOP
+   spending level, nothing above. Both shares are taken from the lane's
+   own plan payments, so the curve reproduces its expected cost-sharing.
+2. Member cost-sharing is split into its part credited to the member
+   deductible and the rest, and the pair is placed on a
+   FAMILY_GRID_POINTS x FAMILY_GRID_POINTS grid per lane (mass split
+   between neighbouring points, preserving both means; lanes whose
+   credits earn no relief keep one axis). The joint
+   distribution of the family's totals is its family_size-fold
+   convolution, taken by FFT.
+3. Family cost-sharing is a single accumulator over that distribution:
+   credits past the family deductible are charged at the lane's
+   coinsurance-range rate instead, and the result is capped at the family
+   MOOP. Expected relief is subtracted from the members' total.
+
+Employer HSA/HRA funding is an individual-tier amount and is not spread
+across family members; family results exclude it.
+
+Usage:
+    >>> from av_calculator.vectorized import calculate_av_batch
+    >>> batch = calculate_av_batch([{'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+    ...                              'family_deductible': 3000}], family_size=3)
+    >>> batch.family['av']
+"""
+
+import numpy as np
+
+from .models import ContinuanceTable, PlanDesign
+
+
+# Members in a family when no size is given
+DEFAULT_FAMILY_SIZE = 3
+
+# Grid points per axis of a member's cost-sharing distribution
+FAMILY_GRID_POINTS = 64
+
+# Family distribution cells evaluated at once, across lanes
+FAMILY_BLOCK_CELLS = 1 << 22
+
+
+def family_member(plan: PlanDesign) -> PlanDesign:
+    """
+    Plan whose individual limits a family member faces.
+
+    With an embedded deductible that is the plan itself; otherwise the
+    member's spending counts only toward the family deductible and MOOP.
+    """
+    if plan.embedded_deductible:
+        return plan
+    return PlanDesign(
+        deductible=plan.family_deductible,
+        moop=plan.family_moop,
+        coinsurance=plan.coinsurance,
+        metal_tier=plan.metal_tier,
+        family_deductible=plan.family_deductible,
+        family_moop=plan.family_moop,
+        embedded_deductible=False,
+        hsa_contribution=plan.hsa_contribution,
+        service_params=plan.service_params,
+    )
+
+
+def _member_rates(
+    cont_table: ContinuanceTable,
+    adjusted_deductible: np.ndarray,
+    moop_spending: np.ndarray,
+    plan_pay_below_deduct: np.ndarray,
+    plan_pay_deduct_to_moop: np.ndarray,
+):
+    """Member cost-sharing rate of spending below the deductible and in the coinsurance range."""
+    up_to = np.asarray(cont_table.up_to, dtype=float)
+    maxd = np.asarray(cont_table.maxd, dtype=float)
+
+    # Expected spending in each range, from the limited expected costs
+    lev_deductible = np.interp(adjusted_deductible, up_to, maxd)
+    lev_moop = np.interp(moop_spending, up_to, maxd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deductible_rate = np.where(lev_deductible > 0, 1 - plan_pay_below_deduct / lev_deductible, 1.0)
+        range_rate = np.where(lev_moop > lev_deductible,
+                              1 - plan_pay_deduct_to_moop / (lev_moop - lev_deductible), 0.0)
+    return deductible_rate, range_rate
+
+
+def member_cost_sharing(
+    cont_table: ContinuanceTable,
+    adjusted_deductible: np.ndarray,
+    moop_spending: np.ndarray,
+    plan_pay_below_deduct: np.ndarray,
+    plan_pay_deduct_to_moop: np.ndarray,
+) -> np.ndarray:
+    """
+    Member cost-sharing at every table bucket, for each lane.
+
+    Args:
+        cont_table: Table the member lanes were solved against
+        adjusted_deductible: Spending level where the deductible is met
+        moop_spending: Spending level where the MOOP is met
+        plan_pay_below_deduct: Lane plan payment below the deductible
+        plan_pay_deduct_to_moop: Lane plan payment between deductible and MOOP
+
+    Returns:
+        Cost-sharing array of shape (lanes, buckets)
+    """
+    spending = np.asarray(cont_table.bucket, dtype=float)[np.newaxis, :]
+    deductible_rate, range_rate = _member_rates(
+        cont_table, adjusted_deductible, moop_spending, plan_pay_below_deduct, plan_pay_deduct_to_moop
+    )
+
+    deductible_level = adjusted_deductible[:, np.newaxis]
+    range_width = np.maximum(moop_spending - adjusted_deductible, 0.0)[:, np.newaxis]
+    deductible_share = deductible_rate[:, np.newaxis] * np.minimum(spending, deductible_level)
+    range_share = range_rate[:, np.newaxis] * np.minimum(
+        np.maximum(spending - deductible_level, 0.0), range_width
+    )
+    return deductible_share + range_share
+
+
+def _grid_axis(values: np.ndarray, points: int):
+    """
+    One grid axis of points + 1 points spanning each lane's values.
+
+    Returns the grid step, each value's lower grid index and the weight of
+    its upper neighbour (mass is split so the mean is preserved).
+    """
+    step = values.max(axis=1) / max(points, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position = np.where(step[:, np.newaxis] > 0, values / step[:, np.newaxis], 0.0)
+    position = np.clip(position, 0, points)
+    low = np.clip(np.floor(position).astype(np.int64), 0, max(points - 1, 0))
+    return step, low, position - low
+
+
+def _grid_pmf(credit_axis, rest_axis, probs: np.ndarray, shape) -> np.ndarray:
+    """Joint pmf of each lane's (deductible credit, remaining cost-sharing) atoms on a grid of shape."""
+    _, credit_low, credit_frac = credit_axis
+    _, rest_low, rest_frac = rest_axis
+    lanes = credit_low.shape[0]
+    credit_width, rest_width = shape
+    base = (np.arange(lanes)[:, np.newaxis] * credit_width + credit_low) * rest_width + rest_low
+    weights = np.broadcast_to(probs, credit_low.shape)
+
+    # An axis with a single point has nothing to split to
+    credit_corners = [(0, 1 - credit_frac)] + ([(rest_width, credit_frac)] if credit_width > 1 else [])
+    rest_corners = [(0, 1 - rest_frac)] + ([(1, rest_frac)] if rest_width > 1 else [])
+    pmf = np.zeros(lanes * credit_width * rest_width)
+    for credit_offset, credit_weight in credit_corners:
+        for rest_offset, rest_weight in rest_corners:
+            pmf += np.bincount((base + credit_offset + rest_offset).ravel(),
+                               (weights * credit_weight * rest_weight).ravel(),
+                               minlength=pmf.size)
+    return pmf.reshape(lanes, credit_width, rest_width)
+
+
+def _family_total(pmf: np.ndarray, family_size: int) -> np.ndarray:
+    """Joint distribution of the sum of family_size independent draws, per lane."""
+    size = tuple(family_size * (width - 1) + 1 for width in pmf.shape[1:])
+    return np.fft.irfft2(np.fft.rfft2(pmf, s=size) ** family_size, s=size)
+
+
+def _family_relief(credits: np.ndarray, rest: np.ndarray, probs: np.ndarray, family_size: int,
+                   credit_relief: np.ndarray, family_deductible: np.ndarray,
+                   family_moop: np.ndarray, credit_points: int, points: int) -> np.ndarray:
+    """
+    Expected cost-sharing the family limits take off the members' total.
+
+    With D the family's deductible credits and R the rest of its
+    cost-sharing, the family pays min(D - credit_relief (D - family
+    deductible)+ + R, family MOOP): one accumulator, so a year in which
+    both family limits bind is only relieved once.
+    """
+    credit_axis = _grid_axis(credits, credit_points)
+    rest_axis = _grid_axis(rest, points)
+    total = _family_total(_grid_pmf(credit_axis, rest_axis, probs, (credit_points + 1, points + 1)),
+                          family_size)
+
+    family_credits = (np.arange(total.shape[1]) * credit_axis[0][:, np.newaxis])[:, :, np.newaxis]
+    family_rest = (np.arange(total.shape[2]) * rest_axis[0][:, np.newaxis])[:, np.newaxis, :]
+    deductible_relief = credit_relief[:, np.newaxis, np.newaxis] * np.maximum(
+        family_credits - family_deductible[:, np.newaxis, np.newaxis], 0.0
+    )
+    moop_relief = np.maximum(
+        family_credits - deductible_relief + family_rest - family_moop[:, np.newaxis, np.newaxis], 0.0
+    )
+    return (total * (deductible_relief + moop_relief)).sum(axis=(1, 2))
+
+
+def family_cost_sharing(
+    cont_table: ContinuanceTable,
+    adjusted_deductible: np.ndarray,
+    moop_spending: np.ndarray,
+    plan_pay_below_deduct: np.ndarray,
+    plan_pay_deduct_to_moop: np.ndarray,
+    member_cost: np.ndarray,
+    member_deductible: np.ndarray,
+    family_deductible: np.ndarray,
+    family_moop: np.ndarray,
+    family_size: int = DEFAULT_FAMILY_SIZE,
+    points: int = FAMILY_GRID_POINTS,
+) -> np.ndarray:
+    """
+    Expected family cost-sharing for each member lane.
+
+    Args:
+        cont_table: Table the member lanes were solved against
+        adjusted_deductible: Member lane spending level where the deductible is met
+        moop_spending: Member lane spending level where the MOOP is met
+        plan_pay_below_deduct: Member lane plan payment below the deductible
+        plan_pay_deduct_to_moop: Member lane plan payment between deductible and MOOP
+        member_cost: Member lane expected cost-sharing (allowed cost less plan payment)
+        member_deductible: Deductible each member's cost-sharing is credited to
+        family_deductible: Family deductible per lane
+        family_moop: Family MOOP per lane
+        family_size: Members per family
+        points: Grid points per axis of the member distribution
+
+    Returns:
+        Expected cost-sharing of the whole family, per lane
+
+    Raises:
+        ValueError: If family_size is less than 1
+    """
+    if family_size < 1:
+        raise ValueError(f"Family size must be at least 1, got {family_size}")
+
+    probs = np.asarray(cont_table.pct_enrollees, dtype=float)[np.newaxis, :]
+    cost_sharing = member_cost_sharing(
+        cont_table, adjusted_deductible, moop_spending, plan_pay_below_deduct, plan_pay_deduct_to_moop
+    )
+
+    # Spending past the family deductible is cost-shared at the lane's
+    # coinsurance-range rate; lanes without a coinsurance range have none
+    deductible_rate, range_rate = _member_rates(
+        cont_table, adjusted_deductible, moop_spending, plan_pay_below_deduct, plan_pay_deduct_to_moop
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        credit_relief = np.where(
+            (moop_spending > adjusted_deductible) & (deductible_rate > 0),
+            np.clip(1 - range_rate / deductible_rate, 0.0, 1.0), 0.0,
+        )
+
+    # Credits that earn no relief stay with the rest of the cost-sharing,
+    # so those lanes need no credit axis and ignore the family deductible
+    relieved = credit_relief > 0
+    credits = np.where(relieved[:, np.newaxis],
+                       np.minimum(cost_sharing, member_deductible[:, np.newaxis]), 0.0)
+    rest = cost_sharing - credits
+
+    relief = np.empty(cost_sharing.shape[0])
+    for lanes, credit_points in ((np.flatnonzero(relieved), points), (np.flatnonzero(~relieved), 0)):
+        # Lanes in blocks, to bound the memory of the family distributions
+        cells = (family_size * credit_points + 1) * (family_size * points + 1)
+        block = max(1, FAMILY_BLOCK_CELLS // cells)
+        for start in range(0, lanes.size, block):
+            chunk = lanes[start:start + block]
+            relief[chunk] = _family_relief(
+                credits[chunk], rest[chunk], probs, family_size, credit_relief[chunk],
+                family_deductible[chunk], family_moop[chunk], credit_points, points,
+            )
+
+    return np.maximum(family_size * member_cost - relief, 0.0)
@@ -0,0 +1,270 @@
+"""
+Ingest continuance tables from the CMS AV Calculator workbook.
+
+Streams each continuance sheet of the .xlsm in read-only mode, validates it,
+and writes both the per-table JSON files and the compiled bundle for a plan
+year vintage. Only one sheet's rows are held in memory at a time.
+
+Usage:
+    python -m av_calculator.ingest 2027-AV-Calculator.xlsm --plan-year 2027 \\
+        --out data/continuance-tables/2027
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bundle import table_key, write_bundle
+from .constants import (
+    METAL_TIERS,
+    TABLE_TYPES,
+    CORE_COLUMNS,
+    WORKBOOK_MEDICAL_COLUMNS,
+    WORKBOOK_DRUG_COLUMNS,
+    WORKBOOK_COLUMN_ALIASES,
+    BUNDLE_DIRNAME,
+    EXPECTED_ROW_COUNT,
+)
+from .utils import parse_table_value
+
+
+# Sheet name suffix and descriptive title for each table type
+TABLE_TYPE_SHEETS: Dict[str, Tuple[str, str]] = {
+    'med': ('Med', 'Medical Only'),
+    'rx': ('Rx', 'Drug Claims Only'),
+    'combined': ('Combined', 'All Claims'),
+}
+
+
+@dataclass
+class IngestReport:
+    """
+    Summary of a workbook ingestion run.
+
+    Attributes:
+        plan_year: Plan year written
+        row_counts: Rows ingested per table key
+        warnings: Non-fatal validation messages
+        checksum: Bundle checksum from the written manifest
+        elapsed: Wall-clock seconds for the run
+    """
+    plan_year: int
+    row_counts: Dict[str, int] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    checksum: str = ''
+    elapsed: float = 0.0
+
+
+def _expected_service_columns(table_type: str) -> List[str]:
+    """Service columns a workbook sheet of this type should carry."""
+    if table_type == 'med':
+        return WORKBOOK_MEDICAL_COLUMNS
+    if table_type == 'rx':
+        return WORKBOOK_DRUG_COLUMNS
+    return WORKBOOK_MEDICAL_COLUMNS + WORKBOOK_DRUG_COLUMNS
+
+
+def validate_columns(key: str, table_type: str, columns: List[str]) -> List[str]:
+    """
+    Validate a sheet header against CORE_COLUMNS and the workbook's service columns.
+
+    Args:
+        key: Table key for messages (e.g., 'silver_combined')
+        table_type: 'med', 'rx', or 'combined'
+        columns: Header column names
+
+    Returns:
+        List of warnings for service columns missing from the sheet
+
+    Raises:
+        ValueError: If core columns are missing or headers are blank/duplicated
+    """
+    if any(not column for column in columns):
+        raise ValueError(f"{key}: blank column header")
+
+    duplicates = sorted({column for column in columns if columns.count(column) > 1})
+    if duplicates:
+        raise ValueError(f"{key}: duplicate column headers {duplicates}")
+
+    missing_core = [column for column in CORE_COLUMNS if column not in columns]
+    if missing_core:
+        raise ValueError(f"{key}: missing core columns {missing_core}")
+
+    present = set(columns)
+    return [
+        f"{key}: service column '{column}' not found"
+        for column in _expected_service_columns(table_type)
+        if present.isdisjoint((column,) + WORKBOOK_COLUMN_ALIASES.get(column, ()))
+    ]
+
+
+def _stream_sheet(worksheet, key: str, expected_rows: int) -> Tuple[List[str], list]:
+    """
+    Read one continuance sheet: locate the header row, then the data rows.
+
+    The header is the first row whose first cell is 'Up To'; data rows follow
+    until the first row with an empty first cell.
+    """
+    header = None
+    rows = []
+
+    for values in worksheet.iter_rows(values_only=True):
+        if header is None:
+            if values and isinstance(values[0], str) and values[0].strip() == CORE_COLUMNS[0]:
+                header = [str(v).strip() if v is not None else '' for v in values]
+                while header and not header[-1]:
+                    header.pop()
+            continue
+
+        if not values or values[0] is None or values[0] == '':
+            break
+
+        rows.append(values[:len(header)])
+        if len(rows) > expected_rows:
+            raise ValueError(f"{key}: more than {expected_rows} data rows")
+
+    if header is None:
+        raise ValueError(f"{key}: header row starting with '{CORE_COLUMNS[0]}' not found")
+
+    if len(rows) != expected_rows:
+        raise ValueError(f"{key}: expected {expected_rows} rows, found {len(rows)}")
+
+    return header, rows
+
+
+def ingest_workbook(
+    workbook_path: Path,
+    out_dir: Path,
+    plan_year: int,
+    expected_rows: int = EXPECTED_ROW_COUNT,
+    strict: bool = False,
+    write_json: bool = True,
+) -> IngestReport:
+    """
+    Ingest all continuance sheets of an AV Calculator workbook.
+
+    Args:
+        workbook_path: Path to the CMS .xlsm/.xlsx workbook
+        out_dir: Vintage directory to write <tier>_<type>.json and compiled/
+        plan_year: Plan year of this workbook
+        expected_rows: Required number of data rows per table
+        strict: Treat missing service columns as errors
+        write_json: Also write the per-table JSON files
+
+    Returns:
+        IngestReport describing what was written
+
+    Raises:
+        ImportError: If openpyxl is not installed
+        ValueError: If a sheet is missing or fails validation
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError(
+            "openpyxl is required for workbook ingestion: pip install openpyxl"
+        ) from e
+
+    start_time = time.perf_counter()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report = IngestReport(plan_year=plan_year)
+
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True, keep_vba=False)
+    try:
+        sheet_names = {name.lower(): name for name in workbook.sheetnames}
+        tables = {}
+
+        for metal_tier in METAL_TIERS:
+            for table_type in TABLE_TYPES:
+                suffix, title = TABLE_TYPE_SHEETS[table_type]
+                sheet_name = f"{metal_tier}_{suffix}"
+                key = table_key(metal_tier, table_type)
+
+                if sheet_name.lower() not in sheet_names:
+                    raise ValueError(f"Sheet '{sheet_name}' not found in {workbook_path}")
+
+                worksheet = workbook[sheet_names[sheet_name.lower()]]
+                columns, rows = _stream_sheet(worksheet, key, expected_rows)
+
+                warnings = validate_columns(key, table_type, columns)
+                if warnings and strict:
+                    raise ValueError('; '.join(warnings))
+                report.warnings.extend(warnings)
+
+                matrix = np.zeros((len(columns), len(rows)))
+                for i, row in enumerate(rows):
+                    for j, column in enumerate(columns):
+                        matrix[j, i] = parse_table_value(column, row[j] if j < len(row) else None)
+                tables[key] = (columns, matrix)
+                report.row_counts[key] = len(rows)
+
+                if write_json:
+                    _write_table_json(out_dir / f"{key}.json", sheet_name,
+                                      f"{metal_tier} Plans, {title}", columns, rows)
+    finally:
+        workbook.close()
+
+    manifest = write_bundle(out_dir / BUNDLE_DIRNAME, plan_year, tables,
+                            source=Path(workbook_path).name)
+    report.checksum = manifest['checksum']
+    report.elapsed = time.perf_counter() - start_time
+
+    return report
+
+
+def _write_table_json(path: Path, table_name: str, table_title: str,
+                      columns: List[str], rows: list) -> None:
+    """Write one table in the same JSON schema as the hand-extracted files."""
+    data = {
+        'table_name': table_name,
+        'table_title': table_title,
+        'column_count': len(columns),
+        'row_count': len(rows),
+        'columns': columns,
+        'data': [
+            {column: (row[j] if j < len(row) else None) for j, column in enumerate(columns)}
+            for row in rows
+        ],
+        'extraction_date': datetime.now(timezone.utc).isoformat(),
+    }
+
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Ingest CMS AV Calculator continuance tables")
+    parser.add_argument('workbook', type=Path, help="Path to the AV Calculator .xlsm")
+    parser.add_argument('--plan-year', type=int, required=True, help="Plan year of the workbook")
+    parser.add_argument('--out', type=Path, required=True, help="Vintage output directory")
+    parser.add_argument('--expected-rows', type=int, default=EXPECTED_ROW_COUNT)
+    parser.add_argument('--strict', action='store_true',
+                        help="Fail if service columns are missing")
+    parser.add_argument('--no-json', action='store_true', help="Only write the compiled bundle")
+    args = parser.parse_args(argv)
+
+    report = ingest_workbook(
+        args.workbook,
+        args.out,
+        args.plan_year,
+        expected_rows=args.expected_rows,
+        strict=args.strict,
+        write_json=not args.no_json,
+    )
+
+    for warning in report.warnings:
+        print(f"WARNING: {warning}")
+    print(f"Ingested {len(report.row_counts)} tables for {report.plan_year} "
+          f"in {report.elapsed:.2f}s (checksum {report.checksum[:12]})")
+
+
+if __name__ == '__main__':
+    main()
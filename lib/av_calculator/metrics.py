@@ -0,0 +1,127 @@
+"""
+Per-phase engine timings and a process-wide metrics registry.
+
+Timings are off by default. They are collected for a calculation when the
+caller asks for them (``timings=True`` in the dict entry points) or when the
+process-wide registry is enabled, either with ``enable_metrics()`` or by
+setting the ``AV_CALCULATOR_METRICS`` environment variable to ``1``. When
+neither applies the engines skip every timer call.
+
+Phases:
+- table_fetch: continuance table lookup/adjustment in the dict entry points
+- service_sweep: service processing at the deductible level
+- inner_loop: coinsurance convergence loops
+- outer_loop: the full deductible/MOOP convergence loop
+- range_integration: plan payment integrals after convergence
+
+Counters:
+- sweeps: service sweeps performed
+- row_lookups: continuance table row lookups
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+PHASES = ('table_fetch', 'service_sweep', 'inner_loop', 'outer_loop', 'range_integration')
+COUNTERS = ('sweeps', 'row_lookups')
+
+METRICS_ENV_VAR = 'AV_CALCULATOR_METRICS'
+
+
+@dataclass
+class PhaseTimings:
+    """
+    Timings of one calculation.
+
+    Attributes:
+        phase_ns: Nanoseconds spent per phase (perf_counter_ns)
+        counters: Event counts per counter
+    """
+    phase_ns: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(PHASES, 0))
+    counters: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(COUNTERS, 0))
+
+    def to_dict(self) -> dict:
+        """Phase times in milliseconds plus counters."""
+        return {
+            'phases_ms': {phase: round(ns / 1e6, 4) for phase, ns in self.phase_ns.items()},
+            'counters': dict(self.counters),
+        }
+
+
+@dataclass
+class _PhaseStats:
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+
+class MetricsRegistry:
+    """
+    Thread-safe aggregate of PhaseTimings across calculations.
+
+    Args:
+        enabled: Collect timings for every calculation in this process
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all aggregated metrics."""
+        with self._lock:
+            self.calculations = 0
+            self._phases = {phase: _PhaseStats() for phase in PHASES}
+            self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def record(self, timings: PhaseTimings) -> None:
+        """Add one calculation's timings to the aggregate."""
+        with self._lock:
+            self.calculations += 1
+            for phase, ns in timings.phase_ns.items():
+                stats = self._phases.setdefault(phase, _PhaseStats())
+                stats.count += 1
+                stats.total_ns += ns
+                stats.max_ns = max(stats.max_ns, ns)
+            for name, value in timings.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        Get the aggregated metrics.
+
+        Returns:
+            Dictionary with calculation count, per-phase total/mean/max in
+            milliseconds, and counter totals
+        """
+        with self._lock:
+            return {
+                'calculations': self.calculations,
+                'phases': {
+                    phase: {
+                        'total_ms': stats.total_ns / 1e6,
+                        'mean_ms': stats.total_ns / stats.count / 1e6 if stats.count else 0.0,
+                        'max_ms': stats.max_ns / 1e6,
+                    }
+                    for phase, stats in self._phases.items()
+                },
+                'counters': dict(self._counters),
+            }
+
+
+# Process-wide registry fed by the engines
+METRICS = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR, '') == '1')
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return METRICS
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    """Turn process-wide timing collection on or off."""
+    METRICS.enabled = enabled
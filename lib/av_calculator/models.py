@@ -4,10 +4,19 @@ Data models for AV Calculator
 Defines data classes for plan parameters, continuance tables, and results.
 """
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Dict, Optional, NamedTuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, NamedTuple
 import numpy as np
 
+from .constants import NON_COST_COLUMN_MARKERS
+from .metrics import PhaseTimings
+
+
+def is_cost_column(column_name: str) -> bool:
+    """Whether a source column holds dollar amounts (as opposed to counts or shares)."""
+    return not any(marker in column_name for marker in NON_COST_COLUMN_MARKERS)
+
 
 class TableRow(NamedTuple):
     """
@@ -52,6 +61,8 @@ class PlanDesign:
     Optional Parameters:
         family_deductible: Family deductible (defaults to 2x individual)
         family_moop: Family MOOP (defaults to 2x individual)
+        embedded_deductible: Whether members also have the individual
+            deductible/MOOP inside the family ones (default True)
         hsa_contribution: Employer HSA/HRA contribution
         service_params: Service-specific cost sharing overrides
     """
@@ -64,6 +75,7 @@ class PlanDesign:
     # Family coverage (optional)
     family_deductible: Optional[float] = None
     family_moop: Optional[float] = None
+    embedded_deductible: bool = True
 
     # HSA/HRA (optional)
     hsa_contribution: float = 0.0
@@ -84,6 +96,8 @@ class PlanDesign:
             raise ValueError("Deductible must be >= 0")
         if self.deductible > self.moop:
             raise ValueError("Deductible cannot exceed MOOP")
+        if self.family_deductible > self.family_moop:
+            raise ValueError("Family deductible cannot exceed family MOOP")
         if not 0 <= self.coinsurance <= 1:
             raise ValueError("Coinsurance must be between 0 and 1")
         if self.metal_tier not in ['Bronze', 'Silver', 'Gold', 'Platinum']:
@@ -128,6 +142,11 @@ class ContinuanceTable:
         maxd: Expected cost at each spending level (Max'd column)
         bucket: Expected cost within bucket
         services: Dictionary of service cost arrays
+        columns: Loaded source columns by name (core, services, and any
+            additional columns requested so far)
+        column_loader: Callable that loads further source columns by name;
+            used to pull columns in lazily on first access
+        derived: Cache for arrays precomputed from this table (e.g. threshold arrays)
     """
     metal_tier: str
     table_type: str
@@ -136,6 +155,11 @@ class ContinuanceTable:
     maxd: np.ndarray
     bucket: np.ndarray
     services: Dict[str, np.ndarray]
+    columns: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    column_loader: Optional[Callable[[List[str]], Dict[str, np.ndarray]]] = field(
+        default=None, repr=False, compare=False
+    )
+    derived: Dict[str, object] = field(default_factory=dict, repr=False, compare=False)
 
     def __len__(self) -> int:
         """Return number of rows in table."""
@@ -145,12 +169,220 @@ class ContinuanceTable:
         """Get service cost data array, or None if not available."""
         return self.services.get(service_code)
 
+    def load_columns(self, names: Iterable[str]) -> None:
+        """
+        Ensure source columns are loaded, fetching any missing ones in one pass.
+
+        Raises:
+            KeyError: If a column is not loaded and cannot be loaded
+        """
+        missing = [name for name in names if name not in self.columns]
+        if not missing:
+            return
+        if self.column_loader is None:
+            raise KeyError(f"Columns not loaded and no loader available: {missing}")
+        self.columns.update(self.column_loader(missing))
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a source column by name (e.g. 'IP Max Days - 3'), loading it on first access."""
+        self.load_columns([name])
+        return self.columns[name]
+
     @property
     def total_expected_cost(self) -> float:
         """Total expected cost (last row of maxd column)."""
         return float(self.maxd[-1])
 
 
+class _ScaledServices(Mapping):
+    """
+    Read-only mapping of service cost arrays scaled by a constant factor.
+
+    Each service column is scaled on first access and memoized, so the base
+    table's arrays are never copied for services the engine does not touch.
+    """
+
+    def __init__(self, base: Dict[str, np.ndarray], factor: float):
+        self._base = base
+        self._factor = factor
+        self._scaled: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, service_code: str) -> np.ndarray:
+        if service_code not in self._scaled:
+            column = self._base[service_code] * self._factor
+            column.flags.writeable = False
+            self._scaled[service_code] = column
+        return self._scaled[service_code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._base)
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+
+class AdjustedContinuanceTable:
+    """
+    Cost-adjusted view over a ContinuanceTable.
+
+    Applies multiplicative cost trend and area factors to the dollar columns
+    (up_to, maxd, bucket, services) without modifying or eagerly copying the
+    base table. Columns are scaled lazily on first access; pct_enrollees is
+    shared with the base table since enrollee distribution is unchanged.
+
+    Attributes:
+        base: Underlying ContinuanceTable
+        trend_factor: Multiplicative cost trend (e.g., 1.07 for 7% trend)
+        area_factor: Multiplicative regional cost adjustment
+    """
+
+    def __init__(self, base: ContinuanceTable, trend_factor: float = 1.0,
+                 area_factor: float = 1.0):
+        if trend_factor <= 0 or area_factor <= 0:
+            raise ValueError("Trend and area factors must be > 0")
+
+        self.base = base
+        self.trend_factor = trend_factor
+        self.area_factor = area_factor
+        self.factor = trend_factor * area_factor
+        self.services = _ScaledServices(base.services, self.factor)
+        self.derived: Dict[str, object] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def _scaled(self, attr: str) -> np.ndarray:
+        """Scale a core column on first access and memoize it."""
+        key = f"_{attr}"
+        if key not in self._columns:
+            column = getattr(self.base, attr) * self.factor
+            column.flags.writeable = False
+            self._columns[key] = column
+        return self._columns[key]
+
+    @property
+    def metal_tier(self) -> str:
+        return self.base.metal_tier
+
+    @property
+    def table_type(self) -> str:
+        return self.base.table_type
+
+    @property
+    def up_to(self) -> np.ndarray:
+        return self._scaled('up_to')
+
+    @property
+    def maxd(self) -> np.ndarray:
+        return self._scaled('maxd')
+
+    @property
+    def bucket(self) -> np.ndarray:
+        return self._scaled('bucket')
+
+    @property
+    def pct_enrollees(self) -> np.ndarray:
+        return self.base.pct_enrollees
+
+    def __len__(self) -> int:
+        """Return number of rows in table."""
+        return len(self.base)
+
+    def get_service_data(self, service_code: str) -> Optional[np.ndarray]:
+        """Get scaled service cost data array, or None if not available."""
+        return self.services.get(service_code)
+
+    def load_columns(self, names: Iterable[str]) -> None:
+        """Ensure source columns are loaded on the base table."""
+        self.base.load_columns(names)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a source column by name; dollar columns are scaled, counts are not."""
+        if name not in self._columns:
+            column = self.base.column(name)
+            if is_cost_column(name):
+                column = column * self.factor
+                column.flags.writeable = False
+            self._columns[name] = column
+        return self._columns[name]
+
+    @property
+    def total_expected_cost(self) -> float:
+        """Total expected cost, scaled by the combined factor."""
+        return self.base.total_expected_cost * self.factor
+
+
+@dataclass
+class ServiceAttribution:
+    """
+    Plan payment attributed to each service code, per spending range.
+
+    Below the deductible and in the coinsurance range the amounts come from
+    the engine's own per-service intermediates, so each range sums to the
+    matching AVResult breakdown value. Above the MOOP the plan pays all
+    cost, split by each service's cost above the MOOP level; cost the table
+    does not break out by service goes to OTHER_SERVICE.
+
+    Attributes:
+        below_deductible: Plan payment below the deductible, by service
+        deductible_to_moop: Plan payment between deductible and MOOP, by service
+        above_moop: Plan payment above MOOP, by service
+    """
+    below_deductible: Dict[str, float] = field(default_factory=dict)
+    deductible_to_moop: Dict[str, float] = field(default_factory=dict)
+    above_moop: Dict[str, float] = field(default_factory=dict)
+
+    def totals(self) -> Dict[str, float]:
+        """Plan payment across all ranges, by service."""
+        totals: Dict[str, float] = {}
+        for amounts in (self.below_deductible, self.deductible_to_moop, self.above_moop):
+            for code, amount in amounts.items():
+                totals[code] = totals.get(code, 0.0) + amount
+        return totals
+
+    def to_dict(self, total_allowed_cost: float) -> dict:
+        """Convert to dictionary, with each service's share of AV in percentage points."""
+        totals = self.totals()
+        return {
+            'below_deductible': {code: round(v, 2) for code, v in self.below_deductible.items()},
+            'deductible_to_moop': {code: round(v, 2) for code, v in self.deductible_to_moop.items()},
+            'above_moop': {code: round(v, 2) for code, v in self.above_moop.items()},
+            'total': {code: round(v, 2) for code, v in totals.items()},
+            'av_percent': {
+                code: round(v / total_allowed_cost * 100, 2) if total_allowed_cost > 0 else 0.0
+                for code, v in totals.items()
+            },
+        }
+
+
+@dataclass
+class FamilyResult:
+    """
+    Family-tier result for a plan.
+
+    Attributes:
+        av: Family actuarial value (0.0 to 1.0)
+        total_plan_payment: Expected plan payment for the whole family
+        total_allowed_cost: Expected allowed cost for the whole family
+        family_size: Members the family was evaluated with
+        embedded_deductible: Whether members had embedded individual limits
+    """
+    av: float
+    total_plan_payment: float
+    total_allowed_cost: float
+    family_size: int
+    embedded_deductible: bool = True
+
+    def to_dict(self) -> dict:
+        """Convert result to dictionary for serialization."""
+        return {
+            'av': round(self.av, 4),
+            'av_percent': round(self.av * 100, 2),
+            'total_plan_payment': round(self.total_plan_payment, 2),
+            'total_allowed_cost': round(self.total_allowed_cost, 2),
+            'family_size': self.family_size,
+            'embedded_deductible': self.embedded_deductible,
+        }
+
+
 @dataclass
 class AVResult:
     """
@@ -167,10 +399,14 @@ class AVResult:
         plan_pay_above_moop: Plan payment above MOOP
         adjusted_deductible: Adjusted deductible in spending terms
         adjusted_moop: Adjusted MOOP in spending terms
+        plan_pay_hsa: Expected employer HSA/HRA funding spent on cost-sharing
         iterations_outer: Outer loop iterations
         iterations_inner: Average inner loop iterations
         calculation_time: Calculation time in milliseconds
         warnings: List of warning messages
+        timings: Per-phase timings and counters, when collected
+        explanation: Per-service attribution of plan payment, when requested
+        family: Family-tier result, when requested
     """
     av: float
     av_percent: float
@@ -182,14 +418,18 @@ class AVResult:
     plan_pay_above_moop: float
     adjusted_deductible: float
     adjusted_moop: float
+    plan_pay_hsa: float = 0.0
     iterations_outer: int = 0
     iterations_inner: int = 0
     calculation_time: float = 0.0
     warnings: list = field(default_factory=list)
+    timings: Optional[PhaseTimings] = None  # Per-phase timings, when collected
+    explanation: Optional[ServiceAttribution] = None  # Per-service attribution, when requested
+    family: Optional[FamilyResult] = None  # Family-tier result, when requested
 
     def to_dict(self) -> dict:
         """Convert result to dictionary for serialization."""
-        return {
+        result = {
             'av': round(self.av, 4),
             'av_percent': round(self.av_percent, 2),
             'metal_tier': self.metal_tier,
@@ -199,6 +439,7 @@ class AVResult:
                 'below_deductible': round(self.plan_pay_below_deduct, 2),
                 'deductible_to_moop': round(self.plan_pay_deduct_to_moop, 2),
                 'above_moop': round(self.plan_pay_above_moop, 2),
+                'hsa_funding': round(self.plan_pay_hsa, 2),
             },
             'adjusted_values': {
                 'deductible': round(self.adjusted_deductible, 2),
@@ -208,9 +449,15 @@ class AVResult:
                 'iterations_outer': self.iterations_outer,
                 'iterations_inner': self.iterations_inner,
                 'calculation_time_ms': round(self.calculation_time, 2),
+                **(self.timings.to_dict() if self.timings is not None else {}),
             },
             'warnings': self.warnings,
         }
+        if self.explanation is not None:
+            result['explanation'] = self.explanation.to_dict(self.total_allowed_cost)
+        if self.family is not None:
+            result['family'] = self.family.to_dict()
+        return result
 
 
 @dataclass
@@ -0,0 +1,194 @@
+"""
+Deterministic profiling of AV calculations.
+
+Wraps a calculation in cProfile and summarizes where the time went: the
+hottest functions overall, the engine's known hot spots (row lookups,
+interpolation, service processing) with call counts, and a collapsed-stack
+file that flamegraph.pl, speedscope and similar tools read directly.
+
+cProfile records caller/callee totals rather than full stacks, so the
+collapsed stacks divide each function's time among its callers in
+proportion to the time spent under each caller.
+
+Usage:
+    >>> from av_calculator import calculate_av
+    >>> result = calculate_av({'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+    ...                        'profile': True, 'profile_file': 'av.collapsed'})
+    >>> result['profile']['engine']
+"""
+
+import cProfile
+import os
+import pstats
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+# Engine functions reported individually when they appear in a profile
+ENGINE_FUNCTIONS = (
+    'get_continuance_table_row',
+    'compute_row_value',
+    'process_all_services',
+    'process_all_services_v2',
+    'process_service_cost_share',
+    'process_below_deductible',
+    'process_coinsurance_range',
+    'lookup_rows',
+    'sweep',
+    'coinsurance_range',
+)
+
+DEFAULT_HOT_LIMIT = 15
+MAX_STACK_DEPTH = 64
+
+# Options consumed by the dict entry points rather than the engine
+PROFILE_OPTIONS = ('profile', 'profile_file')
+
+_FunctionKey = Tuple[str, int, str]
+
+# cProfile records its own disable() call; it is left out of stacks
+_PROFILER_DISABLE = "<method 'disable' of '_lsprof.Profiler' objects>"
+
+
+def _label(func: _FunctionKey) -> str:
+    filename, line, name = func
+    if filename == '~':  # Built-in
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+@dataclass
+class ProfileReport:
+    """
+    Summary of one profiled call.
+
+    Attributes:
+        stats: The raw pstats.Stats of the run
+    """
+    stats: pstats.Stats
+
+    @property
+    def total_ms(self) -> float:
+        """Total profiled time in milliseconds."""
+        return self.stats.total_tt * 1000
+
+    def _row(self, func: _FunctionKey) -> Dict[str, Any]:
+        primitive_calls, calls, tottime, cumtime, _ = self.stats.stats[func]
+        return {
+            'function': _label(func),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        }
+
+    def hot_functions(self, limit: int = DEFAULT_HOT_LIMIT) -> List[Dict[str, Any]]:
+        """Functions with the most self time, hottest first."""
+        ranked = sorted(self.stats.stats, key=lambda func: self.stats.stats[func][2], reverse=True)
+        return [self._row(func) for func in ranked[:limit]]
+
+    def engine_functions(self) -> Dict[str, Dict[str, Any]]:
+        """Call counts and times of the ENGINE_FUNCTIONS that ran, keyed by name."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for func in self.stats.stats:
+            name = func[2]
+            if name not in ENGINE_FUNCTIONS or func[0] == '~':
+                continue
+            row = self._row(func)
+            if name in totals:  # Same name in both engines
+                for key in ('calls', 'primitive_calls', 'tottime_ms', 'cumtime_ms'):
+                    totals[name][key] += row[key]
+            else:
+                totals[name] = row
+        return totals
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """
+        Self time per call stack, in microseconds.
+
+        Returns:
+            Mapping of 'outer;...;inner' frame labels to microseconds
+        """
+        stats = self.stats.stats
+        callees: Dict[_FunctionKey, List[Tuple[_FunctionKey, float]]] = defaultdict(list)
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees[caller].append((func, edge[3]))
+
+        stacks: Dict[str, float] = defaultdict(float)
+
+        def walk(func: _FunctionKey, path: Tuple[_FunctionKey, ...], share: float) -> None:
+            _, _, tottime, cumtime, _ = stats[func]
+            labels = ';'.join(_label(f) for f in path)
+            stacks[labels] += tottime * share
+            for callee, edge_cumtime in callees.get(func, ()):
+                if callee in path or len(path) >= MAX_STACK_DEPTH:
+                    continue  # Recursion: time is already counted above
+                callee_cumtime = stats[callee][3]
+                if callee_cumtime > 0:
+                    walk(callee, path + (callee,), share * edge_cumtime / callee_cumtime)
+
+        roots = [func for func, entry in stats.items()
+                 if not any(caller in stats for caller in entry[4]) and func[2] != _PROFILER_DISABLE]
+        for root in roots:
+            walk(root, (root,), 1.0)
+
+        return {stack: int(round(seconds * 1e6)) for stack, seconds in stacks.items()
+                if seconds * 1e6 >= 0.5}
+
+    def write_collapsed(self, path: Union[str, Path]) -> None:
+        """Write collapsed stacks ('frame;frame;frame microseconds' per line)."""
+        with open(path, 'w') as f:
+            for stack, micros in sorted(self.collapsed_stacks().items()):
+                f.write(f"{stack} {micros}\n")
+
+    def to_dict(self, limit: int = DEFAULT_HOT_LIMIT) -> Dict[str, Any]:
+        """Summary for attaching to a result dictionary."""
+        return {
+            'total_ms': round(self.total_ms, 3),
+            'engine': self.engine_functions(),
+            'hot_functions': self.hot_functions(limit),
+        }
+
+    def format(self, limit: int = DEFAULT_HOT_LIMIT) -> str:
+        """Human-readable hot function table."""
+        lines = [f"Profiled {self.total_ms:.1f} ms",
+                 f"{'calls':>10} {'self ms':>10} {'cum ms':>10}  function"]
+        for row in self.hot_functions(limit):
+            lines.append(f"{row['calls']:>10} {row['tottime_ms']:>10.2f} "
+                         f"{row['cumtime_ms']:>10.2f}  {row['function']}")
+        return '\n'.join(lines)
+
+
+def profile_call(func: Callable, *args, **kwargs) -> Tuple[Any, ProfileReport]:
+    """
+    Run func under cProfile.
+
+    Returns:
+        Tuple of (func's return value, ProfileReport)
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    return result, ProfileReport(pstats.Stats(profiler))
+
+
+def profile_calculation(entry: Callable[[dict], dict], plan_params: dict) -> dict:
+    """
+    Profile a dict entry point and attach the report to its result.
+
+    Called by calculate_av when plan_params has ``profile`` set. The
+    summary goes under result['profile']; if ``profile_file`` is given the
+    collapsed stacks are written there.
+    """
+    params = {key: value for key, value in plan_params.items() if key not in PROFILE_OPTIONS}
+    result, report = profile_call(entry, params)
+    result['profile'] = report.to_dict()
+
+    profile_file: Optional[str] = plan_params.get('profile_file')
+    if profile_file:
+        report.write_collapsed(profile_file)
+        result['profile']['collapsed_file'] = str(profile_file)
+
+    return result
@@ -4,6 +4,8 @@ Service cost-sharing processing.
 Logic for calculating cost-sharing for individual service types.
 """
 
+from typing import Dict, Optional
+
 from .models import PlanDesign, TableRow, ContinuanceTable, Accumulators
 from .utils import compute_row_value, deductible_adjustment, effective_coinsurance_numerator, calculate_frequency
 
@@ -14,7 +16,7 @@ def process_service_cost_share(
     plan: PlanDesign,
     table_row: TableRow,
     accumulators: Accumulators
-) -> None:
+) -> float:
     """
     Process cost-sharing for a single service type and update accumulators.
 
@@ -31,6 +33,9 @@ def process_service_cost_share(
         table_row: Position in continuance table (deductible level)
         accumulators: Accumulator object to update
 
+    Returns:
+        Plan payment for this service at this spending level
+
     Side Effects:
         Updates accumulators in place:
         - beneficiary_pay_to_deduct
@@ -41,7 +46,7 @@ def process_service_cost_share(
     # Get cost at this spending level
     cost = compute_row_value(service_data, table_row)
     if cost == 0:
-        return  # No spending for this service
+        return 0.0  # No spending for this service
 
     # Get frequency (instances of service)
     frequency = calculate_frequency(service_data, table_row)
@@ -96,13 +101,15 @@ def process_service_cost_share(
     accumulators.plan_pay += plan_pays
     accumulators.total_pay += cost
     accumulators.eff_coins_numerator += eff_coins_num
+    return plan_pays
 
 
 def process_all_services(
     cont_table: ContinuanceTable,
     plan: PlanDesign,
     deduct_row: TableRow,
-    accumulators: Accumulators
+    accumulators: Accumulators,
+    per_service: Optional[Dict[str, float]] = None
 ) -> None:
     """
     Process all service types at the deductible spending level.
@@ -115,14 +122,17 @@ def process_all_services(
         plan: Plan design with all cost-sharing parameters
         deduct_row: Row in table corresponding to adjusted deductible
         accumulators: Accumulator object to update
+        per_service: Optional mapping filled with each service's plan payment
     """
     # Process each service that exists in the table
     for service_code, service_data in cont_table.services.items():
         if service_data is not None and len(service_data) > 0:
-            process_service_cost_share(
+            plan_pays = process_service_cost_share(
                 service_code=service_code,
                 service_data=service_data,
                 plan=plan,
                 table_row=deduct_row,
                 accumulators=accumulators
             )
+            if per_service is not None:
+                per_service[service_code] = plan_pays
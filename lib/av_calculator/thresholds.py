@@ -0,0 +1,102 @@
+"""
+Visit- and day-threshold benefit arrays.
+
+Supports plan designs such as "first 3 PCP visits at $0 copay, then
+deductible" and "per-day inpatient copay for days 1-5" using the
+'Primary Care >N Visits' and 'IP Max Days - N' continuance table columns.
+
+The ten threshold columns of each kind are stacked once per table into
+2D arrays, so the engine interpolates every threshold at a spending level
+in a single vectorized step and then selects the one a plan needs.
+"""
+
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .models import TableRow
+from .constants import (
+    PC_FREQ_COLUMN,
+    PC_VISIT_THRESHOLD_COLUMNS,
+    PC_VISIT_THRESHOLD_FREQ_COLUMNS,
+    IP_MAX_DAYS_COLUMNS,
+)
+
+
+class ThresholdValues(NamedTuple):
+    """
+    Threshold arrays interpolated at one spending level.
+
+    Attributes:
+        pc_visit_cost: Cost of PC visits beyond visit n (index n-1)
+        pc_visit_freq: Number of PC visits beyond visit n (index n-1)
+        pc_freq: Total PC visits
+        ip_days: Inpatient days capped at n days (index n-1)
+    """
+    pc_visit_cost: np.ndarray
+    pc_visit_freq: np.ndarray
+    pc_freq: float
+    ip_days: np.ndarray
+
+
+@dataclass
+class ThresholdArrays:
+    """
+    Stacked threshold columns for a continuance table.
+
+    Rows of each matrix are thresholds 1..10; columns are table rows.
+    """
+    pc_visit_cost: np.ndarray
+    pc_visit_freq: np.ndarray
+    pc_freq: np.ndarray
+    ip_days: np.ndarray
+
+    def at_row(self, table_row: TableRow) -> ThresholdValues:
+        """Interpolate every threshold at a table position in one pass."""
+        i = table_row.row_index
+        ppt = table_row.interpolation_factor
+        j = min(i + 1, self.pc_freq.shape[0] - 1)
+
+        def interp(values: np.ndarray):
+            low = values[..., i]
+            return low + ppt * (values[..., j] - low)
+
+        return ThresholdValues(
+            pc_visit_cost=interp(self.pc_visit_cost),
+            pc_visit_freq=interp(self.pc_visit_freq),
+            pc_freq=float(interp(self.pc_freq)),
+            ip_days=interp(self.ip_days),
+        )
+
+
+def get_threshold_arrays(cont_table) -> Optional[ThresholdArrays]:
+    """
+    Get the stacked threshold arrays for a table, building them on first use.
+
+    Cost columns come through ContinuanceTable.column(), so cost-adjusted
+    views scale visit costs while visit and day counts stay unscaled.
+
+    Args:
+        cont_table: ContinuanceTable or AdjustedContinuanceTable
+
+    Returns:
+        ThresholdArrays, or None if the table has no threshold columns (Rx tables)
+    """
+    if 'thresholds' not in cont_table.derived:
+        try:
+            cont_table.load_columns(
+                [PC_FREQ_COLUMN] + PC_VISIT_THRESHOLD_COLUMNS
+                + PC_VISIT_THRESHOLD_FREQ_COLUMNS + IP_MAX_DAYS_COLUMNS
+            )
+        except KeyError:
+            cont_table.derived['thresholds'] = None
+        else:
+            cont_table.derived['thresholds'] = ThresholdArrays(
+                pc_visit_cost=np.stack([cont_table.column(c) for c in PC_VISIT_THRESHOLD_COLUMNS]),
+                pc_visit_freq=np.stack([cont_table.column(c) for c in PC_VISIT_THRESHOLD_FREQ_COLUMNS]),
+                pc_freq=np.asarray(cont_table.column(PC_FREQ_COLUMN)),
+                ip_days=np.stack([cont_table.column(c) for c in IP_MAX_DAYS_COLUMNS]),
+            )
+
+    return cont_table.derived['thresholds']
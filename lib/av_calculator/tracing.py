@@ -0,0 +1,281 @@
+"""
+Convergence instrumentation for the AV engines.
+
+The engines report each inner (coinsurance) and outer (deductible/MOOP)
+iteration to a tracer. The default NullTracer is disabled, and the engines
+skip the tracer calls entirely when ``tracer.enabled`` is False, so
+production requests pay nothing for instrumentation.
+
+Tracers:
+- NullTracer: records nothing (the default)
+- RingBufferTracer: keeps the most recent iterations in preallocated NumPy
+  arrays and exports them as a compact binary .npz trace
+- SamplingTracer: forwards every Nth inner iteration to another tracer
+
+Iteration counts of every calculation are also aggregated into a
+process-wide IterationHistogram, which is cheap enough to keep always on.
+"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Protocol, Union
+
+import numpy as np
+
+from .constants import MAX_ITERATIONS
+
+
+# Column layout of the ring buffer records
+INNER_FIELDS = ('outer_iter', 'inner_iter', 'coins', 'gap')
+OUTER_FIELDS = (
+    'outer_iter',
+    'deduct_target',
+    'adjusted_deduct',
+    'adjusted_moop',
+    'total_beneficiary_pay',
+    'moop_target',
+    'gap',
+    'inner_iterations',
+)
+
+DEFAULT_TRACE_CAPACITY = 256
+
+
+class Tracer(Protocol):
+    """Interface the engines use to report convergence iterations."""
+
+    enabled: bool
+
+    def inner(self, outer_iter: int, inner_iter: int, coins: float, actual_coins: float) -> None:
+        """Record one inner (coinsurance) iteration."""
+
+    def outer(
+        self,
+        outer_iter: int,
+        deduct_target: float,
+        adjusted_deduct: float,
+        adjusted_moop: float,
+        total_beneficiary_pay: float,
+        moop_target: float,
+        inner_iterations: int,
+    ) -> None:
+        """Record one outer (deductible/MOOP) iteration."""
+
+    def finish(self) -> None:
+        """Called once when the calculation completes."""
+
+
+class NullTracer:
+    """Tracer that records nothing."""
+
+    enabled = False
+
+    def inner(self, outer_iter, inner_iter, coins, actual_coins) -> None:
+        pass
+
+    def outer(self, outer_iter, deduct_target, adjusted_deduct, adjusted_moop,
+              total_beneficiary_pay, moop_target, inner_iterations) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class RingBufferTracer:
+    """
+    Keep the most recent iteration records in fixed-size NumPy arrays.
+
+    Memory is allocated once up front; when more iterations are recorded
+    than the buffer holds, the oldest records are overwritten.
+
+    Args:
+        capacity: Number of inner and of outer records to keep
+        verbose: Print each outer iteration (and sampled inner iterations)
+        trace_file: If given, finish() exports the trace to this path
+    """
+
+    enabled = True
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_CAPACITY, verbose: bool = False,
+                 trace_file: Optional[Union[str, Path]] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.verbose = verbose
+        self.trace_file = trace_file
+        self._inner = np.zeros((capacity, len(INNER_FIELDS)))
+        self._outer = np.zeros((capacity, len(OUTER_FIELDS)))
+        self.inner_count = 0
+        self.outer_count = 0
+
+    def inner(self, outer_iter: int, inner_iter: int, coins: float, actual_coins: float) -> None:
+        gap = abs(coins - actual_coins)
+        record = self._inner[self.inner_count % self.capacity]
+        record[0] = outer_iter
+        record[1] = inner_iter
+        record[2] = coins
+        record[3] = gap
+        self.inner_count += 1
+
+        if self.verbose and (inner_iter < 3 or inner_iter % 10 == 0):
+            print(f"    Inner {inner_iter}: coins={coins:.4f}, "
+                  f"actual={actual_coins:.4f}, gap={gap:.6f}")
+
+    def outer(self, outer_iter, deduct_target, adjusted_deduct, adjusted_moop,
+              total_beneficiary_pay, moop_target, inner_iterations) -> None:
+        gap = abs(total_beneficiary_pay - moop_target)
+        self._outer[self.outer_count % self.capacity] = (
+            outer_iter, deduct_target, adjusted_deduct, adjusted_moop,
+            total_beneficiary_pay, moop_target, gap, inner_iterations,
+        )
+        self.outer_count += 1
+
+        if self.verbose:
+            print(f"\n=== Outer Iteration {outer_iter} ===")
+            print(f"  Deduct Target: ${deduct_target:,.2f}")
+            print(f"  Adjusted Deduct: ${adjusted_deduct:,.2f}")
+            print(f"  Adjusted MOOP: ${adjusted_moop:,.2f}")
+            print(f"  Total Bene Pay: ${total_beneficiary_pay:,.2f}")
+            print(f"  MOOP Target: ${moop_target:,.2f}")
+            print(f"  Convergence Gap: ${gap:,.2f}")
+            print(f"  Inner Iterations: {inner_iterations}")
+
+    def finish(self) -> None:
+        if self.trace_file:
+            self.export(self.trace_file)
+
+    @staticmethod
+    def _ordered(buffer: np.ndarray, count: int, capacity: int) -> np.ndarray:
+        if count <= capacity:
+            return buffer[:count].copy()
+        start = count % capacity
+        return np.concatenate([buffer[start:], buffer[:start]])
+
+    @property
+    def inner_records(self) -> np.ndarray:
+        """Retained inner records, oldest first, columns as INNER_FIELDS."""
+        return self._ordered(self._inner, self.inner_count, self.capacity)
+
+    @property
+    def outer_records(self) -> np.ndarray:
+        """Retained outer records, oldest first, columns as OUTER_FIELDS."""
+        return self._ordered(self._outer, self.outer_count, self.capacity)
+
+    def export(self, path: Union[str, Path]) -> None:
+        """
+        Write the trace as a compressed binary .npz file.
+
+        Use load_trace() to read it back.
+        """
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                inner=self.inner_records,
+                outer=self.outer_records,
+                counts=np.array([self.inner_count, self.outer_count]),
+            )
+
+
+class SamplingTracer:
+    """
+    Forward every Nth inner iteration, and every outer iteration, to a tracer.
+
+    Args:
+        tracer: Tracer that receives the sampled records
+        every: Sampling stride for inner iterations
+    """
+
+    enabled = True
+
+    def __init__(self, tracer: Tracer, every: int = 10):
+        if every <= 0:
+            raise ValueError("every must be positive")
+        self.tracer = tracer
+        self.every = every
+
+    def inner(self, outer_iter: int, inner_iter: int, coins: float, actual_coins: float) -> None:
+        if inner_iter % self.every == 0:
+            self.tracer.inner(outer_iter, inner_iter, coins, actual_coins)
+
+    def outer(self, *args) -> None:
+        self.tracer.outer(*args)
+
+    def finish(self) -> None:
+        self.tracer.finish()
+
+
+def load_trace(path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """
+    Read a trace written by RingBufferTracer.export().
+
+    Returns:
+        Dictionary with 'inner' and 'outer' record arrays and total 'counts'
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in ('inner', 'outer', 'counts')}
+
+
+def make_tracer(debug: bool = False, trace_file: Optional[Union[str, Path]] = None) -> Tracer:
+    """Pick a tracer for the engines' debug/trace_file options."""
+    if debug or trace_file:
+        return RingBufferTracer(verbose=debug, trace_file=trace_file)
+    return NULL_TRACER
+
+
+class IterationHistogram:
+    """
+    Counts of outer and inner iterations per calculation.
+
+    Bins are 0..MAX_ITERATIONS, with the last bin also holding anything
+    above. Histograms from different processes can be combined with merge().
+    """
+
+    def __init__(self, max_iterations: int = MAX_ITERATIONS):
+        self.max_iterations = max_iterations
+        self.outer = np.zeros(max_iterations + 1, dtype=np.int64)
+        self.inner = np.zeros(max_iterations + 1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def record(self, outer_iterations: int, inner_iterations: int) -> None:
+        """Record the iteration counts of one calculation."""
+        with self._lock:
+            self.outer[min(outer_iterations, self.max_iterations)] += 1
+            self.inner[min(inner_iterations, self.max_iterations)] += 1
+
+    def merge(self, other: 'IterationHistogram') -> None:
+        """Add another histogram's counts into this one."""
+        if other.max_iterations != self.max_iterations:
+            raise ValueError("Cannot merge histograms with different bin counts")
+        with self._lock:
+            self.outer += other.outer
+            self.inner += other.inner
+
+    def reset(self) -> None:
+        with self._lock:
+            self.outer[:] = 0
+            self.inner[:] = 0
+
+    @property
+    def count(self) -> int:
+        """Number of calculations recorded."""
+        return int(self.outer.sum())
+
+    def to_dict(self) -> Dict:
+        """Sparse {iterations: calculations} mapping for outer and inner counts."""
+        return {
+            'count': self.count,
+            'outer': {int(i): int(n) for i, n in enumerate(self.outer) if n},
+            'inner': {int(i): int(n) for i, n in enumerate(self.inner) if n},
+        }
+
+
+# Process-wide histogram fed by the engines
+ITERATION_HISTOGRAM = IterationHistogram()
+
+
+def get_iteration_histogram() -> IterationHistogram:
+    """Get the process-wide iteration histogram."""
+    return ITERATION_HISTOGRAM
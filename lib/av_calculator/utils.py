@@ -5,10 +5,38 @@ Table lookups, interpolation, and helper calculations.
 """
 
 import numpy as np
-from typing import Optional
+from typing import Dict, Optional
 
 from .models import TableRow, ContinuanceTable
-from .constants import METAL_TIER_RANGES
+from .constants import METAL_TIER_RANGES, CORE_COLUMNS, UNLIMITED_SPENDING, OTHER_SERVICE
+
+
+# Placeholder strings the Excel extraction left in empty numeric cells
+_EMPTY_CELL_VALUES = ('', '.', '. ', '.-')
+
+
+def parse_table_value(column_name: str, value) -> float:
+    """
+    Parse a raw continuance table cell into a float.
+
+    Args:
+        column_name: Column the value came from
+        value: Raw cell value from the JSON/Excel source
+
+    Returns:
+        Parsed value. 'Unlimited' (or empty) in the Up To column maps to
+        UNLIMITED_SPENDING; empty or unparseable cells elsewhere map to 0.0.
+    """
+    if column_name == CORE_COLUMNS[0]:
+        if value is None or str(value).strip().lower() == 'unlimited':
+            return UNLIMITED_SPENDING
+    elif value is None or str(value).strip() in _EMPTY_CELL_VALUES:
+        return 0.0
+
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
 
 
 def get_continuance_table_row(up_to_column: np.ndarray, amount: float) -> TableRow:
@@ -83,6 +111,79 @@ def compute_row_value(data_column: np.ndarray, table_row: TableRow) -> float:
         return float(val_low + ppt * (val_high - val_low))
 
 
+def attribute_above_moop(cont_table: ContinuanceTable, moop_row: TableRow,
+                         plan_pay_above_moop: float) -> Dict[str, float]:
+    """
+    Split plan payment above the MOOP among service codes.
+
+    The plan pays all cost above the MOOP, so each service is credited with
+    its cost above the MOOP row. Cost the table does not break out by
+    service (maxd covers more than the service columns) goes to OTHER_SERVICE.
+
+    Args:
+        cont_table: Continuance table with service columns
+        moop_row: Position of the MOOP spending level in the table
+        plan_pay_above_moop: Total plan payment above the MOOP
+
+    Returns:
+        Mapping of service code to plan payment; values sum to plan_pay_above_moop
+    """
+    attribution: Dict[str, float] = {}
+    for service_code, service_data in cont_table.services.items():
+        if service_data is not None and len(service_data) > 0:
+            attribution[service_code] = float(service_data[-1]) - compute_row_value(service_data, moop_row)
+    attribution[OTHER_SERVICE] = plan_pay_above_moop - sum(attribution.values())
+    return attribution
+
+
+def hsa_funding_used(cont_table: ContinuanceTable, hsa_contribution: float,
+                     adjusted_deductible: float, moop_spending: float,
+                     plan_pay_below_deduct: float, plan_pay_deduct_to_moop: float) -> float:
+    """
+    Expected employer HSA/HRA dollars spent on enrollee cost-sharing.
+
+    Enrollee cost-sharing grows with spending at the deductible-range share
+    up to the adjusted deductible and at the coinsurance-range share up to
+    the MOOP spending level, both implied by the converged plan payments.
+    The fund pays cost-sharing from the first dollar until it runs out, so
+    the expected draw is the limited expected cost-sharing at the spending
+    level where cumulative cost-sharing reaches the contribution.
+
+    Args:
+        cont_table: Continuance table the plan was solved against
+        hsa_contribution: Annual employer HSA/HRA contribution
+        adjusted_deductible: Spending level where the deductible is met
+        moop_spending: Spending level where the MOOP is met
+        plan_pay_below_deduct: Plan payment below the deductible
+        plan_pay_deduct_to_moop: Plan payment between deductible and MOOP
+
+    Returns:
+        Expected HSA/HRA payment, between 0 and hsa_contribution
+    """
+    if hsa_contribution <= 0:
+        return 0.0
+
+    def lev(amount: float) -> float:
+        return compute_row_value(cont_table.maxd, get_continuance_table_row(cont_table.up_to, amount))
+
+    lev_deductible = lev(adjusted_deductible)
+    lev_moop = lev(moop_spending)
+    deductible_rate = 1 - plan_pay_below_deduct / lev_deductible if lev_deductible > 0 else 0.0
+    deductible_rate = min(max(deductible_rate, 0.0), 1.0)
+    range_rate = 1 - plan_pay_deduct_to_moop / (lev_moop - lev_deductible) if lev_moop > lev_deductible else 0.0
+    range_rate = min(max(range_rate, 0.0), 1.0)
+
+    cost_at_deductible = deductible_rate * adjusted_deductible
+    if hsa_contribution <= cost_at_deductible:
+        return deductible_rate * lev(hsa_contribution / deductible_rate)
+
+    used = deductible_rate * lev_deductible
+    if range_rate > 0 and hsa_contribution < cost_at_deductible + range_rate * (moop_spending - adjusted_deductible):
+        level = adjusted_deductible + (hsa_contribution - cost_at_deductible) / range_rate
+        return used + range_rate * (lev(level) - lev_deductible)
+    return used + range_rate * (lev_moop - lev_deductible)
+
+
 def deductible_adjustment(cost: float, frequency: float, copay: float,
                          subject_to_deductible: bool) -> float:
     """
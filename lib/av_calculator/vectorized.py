@@ -0,0 +1,959 @@
+"""
+Vectorized batch AV engine.
+
+Solves many plan designs at once with NumPy, following
+calculate_av_combined_v2 step for step. Each plan is a lane: lanes iterate
+independently under masks, and the active set is compacted as lanes
+converge, so a batch costs roughly the sum of its plans' iterations rather
+than the slowest plan times the batch size.
+
+Results agree with the scalar engine to floating point round-off; the
+differential fuzz harness (tests/av-calculator/fuzz_engines.py) checks this
+over large random plan populations.
+
+Example:
+    >>> from av_calculator.vectorized import calculate_av_batch
+    >>> batch = calculate_av_batch([
+    ...     {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2},
+    ...     {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.3, 'metal_tier': 'Bronze'},
+    ... ])
+    >>> batch.av
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import PlanDesign, ContinuanceTable, AVResult, FamilyResult, ServiceAttribution
+from .continuance import get_adjusted_table
+from .calculator_v2 import (
+    DEFAULT_SERVICE_DEFINITIONS,
+    MAX_ITERATIONS,
+    TOLERANCE,
+    TUNING_PARAMETER,
+    create_default_services,
+)
+from .family import family_cost_sharing, family_member
+from .thresholds import get_threshold_arrays
+from .constants import OTHER_SERVICE
+from .utils import determine_metal_tier
+
+
+# Lanes solved together. Large chunks amortize slow-converging lanes, which
+# keep a chunk iterating after its other lanes have finished
+CHUNK_SIZE = 1 << 18
+
+# 1 - exp(-k / TUNING_PARAMETER) for every inner iteration count k, computed
+# with math.exp so the damping matches the scalar engine bit for bit
+_DAMPING = np.array([1 - math.exp(-k / TUNING_PARAMETER) for k in range(MAX_ITERATIONS + 2)])
+
+
+@dataclass
+class BatchResult:
+    """
+    Results of a batch calculation, one array entry per plan.
+
+    Lanes whose plan could not be calculated have NaN values and an error
+    message in ``errors``. With explain, ``explanation`` maps each spending
+    range ('below_deductible', 'deductible_to_moop', 'above_moop') to
+    per-service arrays of plan payment. With family_size, ``family`` holds
+    family-tier arrays ('av', 'total_plan_payment', 'total_allowed_cost',
+    'embedded_deductible'). ``capped`` marks lanes where either convergence
+    loop ran to ``max_iterations``.
+    """
+    av: np.ndarray
+    total_plan_payment: np.ndarray
+    total_allowed_cost: np.ndarray
+    plan_pay_below_deduct: np.ndarray
+    plan_pay_deduct_to_moop: np.ndarray
+    plan_pay_above_moop: np.ndarray
+    adjusted_deductible: np.ndarray
+    adjusted_moop: np.ndarray
+    plan_pay_hsa: np.ndarray
+    final_gap: np.ndarray
+    iterations_outer: np.ndarray
+    iterations_inner: np.ndarray
+    capped: np.ndarray
+    errors: List[Optional[str]]
+    calculation_time: float = 0.0  # Whole batch, milliseconds
+    explanation: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+    family: Optional[Dict[str, np.ndarray]] = None
+    family_size: Optional[int] = None
+    max_iterations: int = MAX_ITERATIONS
+
+    def __len__(self) -> int:
+        return len(self.av)
+
+    @property
+    def converged(self) -> np.ndarray:
+        """Lanes whose outer loop converged (the scalar engine's warning condition)."""
+        return (self.iterations_outer > 0) & (self.final_gap < TOLERANCE)
+
+    @property
+    def failed(self) -> np.ndarray:
+        """Lanes that raised instead of producing a result."""
+        return np.array([error is not None for error in self.errors], dtype=bool)
+
+    def warnings(self, i: int) -> List[str]:
+        """Warnings the scalar engine would report for lane i."""
+        warnings_list = []
+        if not self.converged[i]:
+            warnings_list.append(f"Convergence not achieved. Final gap: {self.final_gap[i]:.6f}")
+        if self.iterations_outer[i] >= self.max_iterations:
+            warnings_list.append(f"Outer loop hit max iterations ({self.max_iterations})")
+        return warnings_list
+
+    def result(self, i: int) -> AVResult:
+        """
+        Get lane i as an AVResult.
+
+        Raises:
+            ValueError: If the lane failed
+        """
+        if self.errors[i] is not None:
+            raise ValueError(self.errors[i])
+
+        av = float(self.av[i])
+        return AVResult(
+            av=av,
+            av_percent=av * 100,
+            metal_tier=determine_metal_tier(av),
+            total_plan_payment=float(self.total_plan_payment[i]),
+            total_allowed_cost=float(self.total_allowed_cost[i]),
+            plan_pay_below_deduct=float(self.plan_pay_below_deduct[i]),
+            plan_pay_deduct_to_moop=float(self.plan_pay_deduct_to_moop[i]),
+            plan_pay_above_moop=float(self.plan_pay_above_moop[i]),
+            adjusted_deductible=float(self.adjusted_deductible[i]),
+            adjusted_moop=float(self.adjusted_moop[i]),
+            plan_pay_hsa=float(self.plan_pay_hsa[i]),
+            iterations_outer=int(self.iterations_outer[i]),
+            iterations_inner=int(self.iterations_inner[i]),
+            calculation_time=self.calculation_time / max(len(self), 1),
+            warnings=self.warnings(i),
+            explanation=self.attribution(i) if self.explanation is not None else None,
+            family=self.family_result(i) if self.family is not None else None,
+        )
+
+    def family_result(self, i: int) -> FamilyResult:
+        """Get lane i's family-tier result (requires family_size)."""
+        if self.family is None:
+            raise ValueError("Batch was calculated without family_size")
+        return FamilyResult(
+            av=float(self.family['av'][i]),
+            total_plan_payment=float(self.family['total_plan_payment'][i]),
+            total_allowed_cost=float(self.family['total_allowed_cost'][i]),
+            family_size=self.family_size,
+            embedded_deductible=bool(self.family['embedded_deductible'][i]),
+        )
+
+    def attribution(self, i: int) -> ServiceAttribution:
+        """Get lane i's per-service explanation (requires explain=True)."""
+        if self.explanation is None:
+            raise ValueError("Batch was calculated without explain")
+        return ServiceAttribution(**{
+            range_name: {code: float(values[i]) for code, values in by_service.items()}
+            for range_name, by_service in self.explanation.items()
+        })
+
+    def to_dicts(self) -> List[dict]:
+        """Per-lane result dictionaries, {'error': message} for failed lanes."""
+        return [
+            {'error': self.errors[i]} if self.errors[i] is not None else self.result(i).to_dict()
+            for i in range(len(self))
+        ]
+
+
+# ============================================================================
+# TABLE LOOKUPS
+# ============================================================================
+
+def lookup_rows(up_to: np.ndarray, amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized get_continuance_table_row.
+
+    Returns:
+        Tuple of (row indices, interpolation factors)
+    """
+    n = len(up_to)
+    right = np.minimum(np.maximum(np.searchsorted(up_to, amounts, side='left'), 1), n - 1)
+    low = up_to[right - 1]
+    high = up_to[right]
+
+    exact = high == amounts
+    rows = np.where(exact, right, right - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ppt = np.where(exact, 0.0, (amounts - low) / (high - low))
+
+    below = amounts <= up_to[0]
+    above = (amounts >= up_to[-1]) | np.isnan(amounts)
+    rows = np.where(below, 0, np.where(above, n - 1, rows))
+    ppt = np.where(below | above, 0.0, ppt)
+    return rows, ppt
+
+
+def _interp(column: np.ndarray, rows: np.ndarray, ppt: np.ndarray) -> np.ndarray:
+    """Vectorized compute_row_value along the last axis of column."""
+    high_rows = np.minimum(rows + 1, column.shape[-1] - 1)
+    low = column[..., rows]
+    return np.where(ppt == 0.0, low, low + ppt * (column[..., high_rows] - low))
+
+
+def _interp_always(column: np.ndarray, rows: np.ndarray, ppt: np.ndarray) -> np.ndarray:
+    """Interpolation as ThresholdArrays.at_row does it (no ppt == 0 shortcut)."""
+    high_rows = np.minimum(rows + 1, column.shape[-1] - 1)
+    low = column[..., rows]
+    return low + ppt * (column[..., high_rows] - low)
+
+
+# ============================================================================
+# LANE PARAMETERS
+# ============================================================================
+
+@dataclass
+class _Lanes:
+    """Plan and service parameters for a group of lanes sharing one table."""
+    deductible: np.ndarray
+    moop: np.ndarray
+    copay: np.ndarray          # (services, lanes)
+    coinsurance: np.ndarray    # (services, lanes)
+    cad: np.ndarray
+    std: np.ndarray
+    stc: np.ndarray
+    first_visits: np.ndarray   # (lanes,), PC only
+    first_visits_copay: np.ndarray
+    per_day_limit: np.ndarray  # (lanes,), IP only
+    hsa_contribution: np.ndarray
+    errors: List[Optional[str]]
+
+
+def _table_services(cont_table: ContinuanceTable) -> List[str]:
+    """Service codes the scalar engine processes for this table, in its order."""
+    return [code for code, *_ in DEFAULT_SERVICE_DEFINITIONS if code in cont_table.services
+            and len(cont_table.services[code]) > 0]
+
+
+def _build_lanes(plans: Sequence[PlanDesign], codes: List[str]) -> _Lanes:
+    """Collect per-lane service parameters, mirroring create_default_services."""
+    n = len(plans)
+    definitions = {code: rest for code, *rest in DEFAULT_SERVICE_DEFINITIONS}
+    base_coins = np.array([plan.coinsurance for plan in plans], dtype=float)
+
+    shape = (len(codes), n)
+    lanes = _Lanes(
+        deductible=np.array([plan.deductible for plan in plans], dtype=float),
+        moop=np.array([plan.moop for plan in plans], dtype=float),
+        copay=np.empty(shape),
+        coinsurance=np.empty(shape),
+        cad=np.empty(shape, dtype=bool),
+        std=np.empty(shape, dtype=bool),
+        stc=np.empty(shape, dtype=bool),
+        first_visits=np.zeros(n, dtype=np.int64),
+        first_visits_copay=np.zeros(n),
+        per_day_limit=np.zeros(n, dtype=np.int64),
+        hsa_contribution=np.array([plan.hsa_contribution for plan in plans], dtype=float),
+        errors=[None] * n,
+    )
+
+    for s, code in enumerate(codes):
+        copay, coins, cad, std, stc = definitions[code]
+        lanes.copay[s] = copay
+        lanes.coinsurance[s] = base_coins if coins is None else coins
+        lanes.cad[s] = cad
+        lanes.std[s] = std
+        lanes.stc[s] = stc
+
+    # Plans with overrides go through the scalar configuration path so the
+    # same values are picked up and the same validation errors raised
+    for i, plan in enumerate(plans):
+        if not plan.service_params:
+            continue
+        # Malformed overrides (a copay of "x", a service that is not a mapping)
+        # fail here or on assignment; either way only this lane errors
+        try:
+            services = create_default_services(plan)
+            for s, code in enumerate(codes):
+                config = services[code]
+                lanes.copay[s, i] = config.copay
+                lanes.coinsurance[s, i] = config.coinsurance
+                lanes.cad[s, i] = config.copay_after_deductible
+                lanes.std[s, i] = config.subject_to_deductible
+                lanes.stc[s, i] = config.subject_to_coinsurance
+            lanes.first_visits[i] = services['PC'].first_visits
+            lanes.first_visits_copay[i] = services['PC'].first_visits_copay
+            lanes.per_day_limit[i] = services['IP'].per_day_limit
+        except (ValueError, TypeError, AttributeError) as e:
+            lanes.errors[i] = str(e)
+
+    return lanes
+
+
+# ============================================================================
+# SERVICE PROCESSING
+# ============================================================================
+
+def _below_deductible(cost, freq, copay, cad, std):
+    """Vectorized ServiceConfig.process_below_deductible (plan_pay, bene_to_deduct)."""
+    copay_amount = np.minimum(cost, freq * copay)
+    net = np.maximum(0, cost - copay_amount)
+    plan_pay = np.where(~cad & ~std, net, 0.0)
+    bene_to_deduct = np.where(cad, cost, np.where(std, net, 0.0))
+    return plan_pay, bene_to_deduct
+
+
+def _coinsurance_range(cost, freq, copay, coins, cad, stc):
+    """Vectorized ServiceConfig.process_coinsurance_range (plan_pay only)."""
+    copay_amount = np.minimum(cost, freq * copay)
+    copay_plan_pay = np.maximum(0, cost - copay_amount)
+    uses_copay = ~stc | ((copay > 0) & ~cad)
+    return np.where(uses_copay, copay_plan_pay, cost * (1 - coins))
+
+
+def _first_visits(cost, freq, copay):
+    """Vectorized ServiceConfig.process_first_visits (plan_pay only)."""
+    return np.maximum(0, cost - np.minimum(cost, freq * copay))
+
+
+def _accumulate(values: np.ndarray, at: int = -1, extra: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Sum per-service values over services in service order.
+
+    Rows are added one at a time, like the scalar engine's running totals,
+    so results match it exactly (ndarray.sum may reorder the additions).
+    If extra is given it is added just before row at.
+    """
+    total = np.zeros(values.shape[1])
+    for s in range(values.shape[0]):
+        if s == at and extra is not None:
+            total = total + extra
+        total = total + values[s]
+    return total
+
+
+class _Solver:
+    """Solve a group of lanes against one continuance table."""
+
+    def __init__(self, cont_table: ContinuanceTable, codes: List[str], lanes: _Lanes,
+                 explain: bool = False, max_iterations: int = MAX_ITERATIONS):
+        self.table = cont_table
+        self.codes = codes
+        self.lanes = lanes
+        self.up_to = np.asarray(cont_table.up_to, dtype=float)
+        self.maxd = np.asarray(cont_table.maxd, dtype=float)
+        self.costs = np.array([cont_table.services[code] for code in codes], dtype=float)
+        self.total_expected_cost = float(cont_table.total_expected_cost)
+        self.pc = codes.index('PC') if 'PC' in codes else -1
+        self.ip = codes.index('IP') if 'IP' in codes else -1
+        self.max_iterations = max_iterations
+        # Below the engine's own cap, a lane that reaches it is already not
+        # the full solve, so it stops there instead of finishing its outer loop
+        self.stop_capped = max_iterations < MAX_ITERATIONS
+
+        uses_thresholds = bool((lanes.first_visits > 0).any() or (lanes.per_day_limit > 0).any())
+        self.thresholds = get_threshold_arrays(cont_table) if uses_thresholds else None
+
+        # Per-service plan payment from each lane's latest sweep and from the
+        # coinsurance range, kept for explanations
+        shape = (len(codes), len(lanes.deductible))
+        self.sweep_by_service = np.zeros(shape) if explain else None
+        self.range_by_service = np.zeros(shape) if explain else None
+
+    def _threshold_values(self, idx, rows, ppt):
+        """Per-lane threshold values for each lane's own first-visit/per-day limit."""
+        t = self.thresholds
+        fv = np.maximum(self.lanes.first_visits[idx] - 1, 0)
+        pd = np.maximum(self.lanes.per_day_limit[idx] - 1, 0)
+        high_rows = np.minimum(rows + 1, len(self.up_to) - 1)
+
+        def pick(matrix, n):
+            low = matrix[n, rows]
+            return low + ppt * (matrix[n, high_rows] - low)
+
+        return (
+            pick(t.pc_visit_cost, fv),
+            pick(t.pc_visit_freq, fv),
+            _interp_always(t.pc_freq, rows, ppt),
+            pick(t.ip_days, pd),
+        )
+
+    def sweep(self, idx, rows, ppt):
+        """Vectorized process_all_services_v2 for lanes idx at (rows, ppt)."""
+        lanes = self.lanes
+        cost = _interp(self.costs, rows, ppt)
+        active = cost > 0
+        freq = np.ones_like(cost)
+        first_plan_pay = first_total = None
+
+        if self.thresholds is not None:
+            pcv_cost, pcv_freq, pc_freq, ip_days = self._threshold_values(idx, rows, ppt)
+            if self.ip >= 0:
+                freq[self.ip] = np.where(lanes.per_day_limit[idx] > 0, ip_days, 1.0)
+            if self.pc >= 0:
+                # First N visits are paid before the rest of the PC cost
+                pc_cost = cost[self.pc]
+                first = (lanes.first_visits[idx] > 0) & active[self.pc]
+                cost_after = np.where(first, np.minimum(pc_cost, pcv_cost), pc_cost)
+                first_plan_pay = np.where(first, _first_visits(
+                    pc_cost - cost_after, np.maximum(0.0, pc_freq - pcv_freq), lanes.first_visits_copay[idx]
+                ), 0.0)
+                first_total = np.where(first, pc_cost - cost_after, 0.0)
+                cost[self.pc] = cost_after
+                freq[self.pc] = np.where(first, pcv_freq, 1.0)
+
+        plan_pay, bene_to_deduct = _below_deductible(
+            cost, freq, lanes.copay[:, idx], lanes.cad[:, idx], lanes.std[:, idx]
+        )
+        plan_pay = np.where(active, plan_pay, 0.0)
+        bene_to_deduct = np.where(active, bene_to_deduct, 0.0)
+        total_pay = np.where(active, cost, 0.0)
+
+        if self.sweep_by_service is not None:
+            self.sweep_by_service[:, idx] = plan_pay
+            if first_plan_pay is not None:
+                self.sweep_by_service[self.pc, idx] = first_plan_pay + plan_pay[self.pc]
+
+        return (
+            _accumulate(plan_pay, self.pc, first_plan_pay),
+            _accumulate(bene_to_deduct),
+            _accumulate(total_pay, self.pc, first_total),
+        )
+
+    def effective_coinsurance(self) -> np.ndarray:
+        """Vectorized calculate_effective_coinsurance for all lanes."""
+        n = len(self.lanes.deductible)
+        weighted = np.zeros(n)
+        if self.total_expected_cost <= 0:
+            return weighted
+
+        for s in range(len(self.codes)):
+            avg_cost = float(self.costs[s, -1])
+            if avg_cost > 0:
+                share = avg_cost / self.total_expected_cost
+                weighted = np.where(self.lanes.stc[s], weighted + self.lanes.coinsurance[s] * share, weighted)
+        return weighted
+
+    def coinsurance_range(self, idx, troop):
+        """Plan payment between deductible and MOOP for lanes idx."""
+        lanes = self.lanes
+        moop_rows, moop_ppt = lookup_rows(self.up_to, troop)
+        ded_rows, ded_ppt = lookup_rows(self.up_to, lanes.deductible[idx])
+        cost = _interp(self.costs, moop_rows, moop_ppt) - _interp(self.costs, ded_rows, ded_ppt)
+        active = cost > 0
+        freq = np.ones_like(cost)
+
+        copay = lanes.copay[:, idx]
+        coins = lanes.coinsurance[:, idx]
+        cad = lanes.cad[:, idx]
+        stc = lanes.stc[:, idx]
+
+        first = None
+        if self.thresholds is not None:
+            at_moop = self._threshold_values(idx, moop_rows, moop_ppt)
+            at_ded = self._threshold_values(idx, ded_rows, ded_ppt)
+            if self.ip >= 0:
+                freq[self.ip] = np.where(
+                    lanes.per_day_limit[idx] > 0, np.maximum(0.0, at_moop[3] - at_ded[3]), 1.0
+                )
+            if self.pc >= 0:
+                first = lanes.first_visits[idx] > 0
+
+        plan_pay = _coinsurance_range(cost, freq, copay, coins, cad, stc)
+
+        if first is not None:
+            # Split the PC range into first-N visits and visits beyond N
+            s = self.pc
+            after = np.maximum(0.0, np.minimum(cost[s], at_moop[0] - at_ded[0]))
+            freq_after = at_moop[1] - at_ded[1]
+            freq_first = (at_moop[2] - at_ded[2]) - freq_after
+            first_plan_pay = _first_visits(
+                cost[s] - after, np.maximum(0.0, freq_first), lanes.first_visits_copay[idx]
+            )
+            after_plan_pay = _coinsurance_range(
+                after, np.maximum(0.0, freq_after), copay[s], coins[s], cad[s], stc[s]
+            )
+            plan_pay[s] = np.where(first, first_plan_pay + after_plan_pay, plan_pay[s])
+
+        plan_pay = np.where(active, plan_pay, 0.0)
+        if self.range_by_service is not None:
+            self.range_by_service[:, idx] = plan_pay
+        return _accumulate(plan_pay)
+
+    def solve(self) -> Dict[str, np.ndarray]:
+        """Run the nested convergence loops and payment integrals for every lane."""
+        lanes = self.lanes
+        n = len(lanes.deductible)
+        moop_target = lanes.moop
+
+        deduct_target = lanes.deductible.copy()
+        adjusted_deduct = np.full(n, -1.0)
+        adjusted_moop = np.full(n, -1.0)
+        total_bene = np.full(n, -1.0)
+        deduct_eq_moop = lanes.deductible == lanes.moop
+        iter_deduct = np.zeros(n, dtype=np.int64)
+        total_iter_coins = np.zeros(n, dtype=np.int64)
+        capped = np.zeros(n, dtype=bool)
+
+        coins = np.ones(n)
+        prior_coins = np.zeros(n)
+        actual_coins = np.full(n, -1.0)
+        iter_coins = np.zeros(n, dtype=np.int64)
+        acc_plan = np.zeros(n)
+        acc_bene = np.zeros(n)
+        acc_total = np.zeros(n)
+        last_rows = np.full(n, -1, dtype=np.int64)
+        last_ppt = np.zeros(n)
+
+        failed = np.array([error is not None for error in lanes.errors], dtype=bool)
+        outer = np.flatnonzero(~failed)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            while outer.size:
+                coins[outer] = 1.0
+                prior_coins[outer] = 0.0
+                actual_coins[outer] = -1.0
+                total_bene[outer] = 0.0
+                acc_plan[outer] = 0.0
+                acc_bene[outer] = 0.0
+                acc_total[outer] = 0.0
+                iter_coins[outer] = 0
+
+                inner = outer
+                while inner.size:
+                    c = coins[inner]
+                    done = ((np.abs(prior_coins[inner] - actual_coins[inner]) < TOLERANCE)
+                            | (adjusted_deduct[inner] == 0) | (c == 0))
+                    if done.any():
+                        keep = ~done
+                        inner, c = inner[keep], c[keep]
+                        if not inner.size:
+                            break
+
+                    target = deduct_target[inner]
+                    adj = np.where(c > 0, target / c, target)
+                    adjusted_deduct[inner] = adj
+
+                    rows, ppt = lookup_rows(self.up_to, adj)
+                    last_rows[inner] = rows
+                    last_ppt[inner] = ppt
+
+                    plan_pay, bene_pay, total_pay = self.sweep(inner, rows, ppt)
+                    acc_plan[inner] = plan_pay
+                    acc_bene[inner] = bene_pay
+                    acc_total[inner] = total_pay
+
+                    actual = np.where(total_pay > 0, bene_pay / total_pay, 0.0)
+                    actual_coins[inner] = actual
+                    prior_coins[inner] = c
+
+                    k = iter_coins[inner]
+                    coins[inner] = np.where(c == 1.0, actual, (c + actual) / 2 * _DAMPING[k])
+                    iter_coins[inner] = k + 1
+
+                    capped[inner[k + 1 > self.max_iterations]] = True
+                    inner = inner[k + 1 <= self.max_iterations]
+
+                total_iter_coins[outer] += iter_coins[outer]
+
+                # MOOP adjustment and beneficiary payment (VBA lines 2105-2120)
+                adj = adjusted_deduct[outer]
+                plan_pay = acc_plan[outer]
+                bene_pay = acc_bene[outer]
+                total_pay = acc_total[outer]
+                moop = moop_target[outer]
+
+                eff_coins_to_moop = np.round(1 - (plan_pay / total_pay) - (bene_pay / total_pay), 5)
+                adjusted_moop[outer] = np.where(
+                    (adj > 0) & (total_pay > 0), moop - adj * eff_coins_to_moop, moop
+                )
+                bene = np.where(total_pay == 0, 0.0, adj * (1 - plan_pay / total_pay))
+                total_bene[outer] = bene
+
+                converged = np.abs(bene - moop) < TOLERANCE
+
+                # Deductible target adjustment (VBA lines 2122-2131)
+                target = deduct_target[outer]
+                deq = deduct_eq_moop[outer]
+                needs_adjustment = ~converged & (
+                    (bene > moop) | ((adj > 0) & (coins[outer] == 0)) | deq | (bene < moop - TOLERANCE)
+                )
+
+                zero_target = needs_adjustment & (target == 0)
+                for i in outer[zero_target]:
+                    lanes.errors[i] = 'float division by zero'
+
+                change_pct = np.maximum(0.25, np.minimum(2.0, 1 + (moop - bene) / (2 * target)))
+                deduct_target[outer] = np.where(needs_adjustment, target * change_pct, target)
+                deq = deq | needs_adjustment
+                deduct_eq_moop[outer] = deq
+
+                exits = converged | (~deq & (deduct_target[outer] <= adjusted_moop[outer]))
+                iter_deduct[outer[~zero_target]] += 1
+
+                outer = outer[~exits & ~zero_target]
+                if self.stop_capped:
+                    outer = outer[~capped[outer]]
+                capped[outer[iter_deduct[outer] > self.max_iterations]] = True
+                outer = outer[iter_deduct[outer] <= self.max_iterations]
+
+        failed = np.array([error is not None for error in lanes.errors], dtype=bool)
+        result = self._integrate(
+            failed, deduct_eq_moop, adjusted_deduct, adjusted_moop, total_bene,
+            acc_plan, acc_total, last_rows, last_ppt, iter_deduct, total_iter_coins,
+        )
+        result['capped'] = capped & ~failed
+        return result
+
+    def _integrate(self, failed, deduct_eq_moop, adjusted_deduct, adjusted_moop, total_bene,
+                   acc_plan, acc_total, last_rows, last_ppt, iter_deduct, total_iter_coins):
+        """Plan payments below deductible, in the coinsurance range and above MOOP."""
+        lanes = self.lanes
+        n = len(lanes.deductible)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # STEP 6: recalculate plan payment below deductible
+            has_pay = acc_total > 0
+            rows, ppt = lookup_rows(self.up_to, adjusted_deduct)
+            last_rows = np.where(has_pay, rows, last_rows)
+            last_ppt = np.where(has_pay, ppt, last_ppt)
+            ded_maxd = _interp(self.maxd, last_rows, last_ppt)
+            below = np.where(has_pay, ded_maxd * acc_plan / acc_total, 0.0)
+
+            # STEP 7: effective coinsurance and true out-of-pocket to MOOP
+            eff_coins = np.minimum(self.effective_coinsurance(), 1.0)
+            troop = np.where(
+                deduct_eq_moop | (eff_coins == 1),
+                adjusted_deduct,
+                adjusted_deduct + (adjusted_moop - lanes.deductible) / (1 - eff_coins),
+            )
+
+            # STEP 8: coinsurance range
+            mid = np.zeros(n)
+            in_range = np.flatnonzero(
+                ~failed & ~(adjusted_moop < lanes.deductible)
+                & ~deduct_eq_moop & (adjusted_moop > lanes.deductible)
+            )
+            if in_range.size:
+                mid[in_range] = self.coinsurance_range(in_range, troop[in_range])
+
+            # STEP 9: above MOOP
+            moop_rows, moop_ppt = lookup_rows(self.up_to, troop)
+            at_moop = np.where(
+                deduct_eq_moop,
+                _interp(self.maxd, last_rows, last_ppt),
+                _interp(self.maxd, moop_rows, moop_ppt),
+            )
+            above = self.total_expected_cost - at_moop
+
+            # Employer HSA/HRA dollars spent on cost-sharing
+            hsa = np.zeros(n)
+            funded = np.flatnonzero(~failed & (lanes.hsa_contribution > 0))
+            if funded.size:
+                moop_spending = np.where(deduct_eq_moop, adjusted_deduct, troop)
+                hsa[funded] = self._hsa_funding(
+                    lanes.hsa_contribution[funded], adjusted_deduct[funded],
+                    moop_spending[funded], below[funded], mid[funded],
+                )
+
+            # STEP 10: final AV
+            total = below + mid + above + hsa
+            if self.total_expected_cost > 0:
+                av = np.minimum(total / self.total_expected_cost, 1.0)
+            else:
+                av = np.zeros(n)
+
+        final_gap = np.where(iter_deduct > 0, np.abs(total_bene - lanes.moop), 0.0)
+
+        result = {
+            'av': av,
+            'total_plan_payment': total,
+            'total_allowed_cost': np.full(n, self.total_expected_cost),
+            'plan_pay_below_deduct': below,
+            'plan_pay_deduct_to_moop': mid,
+            'plan_pay_above_moop': above,
+            'adjusted_deductible': adjusted_deduct,
+            'adjusted_moop': adjusted_moop,
+            'plan_pay_hsa': hsa,
+            'final_gap': final_gap,
+        }
+        for key, values in result.items():
+            result[key] = np.where(failed, np.nan, values)
+
+        result['moop_spending'] = np.where(failed, np.nan, troop)
+        result['iterations_outer'] = iter_deduct
+        result['iterations_inner'] = total_iter_coins // np.maximum(iter_deduct, 1)
+
+        if self.sweep_by_service is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                below_scale = np.where(has_pay, ded_maxd / acc_total, 0.0)
+            moop_rows = np.where(deduct_eq_moop, last_rows, moop_rows)
+            moop_ppt = np.where(deduct_eq_moop, last_ppt, moop_ppt)
+            result['explanation'] = self._explain(failed, below_scale, above, moop_rows, moop_ppt)
+        return result
+
+    def _lev(self, amounts: np.ndarray) -> np.ndarray:
+        """Limited expected cost (maxd) at each spending amount."""
+        return _interp(self.maxd, *lookup_rows(self.up_to, amounts))
+
+    def _hsa_funding(self, hsa, adjusted_deduct, moop_spending, below, mid) -> np.ndarray:
+        """Vectorized utils.hsa_funding_used."""
+        lev_deductible = self._lev(adjusted_deduct)
+        lev_moop = self._lev(moop_spending)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deductible_rate = np.where(lev_deductible > 0, 1 - below / lev_deductible, 0.0)
+            range_rate = np.where(lev_moop > lev_deductible, 1 - mid / (lev_moop - lev_deductible), 0.0)
+            deductible_rate = np.minimum(np.maximum(deductible_rate, 0.0), 1.0)
+            range_rate = np.minimum(np.maximum(range_rate, 0.0), 1.0)
+
+            cost_at_deductible = deductible_rate * adjusted_deduct
+            in_deductible = hsa <= cost_at_deductible
+            in_range = ~in_deductible & (range_rate > 0) & (
+                hsa < cost_at_deductible + range_rate * (moop_spending - adjusted_deduct)
+            )
+            level = np.where(
+                in_deductible,
+                hsa / deductible_rate,
+                adjusted_deduct + (hsa - cost_at_deductible) / range_rate,
+            )
+            lev_level = self._lev(np.where(in_deductible | in_range, level, 0.0))
+
+        used = deductible_rate * lev_deductible
+        return np.where(
+            in_deductible,
+            deductible_rate * lev_level,
+            np.where(in_range, used + range_rate * (lev_level - lev_deductible),
+                     used + range_rate * (lev_moop - lev_deductible)),
+        )
+
+    def _explain(self, failed, below_scale, above, moop_rows, moop_ppt) -> Dict[str, Dict[str, np.ndarray]]:
+        """Per-service plan payment in each range, as ServiceAttribution computes it."""
+        def by_code(matrix):
+            return {code: np.where(failed, np.nan, matrix[s]) for s, code in enumerate(self.codes)}
+
+        # Above MOOP: every table service's cost above the MOOP level, with
+        # the rest of the plan payment in the OTHER bucket
+        above_by_service = {}
+        for code, data in self.table.services.items():
+            if data is None or len(data) == 0:
+                continue
+            column = np.asarray(data, dtype=float)
+            above_by_service[code] = column[-1] - _interp(column, moop_rows, moop_ppt)
+        attributed = np.zeros_like(above)
+        for values in above_by_service.values():
+            attributed = attributed + values
+        above_by_service[OTHER_SERVICE] = above - attributed
+
+        return {
+            'below_deductible': by_code(self.sweep_by_service * below_scale),
+            'deductible_to_moop': by_code(self.range_by_service),
+            'above_moop': {code: np.where(failed, np.nan, values) for code, values in above_by_service.items()},
+        }
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+_FLOAT_FIELDS = (
+    'av', 'total_plan_payment', 'total_allowed_cost', 'plan_pay_below_deduct',
+    'plan_pay_deduct_to_moop', 'plan_pay_above_moop', 'adjusted_deductible',
+    'adjusted_moop', 'plan_pay_hsa', 'final_gap',
+)
+
+_EXPLAIN_RANGES = ('below_deductible', 'deductible_to_moop', 'above_moop')
+
+
+def _plan_from_params(plan_params: dict) -> PlanDesign:
+    """Build a PlanDesign the way calculator_v2.calculate_av does."""
+    return PlanDesign(
+        deductible=plan_params['deductible'],
+        moop=plan_params['moop'],
+        coinsurance=plan_params['coinsurance'],
+        metal_tier=plan_params.get('metal_tier', 'Silver'),
+        family_deductible=plan_params.get('family_deductible'),
+        family_moop=plan_params.get('family_moop'),
+        embedded_deductible=plan_params.get('embedded_deductible', True),
+        hsa_contribution=plan_params.get('hsa_contribution', 0.0),
+        service_params=plan_params.get('service_params', {}),
+    )
+
+
+def _family_fields(table: ContinuanceTable, solved: Dict[str, np.ndarray], designs: List[PlanDesign],
+                   member_lanes: List[int], family_size: int) -> Dict[str, np.ndarray]:
+    """
+    Family-tier arrays for a solved chunk.
+
+    Lanes past len(designs) are the extra member lanes of non-embedded
+    plans; member_lanes gives each plan's member lane.
+    """
+    member = {name: solved[name][member_lanes] for name in (
+        'adjusted_deductible', 'moop_spending', 'plan_pay_below_deduct',
+        'plan_pay_deduct_to_moop', 'total_plan_payment', 'total_allowed_cost', 'plan_pay_hsa',
+    )}
+    n = len(designs)
+    family = np.full(n, np.nan)
+    valid = np.flatnonzero(~np.isnan(member['total_plan_payment']))
+    if valid.size:
+        family[valid] = family_cost_sharing(
+            table,
+            member['adjusted_deductible'][valid],
+            member['moop_spending'][valid],
+            member['plan_pay_below_deduct'][valid],
+            member['plan_pay_deduct_to_moop'][valid],
+            (member['total_allowed_cost'] - member['total_plan_payment'] + member['plan_pay_hsa'])[valid],
+            np.array([family_member(designs[i]).deductible for i in valid], dtype=float),
+            np.array([designs[i].family_deductible for i in valid], dtype=float),
+            np.array([designs[i].family_moop for i in valid], dtype=float),
+            family_size,
+        )
+
+    allowed = family_size * float(table.total_expected_cost)
+    plan_payment = allowed - family
+    return {
+        'av': np.minimum(plan_payment / allowed, 1.0) if allowed > 0 else np.zeros(n),
+        'total_plan_payment': plan_payment,
+        'total_allowed_cost': np.where(np.isnan(family), np.nan, allowed),
+        'embedded_deductible': np.array([design.embedded_deductible for design in designs], dtype=bool),
+    }
+
+
+def calculate_av_batch(
+    plans: Sequence[Union[PlanDesign, dict]],
+    cont_table: Optional[ContinuanceTable] = None,
+    trend_factor: float = 1.0,
+    area_factor: float = 1.0,
+    plan_year: Optional[int] = None,
+    explain: bool = False,
+    family_size: Optional[int] = None,
+    max_iterations: int = MAX_ITERATIONS,
+) -> BatchResult:
+    """
+    Calculate AV for many plans with the vectorized engine.
+
+    Args:
+        plans: PlanDesign objects, or plan_params dicts as accepted by
+            calculator_v2.calculate_av (dicts may carry their own
+            trend_factor/area_factor/plan_year)
+        cont_table: Table to use for every plan (default: each plan's
+            combined table for its metal tier)
+        trend_factor: Default cost trend factor
+        area_factor: Default area factor
+        plan_year: Default continuance table vintage
+        explain: Also attribute each lane's plan payment to service codes,
+            from the same sweeps (see BatchResult.explanation)
+        family_size: Also evaluate each plan's family tier for families of
+            this many members (see family.py); plans that are not embedded
+            get an extra member lane in the same solve
+        max_iterations: Cap on each convergence loop. Lanes that stay under
+            it solve exactly as at the default; below the default, a lane
+            stops as soon as either loop reaches it (see BatchResult.capped)
+
+    Returns:
+        BatchResult with one lane per plan, in input order
+
+    Raises:
+        ValueError: If family_size is less than 1, or max_iterations is
+            outside 1..MAX_ITERATIONS
+    """
+    if family_size is not None and family_size < 1:
+        raise ValueError(f"Family size must be at least 1, got {family_size}")
+    if not 1 <= max_iterations <= MAX_ITERATIONS:
+        raise ValueError(
+            f"max_iterations must be between 1 and {MAX_ITERATIONS}, got {max_iterations}"
+        )
+
+    start_time = time.time()
+    n = len(plans)
+    errors: List[Optional[str]] = [None] * n
+
+    # Group lanes by the table they are solved against
+    groups: Dict[tuple, List[int]] = {}
+    designs: List[Optional[PlanDesign]] = [None] * n
+    for i, plan in enumerate(plans):
+        if isinstance(plan, PlanDesign):
+            design, key = plan, (plan.metal_tier, trend_factor, area_factor, plan_year)
+        else:
+            try:
+                design = _plan_from_params(plan)
+                key = (
+                    design.metal_tier,
+                    plan.get('trend_factor', trend_factor),
+                    plan.get('area_factor', area_factor),
+                    plan.get('plan_year', plan_year),
+                )
+                hash(key)  # Unhashable factors (e.g. lists) cannot group lanes
+            except KeyError as e:
+                errors[i] = f"Missing required field: {e.args[0]}"
+                continue
+            except (ValueError, TypeError) as e:
+                errors[i] = str(e)
+                continue
+        designs[i] = design
+        groups.setdefault(key if cont_table is None else None, []).append(i)
+
+    fields = {name: np.full(n, np.nan) for name in _FLOAT_FIELDS}
+    fields['iterations_outer'] = np.zeros(n, dtype=np.int64)
+    fields['iterations_inner'] = np.zeros(n, dtype=np.int64)
+    fields['capped'] = np.zeros(n, dtype=bool)
+    explanation = {range_name: {} for range_name in _EXPLAIN_RANGES} if explain else None
+    family = None
+    if family_size is not None:
+        family = {name: np.full(n, np.nan) for name in ('av', 'total_plan_payment', 'total_allowed_cost')}
+        family['embedded_deductible'] = np.ones(n, dtype=bool)
+
+    for key, members in groups.items():
+        if cont_table is not None:
+            table = cont_table
+        else:
+            tier, trend, area, year = key
+            try:
+                table = get_adjusted_table(tier, 'combined', trend_factor=trend,
+                                           area_factor=area, plan_year=year)
+            except (FileNotFoundError, ValueError, KeyError, TypeError) as e:
+                for i in members:
+                    errors[i] = str(e)
+                continue
+
+        codes = _table_services(table)
+        for start in range(0, len(members), CHUNK_SIZE):
+            chunk = np.array(members[start:start + CHUNK_SIZE])
+            chunk_designs = [designs[i] for i in chunk]
+            m = len(chunk)
+
+            # Non-embedded family plans solve their member at the family limits
+            member_lanes = list(range(m))
+            member_designs = []
+            if family_size is not None:
+                for j, design in enumerate(chunk_designs):
+                    if not design.embedded_deductible:
+                        member_lanes[j] = m + len(member_designs)
+                        member_designs.append(family_member(design))
+
+            lanes = _build_lanes(chunk_designs + member_designs, codes)
+            solved = _Solver(table, codes, lanes, explain=explain, max_iterations=max_iterations).solve()
+            by_range = solved.pop('explanation', None)
+            if family_size is not None:
+                for name, values in _family_fields(table, solved, chunk_designs,
+                                                   member_lanes, family_size).items():
+                    family[name][chunk] = values
+            solved.pop('moop_spending')
+            for name, values in solved.items():
+                fields[name][chunk] = values[:m]
+            for range_name, by_service in (by_range or {}).items():
+                for code, values in by_service.items():
+                    explanation[range_name].setdefault(code, np.full(n, np.nan))[chunk] = values[:m]
+            for j, i in enumerate(chunk):
+                errors[i] = lanes.errors[j]
+                if errors[i] is None and lanes.errors[member_lanes[j]] is not None:
+                    errors[i] = f"Family member: {lanes.errors[member_lanes[j]]}"
+
+    return BatchResult(
+        **fields,
+        errors=errors,
+        calculation_time=(time.time() - start_time) * 1000,
+        explanation=explanation,
+        family=family,
+        family_size=family_size,
+        max_iterations=max_iterations,
+    )
@@ -0,0 +1,328 @@
+"""
+Benchmark suite for the AV calculation engines.
+
+Runs real workloads against calculator.py (v1), calculator_v2.py (v2) and
+the vectorized batch engine (vectorized.py), records throughput and AV
+results, and compares them with the stored JSON baseline in
+baselines/engine_benchmarks.json.
+
+Cold start cases time a fresh interpreter importing the package (and
+solving one plan), which is what every serverless cold start pays.
+
+Usage:
+    python benchmarks.py              # run and compare with the baseline
+    python benchmarks.py --update     # run and rewrite the baseline
+    python benchmarks.py --full       # include the 100k batch
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+TEST_ROOT = Path(__file__).parent
+LIB_DIR = TEST_ROOT.parent.parent / "lib"
+BASELINE_PATH = TEST_ROOT / "baselines" / "engine_benchmarks.json"
+
+if str(LIB_DIR) not in sys.path:
+    sys.path.insert(0, str(LIB_DIR))
+
+from av_calculator import calculate_av  # noqa: E402
+from av_calculator.calculator_v2 import calculate_av as calculate_av_v2  # noqa: E402
+from av_calculator.continuance import clear_cache, get_continuance_table  # noqa: E402
+from av_calculator.vectorized import calculate_av_batch  # noqa: E402
+
+from fixtures import generate_regression_baseline, compare_with_baseline  # noqa: E402
+
+
+# Representative plan designs, including the slow-converging worst cases
+BENCHMARK_PLANS: List[Dict[str, Any]] = [
+    {'id': 'BRONZE-7500', 'deductible': 7500, 'moop': 9200, 'coinsurance': 0.5, 'metal_tier': 'Bronze'},
+    {'id': 'SILVER-4000', 'deductible': 4000, 'moop': 9100, 'coinsurance': 0.2, 'metal_tier': 'Silver'},
+    {'id': 'SILVER-2000', 'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2, 'metal_tier': 'Silver'},
+    {'id': 'GOLD-1000', 'deductible': 1000, 'moop': 6000, 'coinsurance': 0.2, 'metal_tier': 'Gold'},
+    {'id': 'PLATINUM-250', 'deductible': 250, 'moop': 3000, 'coinsurance': 0.1, 'metal_tier': 'Platinum'},
+    {'id': 'HDHP-3300', 'deductible': 3300, 'moop': 7000, 'coinsurance': 0.0, 'metal_tier': 'Bronze'},
+    {'id': 'DEDUCT-EQ-MOOP', 'deductible': 9200, 'moop': 9200, 'coinsurance': 0.0, 'metal_tier': 'Bronze'},
+]
+
+WORST_CASE_PLANS = ('HDHP-3300', 'DEDUCT-EQ-MOOP')
+
+# Batch sizes; the 100k batch only runs with --full
+BATCH_SIZES = {'batch_1k': 1_000, 'batch_100k': 100_000}
+QUICK_BATCH_SIZE = 50
+
+ENGINES: Dict[str, Callable[[dict], dict]] = {
+    'v1': calculate_av,
+    'v2': calculate_av_v2,
+}
+
+
+class EngineCalculator:
+    """Adapter giving an engine the calculator interface used by fixtures.py."""
+
+    def __init__(self, engine: Callable[[dict], dict]):
+        self.engine = engine
+
+    def calculate_av(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        params = {key: value for key, value in plan.items() if key != 'id'}
+        result = self.engine(params)
+        return {
+            'av_percentage': result['av_percent'],
+            'av_decimal': result['av'],
+            'metal_tier': result['metal_tier'],
+        }
+
+
+def _quiet(func: Callable, *args):
+    """Call func with stdout suppressed (v2 warnings/debug output)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _time(func: Callable[[], Any], ops: int, min_time: float = 0.2) -> Dict[str, float]:
+    """Run func repeatedly for at least min_time seconds; report ops/sec."""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    return {
+        'seconds_per_run': elapsed / runs,
+        'ops_per_sec': ops * runs / elapsed,
+    }
+
+
+# Code run in a fresh interpreter for each cold start case
+COLD_START_SCRIPTS = {
+    'cold_start_import': "import av_calculator",
+    'cold_start_first_solve': (
+        "from av_calculator import calculate_av; "
+        "calculate_av({'deductible': 4000, 'moop': 9100, 'coinsurance': 0.2})"
+    ),
+}
+
+
+def _cold_start(code: str) -> None:
+    """Run code in a new Python process with the library on its path."""
+    subprocess.run(
+        [sys.executable, '-c', f"import sys; sys.path.insert(0, {str(LIB_DIR)!r}); {code}"],
+        check=True,
+    )
+
+
+def cold_start_ratio(code: str, runs: int = 3) -> float:
+    """
+    Cold start time of code relative to a bare `import numpy`.
+
+    Both are timed in the same fresh interpreter (NumPy first, so code is
+    not charged for it) and the best of runs is kept. Being a ratio, it
+    carries over between machines far better than seconds do.
+    """
+    script = (
+        f"import sys, time; sys.path.insert(0, {str(LIB_DIR)!r}); "
+        "start = time.perf_counter(); import numpy; numpy_seconds = time.perf_counter() - start; "
+        f"start = time.perf_counter(); {code}; code_seconds = time.perf_counter() - start; "
+        "print(code_seconds / numpy_seconds)"
+    )
+    ratios = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script], check=True,
+                                capture_output=True, text=True).stdout
+        ratios.append(float(output.splitlines()[-1]))
+    return min(ratios)
+
+
+def _batch_plans(size: int) -> List[dict]:
+    """Deterministic batch of plan variations around the benchmark plans."""
+    plans = []
+    for i in range(size):
+        base = BENCHMARK_PLANS[i % len(BENCHMARK_PLANS)]
+        bump = (i // len(BENCHMARK_PLANS)) % 10 * 50
+        plan = {key: value for key, value in base.items() if key != 'id'}
+        plan['deductible'] = min(plan['deductible'] + bump, plan['moop'])
+        plans.append(plan)
+    return plans
+
+
+def inverse_solve(engine: Callable[[dict], dict], plan: dict, target_av: float,
+                  tolerance: float = 1e-4, max_steps: int = 30) -> float:
+    """
+    Find the deductible giving target_av by bisection on the engine.
+
+    The engines have no native inverse solver, so this mirrors how callers
+    search for a deductible that lands a plan on a metal tier target.
+    """
+    low, high = 0.0, float(plan['moop'])
+    for _ in range(max_steps):
+        mid = (low + high) / 2
+        av = engine(dict(plan, deductible=mid))['av']
+        if abs(av - target_av) < tolerance:
+            break
+        if av > target_av:
+            low = mid
+        else:
+            high = mid
+    return mid
+
+
+def build_cases(full: bool = False, quick: bool = False) -> Dict[str, Callable[[], Dict[str, float]]]:
+    """
+    Build the benchmark cases.
+
+    Args:
+        full: Include the 100k batch
+        quick: Shrink scalar batches to QUICK_BATCH_SIZE plans (for test
+            runs); vectorized batches keep their size, since their
+            throughput depends on it
+
+    Returns:
+        Mapping of case name to a callable returning timing stats
+    """
+    silver = {key: value for key, value in BENCHMARK_PLANS[1].items() if key != 'id'}
+
+    def cold_load():
+        clear_cache()
+        get_continuance_table('Silver')
+
+    cases = {
+        'table_load_cold': lambda: _time(cold_load, 1),
+        'table_load_warm': lambda: _time(lambda: get_continuance_table('Silver'), 1),
+    }
+
+    for name, code in COLD_START_SCRIPTS.items():
+        cases[name] = lambda code=code: _time(lambda: _cold_start(code), 1, min_time=0.5)
+
+    for engine_name, engine in ENGINES.items():
+        cases[f'{engine_name}_single_solve'] = (
+            lambda engine=engine: _time(lambda: _quiet(engine, dict(silver)), 1)
+        )
+
+        for plan_id in WORST_CASE_PLANS:
+            plan = next(p for p in BENCHMARK_PLANS if p['id'] == plan_id)
+            params = {key: value for key, value in plan.items() if key != 'id'}
+            cases[f'{engine_name}_worst_{plan_id.lower()}'] = (
+                lambda engine=engine, params=params: _time(lambda: _quiet(engine, dict(params)), 1)
+            )
+
+    for name, size in BATCH_SIZES.items():
+        if name == 'batch_100k' and not full:
+            continue
+        plans = _batch_plans(QUICK_BATCH_SIZE if quick else size)
+        cases[f'v2_{name}'] = (
+            lambda plans=plans: _time(
+                lambda: [_quiet(calculate_av_v2, dict(plan)) for plan in plans], len(plans), min_time=0
+            )
+        )
+        plans = _batch_plans(size)
+        cases[f'vectorized_{name}'] = (
+            lambda plans=plans: _time(lambda: calculate_av_batch(plans), len(plans), min_time=0)
+        )
+
+    deductibles = [250.0 * i for i in range(1, 21)]
+    cases['v2_deductible_sweep'] = lambda: _time(
+        lambda: [_quiet(calculate_av_v2, dict(silver, deductible=d)) for d in deductibles],
+        len(deductibles), min_time=0,
+    )
+    cases['vectorized_deductible_sweep'] = lambda: _time(
+        lambda: calculate_av_batch([dict(silver, deductible=d) for d in deductibles]),
+        len(deductibles),
+    )
+    cases['v2_inverse_solve'] = lambda: _time(
+        lambda: _quiet(inverse_solve, calculate_av_v2, dict(silver), 0.60), 1, min_time=0,
+    )
+
+    return cases
+
+
+def run_benchmarks(full: bool = False, quick: bool = False,
+                   only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Run benchmark cases and return their timing stats."""
+    cases = build_cases(full=full, quick=quick)
+    return {
+        name: case()
+        for name, case in cases.items()
+        if only is None or name in only
+    }
+
+
+def run_regression() -> Dict[str, Dict[str, Any]]:
+    """Calculate AV results for every benchmark plan with every engine."""
+    results = {}
+    for engine_name, engine in ENGINES.items():
+        baseline = _quiet(generate_regression_baseline, EngineCalculator(engine), BENCHMARK_PLANS)
+        for plan_id, result in baseline['results'].items():
+            results[f'{engine_name}:{plan_id}'] = result
+    return results
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """Load the stored baseline, or None if it has not been generated."""
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_baseline(results: Dict[str, Any], benchmarks: Dict[str, Dict[str, float]],
+                   path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    """Write AV results and throughput to the baseline file."""
+    baseline = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'version': '1.0.0',
+        'results': results,
+        'benchmarks': {name: round(stats['ops_per_sec'], 3) for name, stats in benchmarks.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return baseline
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="AV engine benchmarks")
+    parser.add_argument('--update', action='store_true', help="Rewrite the stored baseline")
+    parser.add_argument('--full', action='store_true', help="Include the 100k batch")
+    parser.add_argument('--throughput-tolerance', type=float, default=0.25,
+                        help="Allowed fractional throughput drop (default 0.25)")
+    args = parser.parse_args(argv)
+
+    benchmarks = run_benchmarks(full=args.full)
+    for name, stats in benchmarks.items():
+        print(f"{name:32s} {stats['ops_per_sec']:12.1f} ops/s  {stats['seconds_per_run'] * 1000:10.2f} ms/run")
+
+    results = run_regression()
+
+    if args.update:
+        write_baseline(results, benchmarks)
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("No baseline found; run with --update")
+        return 1
+
+    report = compare_with_baseline(
+        results, baseline,
+        current_benchmarks={name: stats['ops_per_sec'] for name, stats in benchmarks.items()},
+        throughput_tolerance=args.throughput_tolerance,
+    )
+    for difference in report['differences']:
+        print(f"{difference['type']}: {difference.get('test_id') or difference.get('benchmark')}")
+    print(f"passed={report['passed']} failed={report['failed']} new={report['new']}")
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
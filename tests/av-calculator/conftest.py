@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures for AV Calculator tests.
 """
 
 import json
+import sys
 import pytest
 from pathlib import Path
 from typing import Dict, Any
@@ -15,6 +16,11 @@ PROJECT_ROOT = TEST_ROOT.parent.parent
 TEST_CASES_DIR = PROJECT_ROOT.parent / "test-cases"
 DATA_DIR = PROJECT_ROOT / "data"
 CONTINUANCE_TABLES_DIR = DATA_DIR / "continuance-tables"
+LIB_DIR = PROJECT_ROOT / "lib"
+
+# Make the av_calculator package importable for engine-level tests
+if str(LIB_DIR) not in sys.path:
+    sys.path.insert(0, str(LIB_DIR))
 
 
 @pytest.fixture(scope="session")
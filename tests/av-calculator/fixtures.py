@@ -5,7 +5,7 @@ Test fixtures and data helpers for AV Calculator tests.
 import json
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 
@@ -293,13 +293,15 @@ def load_test_case(test_id: str, test_cases_dir: Path) -> Dict[str, Any]:
     raise ValueError(f"Test case {test_id} not found")
 
 
-def generate_regression_baseline(calculator, test_plans: List[Dict[str, Any]]) -> Dict[str, Any]:
+def generate_regression_baseline(calculator, test_plans: List[Dict[str, Any]],
+                                 benchmarks: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """
     Generate regression baseline results for all test plans.
 
     Args:
         calculator: Calculator instance
         test_plans: List of test plan dictionaries
+        benchmarks: Optional throughput (ops/sec) per benchmark name
 
     Returns:
         Baseline results
@@ -309,6 +311,8 @@ def generate_regression_baseline(calculator, test_plans: List[Dict[str, Any]]) -
         'version': '1.0.0',
         'results': {}
     }
+    if benchmarks is not None:
+        baseline['benchmarks'] = dict(benchmarks)
 
     for plan in test_plans:
         test_id = plan['id']
@@ -331,7 +335,9 @@ def generate_regression_baseline(calculator, test_plans: List[Dict[str, Any]]) -
 
 def compare_with_baseline(current_results: Dict[str, Any],
                          baseline: Dict[str, Any],
-                         tolerance: float = 0.01) -> Dict[str, Any]:
+                         tolerance: float = 0.01,
+                         current_benchmarks: Optional[Dict[str, float]] = None,
+                         throughput_tolerance: float = 0.25) -> Dict[str, Any]:
     """
     Compare current test results with baseline.
 
@@ -339,6 +345,8 @@ def compare_with_baseline(current_results: Dict[str, Any],
         current_results: Current test results
         baseline: Baseline results
         tolerance: Acceptable difference in AV percentage
+        current_benchmarks: Optional current throughput (ops/sec) per benchmark
+        throughput_tolerance: Acceptable fractional drop in throughput
 
     Returns:
         Comparison report
@@ -387,4 +395,25 @@ def compare_with_baseline(current_results: Dict[str, Any],
             else:
                 report['passed'] += 1
 
+    for name, ops_per_sec in (current_benchmarks or {}).items():
+        baseline_ops = baseline.get('benchmarks', {}).get(name)
+        if baseline_ops is None:
+            report['new'] += 1
+            report['differences'].append({
+                'benchmark': name,
+                'type': 'NEW_BENCHMARK',
+                'current_ops_per_sec': ops_per_sec
+            })
+        elif ops_per_sec < baseline_ops * (1 - throughput_tolerance):
+            report['failed'] += 1
+            report['differences'].append({
+                'benchmark': name,
+                'type': 'THROUGHPUT_REGRESSION',
+                'current_ops_per_sec': ops_per_sec,
+                'baseline_ops_per_sec': baseline_ops,
+                'change': ops_per_sec / baseline_ops - 1
+            })
+        else:
+            report['passed'] += 1
+
     return report
@@ -0,0 +1,423 @@
+"""
+Differential fuzz harness for the scalar and vectorized AV engines.
+
+Generates large populations of random but valid plan designs, solves all of
+them with the vectorized batch engine (vectorized.py), and checks a sample
+against the scalar reference engine (calculator_v2.calculate_av_combined_v2).
+Reports the distribution of AV differences, convergence failures and errors
+on each side, and shrinks every disagreement to a minimal JSON repro.
+
+About 10% of generated plans (mostly MOOPs near $1,000) run a convergence
+loop to its cap, up to 500 outer x 500 inner sweeps (~3 s per plan on the
+reference engine). Solving those in full would hold the vectorized engine
+to ~90 plans/s, so the population is first screened with both loops capped
+at --screen-iterations (50). Lanes that finish under the screening cap are
+exact, bit for bit the full solve; lanes that reach it stop there, are
+counted as capped, and are only solved in full when they fall in the
+reference sample. The default run (1M plans, 500 checked) takes about 9
+minutes on one core; --workers spreads the screen over processes.
+--reference-sample sets how many plans are checked (0 checks all of them),
+and --screen-iterations 500 solves every plan in full.
+
+Usage:
+    python fuzz_engines.py                          # 1M plans, 500 checked (~9 min)
+    python fuzz_engines.py --plans 5000 --reference-sample 0
+    python fuzz_engines.py --seed 7 --repro-dir repros/ --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+TEST_ROOT = Path(__file__).parent
+LIB_DIR = TEST_ROOT.parent.parent / "lib"
+
+if str(LIB_DIR) not in sys.path:
+    sys.path.insert(0, str(LIB_DIR))
+
+from av_calculator.calculator_v2 import MAX_ITERATIONS, calculate_av_combined_v2  # noqa: E402
+from av_calculator.constants import FEDERAL_MOOP_INDIVIDUAL, HSA_MIN_DEDUCTIBLE  # noqa: E402
+from av_calculator.continuance import get_adjusted_table  # noqa: E402
+from av_calculator.vectorized import calculate_av_batch, _plan_from_params  # noqa: E402
+
+
+METAL_TIERS = ['Bronze', 'Silver', 'Gold', 'Platinum']
+COMMON_COINSURANCE = [0.0, 0.1, 0.2, 0.25, 0.3, 0.4, 0.5]
+OVERRIDE_SERVICES = ['ER', 'IP', 'PC', 'SP', 'IMG', 'LAB']
+OVERRIDE_COPAYS = [0, 10, 25, 45, 75, 250, 500, 1000]  # API caps these services at $1,000
+
+DEFAULT_PLANS = 1_000_000
+DEFAULT_REFERENCE_SAMPLE = 500
+DEFAULT_TOLERANCE = 1e-9
+DEFAULT_SCREEN_ITERATIONS = 50
+SCREEN_CHUNK_SIZE = 1 << 16
+
+
+# ============================================================================
+# PLAN GENERATION
+# ============================================================================
+
+def generate_plans(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate n random plan designs that pass PlanDesign validation and the
+    API's validate_plan_parameters limits.
+
+    MOOP is drawn up to the federal individual limit and the deductible
+    below it, with some plans at exactly the MOOP; coinsurance mixes common
+    values with arbitrary rates; about a third of plans override service
+    cost sharing, including PC first-visit and IP per-day benefits, and a
+    fifth of the plans with an HSA-eligible deductible carry employer
+    HSA/HRA funding.
+    """
+    rng = np.random.default_rng(seed)
+
+    moop = np.round(rng.uniform(1000, FEDERAL_MOOP_INDIVIDUAL, n), 2)
+    deductible = np.round(moop * rng.uniform(0.01, 1.0, n), 2)
+    deductible = np.where(rng.random(n) < 0.05, moop, deductible)
+    coinsurance = np.where(
+        rng.random(n) < 0.8,
+        rng.choice(COMMON_COINSURANCE, n),
+        np.round(rng.random(n), 4),
+    )
+    tiers = rng.integers(0, len(METAL_TIERS), n)
+    has_overrides = rng.random(n) < 0.3
+    has_hsa = (rng.random(n) < 0.2) & (deductible >= HSA_MIN_DEDUCTIBLE)
+    hsa = np.where(has_hsa, np.round(rng.uniform(0, 3000, n), 2), 0.0)
+
+    plans = []
+    for i in range(n):
+        plan = {
+            'deductible': float(deductible[i]),
+            'moop': float(moop[i]),
+            'coinsurance': float(coinsurance[i]),
+            'metal_tier': METAL_TIERS[tiers[i]],
+        }
+        if hsa[i] > 0:
+            plan['hsa_contribution'] = float(hsa[i])
+        if has_overrides[i]:
+            plan['service_params'] = _random_service_params(rng)
+        plans.append(plan)
+    return plans
+
+
+def _random_service_params(rng: np.random.Generator) -> Dict[str, Dict[str, Any]]:
+    """Random overrides for a few services."""
+    params = {}
+    for code in rng.choice(OVERRIDE_SERVICES, rng.integers(1, 4), replace=False):
+        service = {
+            'copay': float(rng.choice(OVERRIDE_COPAYS)),
+            'copay_after_deductible': bool(rng.random() < 0.3),
+            'subject_to_deductible': bool(rng.random() < 0.7),
+            'subject_to_coinsurance': bool(rng.random() < 0.7),
+        }
+        if rng.random() < 0.3:
+            service['coinsurance'] = float(rng.choice(COMMON_COINSURANCE))
+        if code == 'PC' and rng.random() < 0.5:
+            service['first_visits'] = int(rng.integers(1, 11))
+            service['first_visits_copay'] = float(rng.choice([0, 10, 25]))
+        if code == 'IP' and rng.random() < 0.5:
+            service['per_day_limit'] = int(rng.integers(1, 11))
+        params[str(code)] = service
+    return params
+
+
+# ============================================================================
+# ENGINES
+# ============================================================================
+
+def reference_av(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Solve one plan with the scalar engine.
+
+    Returns:
+        {'av', 'converged', 'iterations_outer'} or {'error': message}
+    """
+    try:
+        table = get_adjusted_table(plan.get('metal_tier', 'Silver'), 'combined')
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = calculate_av_combined_v2(_plan_from_params(plan), table)
+    except (ArithmeticError, ValueError, KeyError) as e:
+        return {'error': str(e)}
+    return {
+        'av': result.av,
+        'converged': not any(w.startswith('Convergence') for w in result.warnings),
+        'iterations_outer': result.iterations_outer,
+    }
+
+
+def vectorized_av(plans: List[Dict[str, Any]],
+                  max_iterations: int = MAX_ITERATIONS) -> List[Dict[str, Any]]:
+    """
+    Solve plans with the vectorized engine, in the same form as reference_av.
+
+    Results also carry 'capped': whether a convergence loop reached
+    max_iterations (below the engine's own cap, the AV of such a lane is
+    not the full solve's).
+    """
+    batch = calculate_av_batch(plans, max_iterations=max_iterations)
+    converged = batch.converged
+    return [
+        {'error': batch.errors[i]} if batch.errors[i] is not None else {
+            'av': float(batch.av[i]),
+            'converged': bool(converged[i]),
+            'iterations_outer': int(batch.iterations_outer[i]),
+            'capped': bool(batch.capped[i]),
+        }
+        for i in range(len(batch))
+    ]
+
+
+def screen(plans: List[Dict[str, Any]], max_iterations: int = DEFAULT_SCREEN_ITERATIONS,
+           workers: int = 0) -> List[Dict[str, Any]]:
+    """
+    Solve a population with vectorized_av in chunks, in input order.
+
+    With workers > 0, chunks are solved in that many processes, with at
+    most two chunks per worker in flight (as batch.solve_stream does).
+    """
+    solve = partial(vectorized_av, max_iterations=max_iterations)
+    chunks = (plans[start:start + SCREEN_CHUNK_SIZE] for start in range(0, len(plans), SCREEN_CHUNK_SIZE))
+
+    results = []
+    if workers <= 0:
+        for chunk in chunks:
+            results.extend(solve(chunk))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(solve, chunk))
+            if len(pending) >= 2 * workers:
+                results.extend(pending.popleft().result())
+        while pending:
+            results.extend(pending.popleft().result())
+    return results
+
+
+def disagreement(reference: Dict[str, Any], candidate: Dict[str, Any],
+                 tolerance: float = DEFAULT_TOLERANCE) -> Optional[str]:
+    """Describe how two engine results disagree, or None if they agree."""
+    if ('error' in reference) != ('error' in candidate):
+        return f"error mismatch: reference={reference.get('error')!r} vectorized={candidate.get('error')!r}"
+    if 'error' in reference:
+        return None
+    if abs(reference['av'] - candidate['av']) > tolerance:
+        return f"av mismatch: reference={reference['av']!r} vectorized={candidate['av']!r}"
+    if reference['converged'] != candidate['converged']:
+        return "convergence mismatch"
+    return None
+
+
+# ============================================================================
+# SHRINKING
+# ============================================================================
+
+def _shrink_candidates(plan: Dict[str, Any]):
+    """Simpler variants of a plan, most aggressive first."""
+    if plan.get('service_params'):
+        yield {k: v for k, v in plan.items() if k != 'service_params'}
+        for code in plan['service_params']:
+            params = dict(plan['service_params'])
+            del params[code]
+            yield dict(plan, service_params=params)
+            for key in plan['service_params'][code]:
+                service = {k: v for k, v in plan['service_params'][code].items() if k != key}
+                yield dict(plan, service_params=dict(plan['service_params'], **{code: service}))
+
+    if plan.get('hsa_contribution'):
+        yield {k: v for k, v in plan.items() if k != 'hsa_contribution'}
+
+    if plan.get('metal_tier', 'Silver') != 'Silver':
+        yield dict(plan, metal_tier='Silver')
+
+    for key, step in (('moop', 100), ('deductible', 100), ('coinsurance', 0.05)):
+        value = plan[key]
+        rounded = round(round(value / step) * step, 2)
+        if rounded != value:
+            yield dict(plan, **{key: rounded})
+
+
+def shrink(plan: Dict[str, Any], fails: Callable[[Dict[str, Any]], bool],
+           max_steps: int = 200) -> Dict[str, Any]:
+    """
+    Greedily simplify a failing plan while it keeps failing.
+
+    Args:
+        plan: Plan that fails
+        fails: Predicate; True if a plan still reproduces the failure
+        max_steps: Limit on predicate evaluations
+
+    Returns:
+        The smallest failing plan found
+    """
+    steps = 0
+    improved = True
+    while improved and steps < max_steps:
+        improved = False
+        for candidate in _shrink_candidates(plan):
+            try:
+                _plan_from_params(candidate)
+            except (ValueError, KeyError):
+                continue
+            steps += 1
+            if fails(candidate):
+                plan = candidate
+                improved = True
+                break
+            if steps >= max_steps:
+                break
+    return plan
+
+
+# ============================================================================
+# HARNESS
+# ============================================================================
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    if values.size == 0:
+        return {'max': 0.0, 'p50': 0.0, 'p99': 0.0, 'p99.9': 0.0}
+    p50, p99, p999 = np.percentile(values, [50, 99, 99.9])
+    return {'max': float(values.max()), 'p50': float(p50), 'p99': float(p99), 'p99.9': float(p999)}
+
+
+def run_fuzz(n_plans: int = DEFAULT_PLANS, reference_sample: int = DEFAULT_REFERENCE_SAMPLE,
+             seed: int = 0, tolerance: float = DEFAULT_TOLERANCE,
+             repro_dir: Optional[Path] = None,
+             screen_iterations: int = DEFAULT_SCREEN_ITERATIONS,
+             workers: int = 0) -> Dict[str, Any]:
+    """
+    Run the differential fuzz comparison.
+
+    Args:
+        n_plans: Plans solved by the vectorized engine
+        reference_sample: Plans also solved by the reference (0 = all)
+        seed: Random seed for plan generation and sampling
+        tolerance: Largest AV difference accepted as agreement
+        repro_dir: Where to write shrunk repros (default: not written)
+        screen_iterations: Iteration cap for the population; lanes that
+            reach it are only solved in full if sampled
+        workers: Processes solving the population (0 = in process)
+
+    Returns:
+        Report dictionary (see main() for the printed summary)
+    """
+    plans = generate_plans(n_plans, seed)
+
+    rng = np.random.default_rng(seed + 1)
+    if reference_sample and reference_sample < n_plans:
+        sample = np.sort(rng.choice(n_plans, reference_sample, replace=False))
+    else:
+        sample = np.arange(n_plans)
+
+    start = time.perf_counter()
+    candidates = screen(plans, screen_iterations, workers)
+
+    screened = set()
+    if screen_iterations < MAX_ITERATIONS:
+        screened = {i for i, candidate in enumerate(candidates) if candidate.get('capped')}
+        resolve = [int(i) for i in sample if i in screened]
+        for i, candidate in zip(resolve, vectorized_av([plans[i] for i in resolve])):
+            candidates[i] = candidate
+        screened.difference_update(resolve)
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    references = {int(i): reference_av(plans[i]) for i in sample}
+    reference_seconds = time.perf_counter() - start
+
+    deltas = np.array([
+        abs(references[i]['av'] - candidates[i]['av'])
+        for i in references
+        if 'error' not in references[i] and 'error' not in candidates[i]
+    ])
+
+    failures = []
+    for i, reference in references.items():
+        reason = disagreement(reference, candidates[i], tolerance)
+        if reason is None:
+            continue
+
+        def fails(plan, reason=reason):
+            return disagreement(reference_av(plan), vectorized_av([plan])[0], tolerance) is not None
+
+        failures.append({'index': i, 'reason': reason, 'plan': plans[i], 'repro': shrink(plans[i], fails)})
+
+    if repro_dir is not None and failures:
+        repro_dir.mkdir(parents=True, exist_ok=True)
+        for failure in failures:
+            with open(repro_dir / f"repro_{seed}_{failure['index']}.json", 'w') as f:
+                json.dump(failure, f, indent=2)
+
+    return {
+        'plans': n_plans,
+        'checked': len(references),
+        'seed': seed,
+        'vectorized_plans_per_sec': n_plans / vectorized_seconds,
+        'reference_plans_per_sec': len(references) / reference_seconds if reference_seconds else 0.0,
+        'av_delta': _percentiles(deltas),
+        'vectorized_errors': sum('error' in c for c in candidates),
+        'vectorized_not_converged': sum(
+            'error' not in c and not c['converged'] for i, c in enumerate(candidates) if i not in screened
+        ),
+        'screen_iterations': screen_iterations,
+        'screened_out': len(screened),
+        'reference_errors': sum('error' in r for r in references.values()),
+        'reference_not_converged': sum('error' not in r and not r['converged'] for r in references.values()),
+        'failures': failures,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the AV engines")
+    parser.add_argument('--plans', type=int, default=DEFAULT_PLANS,
+                        help=f"Plans solved by the vectorized engine (default {DEFAULT_PLANS})")
+    parser.add_argument('--reference-sample', type=int, default=DEFAULT_REFERENCE_SAMPLE,
+                        help=f"Plans also solved by the reference, 0 for all (default {DEFAULT_REFERENCE_SAMPLE})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed AV difference (default {DEFAULT_TOLERANCE})")
+    parser.add_argument('--repro-dir', type=Path, default=None,
+                        help="Write shrunk failing plans here as JSON")
+    parser.add_argument('--screen-iterations', type=int, default=DEFAULT_SCREEN_ITERATIONS,
+                        help=f"Iteration cap for unsampled plans, {MAX_ITERATIONS} to solve all in full "
+                             f"(default {DEFAULT_SCREEN_ITERATIONS})")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Processes solving the population (default 0: in process)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.screen_iterations <= MAX_ITERATIONS:
+        parser.error(f"--screen-iterations must be between 1 and {MAX_ITERATIONS}")
+
+    report = run_fuzz(args.plans, args.reference_sample, args.seed, args.tolerance, args.repro_dir,
+                      args.screen_iterations, args.workers)
+
+    print(f"plans={report['plans']} checked={report['checked']} seed={report['seed']}")
+    print(f"vectorized: {report['vectorized_plans_per_sec']:.1f} plans/s  "
+          f"reference: {report['reference_plans_per_sec']:.1f} plans/s")
+    delta = report['av_delta']
+    print(f"AV delta: max={delta['max']:.3e} p50={delta['p50']:.3e} "
+          f"p99={delta['p99']:.3e} p99.9={delta['p99.9']:.3e}")
+    print(f"errors: vectorized={report['vectorized_errors']} reference={report['reference_errors']}")
+    print(f"not converged: vectorized={report['vectorized_not_converged']} "
+          f"reference={report['reference_not_converged']}")
+    print(f"capped at {report['screen_iterations']} iterations, not solved in full: {report['screened_out']}")
+    for failure in report['failures']:
+        print(f"FAIL plan {failure['index']}: {failure['reason']}")
+        print(f"  repro: {json.dumps(failure['repro'], sort_keys=True)}")
+
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Tests for the batch command (python -m av_calculator batch).
+"""
+
+import csv
+import json
+
+import pytest
+
+
+PLANS = [
+    {'id': 'A', 'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2},
+    {'id': 'B', 'deductible': 9000, 'moop': 8000, 'coinsurance': 0.2},
+    {'id': 'C', 'deductible': 4000, 'moop': 9100, 'coinsurance': 0.3, 'metal_tier': 'Bronze',
+     'service_params': {'PC': {'first_visits': 3}}},
+    {'id': 'D', 'moop': 8000, 'coinsurance': 0.2},
+]
+
+
+class TestBatchCommand:
+    """Test streaming batch calculation over plan files."""
+
+    @pytest.fixture
+    def jsonl_plans(self, tmp_path):
+        path = tmp_path / 'plans.jsonl'
+        with open(path, 'w') as f:
+            for plan in PLANS:
+                f.write(json.dumps(plan) + '\n')
+            f.write('not json\n')
+        return path
+
+    def test_jsonl_results_in_order(self, jsonl_plans, tmp_path):
+        """Test that every row gets a result or error, in input order."""
+        from av_calculator.__main__ import main
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        out = tmp_path / 'results.jsonl'
+        assert main(['batch', str(jsonl_plans), '--out', str(out), '--quiet']) == 0
+
+        with open(out) as f:
+            records = [json.loads(line) for line in f]
+
+        assert [record['row'] for record in records] == [0, 1, 2, 3, 4]
+        assert records[0]['id'] == 'A'
+        assert records[0]['av'] == calculate_av_v2(dict(deductible=2000, moop=8000, coinsurance=0.2))['av']
+        assert records[1]['error'] == 'Deductible cannot exceed MOOP'
+        assert 'av' in records[2]
+        assert records[3]['error'] == 'Missing required field: deductible'
+        assert records[4]['error'].startswith('Invalid JSON')
+
+    def test_malformed_rows_are_row_errors(self, tmp_path):
+        """Test that bad overrides and factors fail their own row, not the run."""
+        from av_calculator.__main__ import main
+
+        base = {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.2}
+        plans = [
+            {'id': 'A', **base},
+            {'id': 'B', **base, 'service_params': {'PC': {'copay': 'x'}}},
+            {'id': 'C', **base, 'service_params': {'PC': 5}},
+            {'id': 'D', **base, 'trend_factor': '1.1'},
+            {'id': 'E', **base, 'area_factor': [1]},
+            {'id': 'F', **base},
+        ]
+        path = tmp_path / 'plans.jsonl'
+        with open(path, 'w') as f:
+            for plan in plans:
+                f.write(json.dumps(plan) + '\n')
+
+        out = tmp_path / 'results.jsonl'
+        assert main(['batch', str(path), '--out', str(out), '--quiet']) == 0
+
+        with open(out) as f:
+            records = [json.loads(line) for line in f]
+
+        assert [record['id'] for record in records] == ['A', 'B', 'C', 'D', 'E', 'F']
+        assert records[0]['av'] == records[5]['av']
+        assert records[1]['error'] == "could not convert string to float: 'x'"
+        assert records[3]['error'] == "trend_factor must be a positive number, got '1.1'"
+        for record in records[1:5]:
+            assert 'av' not in record and record['error']
+
+    def test_csv_round_trip(self, tmp_path):
+        """Test CSV input with JSON service_params and flat CSV output."""
+        from av_calculator.batch import CSV_RESULT_COLUMNS, main
+
+        path = tmp_path / 'plans.csv'
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['id', 'deductible', 'moop', 'coinsurance', 'service_params'])
+            writer.writeheader()
+            writer.writerow({'id': 'A', 'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2})
+            writer.writerow({'id': 'B', 'deductible': 'abc', 'moop': 8000, 'coinsurance': 0.2})
+            writer.writerow({'id': 'C', 'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+                             'service_params': json.dumps({'PC': {'first_visits': 3}})})
+
+        out = tmp_path / 'results.csv'
+        assert main([str(path), '--out', str(out), '--quiet']) == 0
+
+        with open(out, newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+
+        assert reader.fieldnames == CSV_RESULT_COLUMNS
+        assert [row['id'] for row in rows] == ['A', 'B', 'C']
+        assert float(rows[0]['av']) > 0
+        assert rows[1]['error'] == "Invalid deductible: 'abc'"
+        assert float(rows[2]['av']) > float(rows[0]['av'])
+
+    def test_workers_preserve_order(self, jsonl_plans):
+        """Test that small chunks across worker processes come back in order."""
+        from av_calculator.batch import read_plans, solve_stream
+
+        serial = list(solve_stream(read_plans(jsonl_plans), chunk_size=2))
+        parallel = list(solve_stream(read_plans(jsonl_plans), chunk_size=2, workers=2))
+
+        assert [record['row'] for record in parallel] == list(range(len(PLANS) + 1))
+        for a, b in zip(serial, parallel):
+            a.get('performance', {}).pop('calculation_time_ms', None)
+            b.get('performance', {}).pop('calculation_time_ms', None)
+        assert serial == parallel
+
+    def test_explain(self, tmp_path):
+        """Test that --explain adds an explanation column to CSV output."""
+        from av_calculator.batch import CSV_RESULT_COLUMNS, main
+
+        path = tmp_path / 'plans.jsonl'
+        path.write_text(json.dumps(PLANS[0]) + '\n')
+        out = tmp_path / 'results.csv'
+        assert main([str(path), '--out', str(out), '--quiet', '--explain']) == 0
+
+        with open(out, newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+
+        assert reader.fieldnames == CSV_RESULT_COLUMNS + ['explanation']
+        explanation = json.loads(rows[0]['explanation'])
+        assert explanation['total']['IP'] > 0
+
+    def test_family_size(self, tmp_path):
+        """Test that --family-size adds family columns and reads family CSV fields."""
+        from av_calculator.batch import CSV_FAMILY_COLUMNS, CSV_RESULT_COLUMNS, main
+
+        path = tmp_path / 'plans.csv'
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['deductible', 'moop', 'coinsurance',
+                                                   'family_deductible', 'embedded_deductible'])
+            writer.writeheader()
+            writer.writerow({'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+                             'family_deductible': 3000, 'embedded_deductible': 'true'})
+            writer.writerow({'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+                             'embedded_deductible': 'maybe'})
+
+        out = tmp_path / 'results.csv'
+        assert main([str(path), '--out', str(out), '--quiet', '--family-size', '3']) == 0
+
+        with open(out, newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+
+        assert reader.fieldnames == CSV_RESULT_COLUMNS + CSV_FAMILY_COLUMNS
+        assert float(rows[0]['family_av']) > float(rows[0]['av'])
+        assert rows[1]['error'] == "Invalid embedded_deductible: 'maybe'"
+
+    def test_profile(self, jsonl_plans, tmp_path, capsys):
+        """Test that --profile writes collapsed stacks and prints hot functions."""
+        from av_calculator.batch import main
+
+        profile = tmp_path / 'batch.collapsed'
+        out = tmp_path / 'results.jsonl'
+        assert main([str(jsonl_plans), '--out', str(out), '--quiet', '--profile', str(profile)]) == 0
+
+        assert 'sweep' in capsys.readouterr().err
+        assert any('lookup_rows' in line for line in profile.read_text().splitlines())
+        assert len(out.read_text().splitlines()) == len(PLANS) + 1
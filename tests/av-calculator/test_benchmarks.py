@@ -0,0 +1,138 @@
+"""
+Benchmark and regression gates for the real AV engines.
+
+AV results of the benchmark plans are always compared with the stored
+baseline, and cold start is always checked for eagerly imported modules
+and against a budget relative to a bare `import numpy`. Throughput gates
+run only when AV_RUN_BENCHMARKS=1, since timings depend on the machine;
+refresh the baseline with `python benchmarks.py --update`.
+"""
+
+import os
+
+import pytest
+
+RUN_BENCHMARKS = os.environ.get('AV_RUN_BENCHMARKS') == '1'
+THROUGHPUT_TOLERANCE = float(os.environ.get('AV_BENCHMARK_TOLERANCE', '0.5'))
+
+# Most a first solve may take, as a multiple of a bare `import numpy`
+# (about 1x when this was set; eager pandas or SciPy imports would be 3x+)
+COLD_START_BUDGET = float(os.environ.get('AV_COLD_START_BUDGET', '3.0'))
+
+
+class TestRegressionBaseline:
+    """Test engine AV results against the stored baseline."""
+
+    def test_baseline_exists(self):
+        """Test that the baseline covers every benchmark plan and engine."""
+        from benchmarks import BENCHMARK_PLANS, ENGINES, load_baseline
+
+        baseline = load_baseline()
+
+        assert baseline is not None
+        for engine_name in ENGINES:
+            for plan in BENCHMARK_PLANS:
+                assert f"{engine_name}:{plan['id']}" in baseline['results']
+
+    def test_baseline_covers_benchmark_cases(self):
+        """Test that every benchmark case, including the vectorized ones, has a baseline."""
+        from benchmarks import build_cases, load_baseline
+
+        benchmarks = load_baseline()['benchmarks']
+
+        assert set(build_cases(quick=True)) <= set(benchmarks)
+        assert 'vectorized_batch_100k' in benchmarks
+
+    def test_av_matches_baseline(self):
+        """Test that no engine's AV drifts from the baseline."""
+        from benchmarks import load_baseline, run_regression
+        from fixtures import compare_with_baseline
+
+        report = compare_with_baseline(run_regression(), load_baseline())
+
+        assert report['failed'] == 0, report['differences']
+        assert report['new'] == 0, report['differences']
+
+    def test_throughput_regression_detected(self):
+        """Test that throughput drops past the tolerance fail the comparison."""
+        from fixtures import compare_with_baseline
+
+        baseline = {'results': {}, 'benchmarks': {'fast': 100.0, 'slow': 100.0}}
+        report = compare_with_baseline(
+            {}, baseline,
+            current_benchmarks={'fast': 90.0, 'slow': 50.0, 'added': 1.0},
+            throughput_tolerance=0.25,
+        )
+
+        assert report['passed'] == 1
+        assert report['failed'] == 1
+        assert report['new'] == 1
+        types = {d.get('benchmark'): d['type'] for d in report['differences']}
+        assert types == {'slow': 'THROUGHPUT_REGRESSION', 'added': 'NEW_BENCHMARK'}
+
+
+class TestColdStart:
+    """Test that cold start stays lazy and within budget (always on)."""
+
+    @staticmethod
+    def _loaded_modules(code):
+        import json
+        import subprocess
+        import sys
+
+        from benchmarks import LIB_DIR
+
+        script = (f"import sys; sys.path.insert(0, {str(LIB_DIR)!r}); {code}; "
+                  "import json; print(json.dumps(sorted(sys.modules)))")
+        output = subprocess.run([sys.executable, '-c', script], check=True,
+                                capture_output=True, text=True).stdout
+        return set(json.loads(output.splitlines()[-1]))
+
+    def test_package_import_is_lazy(self):
+        """Test that importing the package loads no engine code or NumPy."""
+        modules = self._loaded_modules("import av_calculator")
+
+        assert 'numpy' not in modules
+        assert not [m for m in modules if m.startswith('av_calculator.')]
+
+    def test_first_solve_skips_optional_modules(self):
+        """Test that a calculation does not import profiling, batch or CLI code."""
+        from benchmarks import COLD_START_SCRIPTS
+
+        modules = self._loaded_modules(COLD_START_SCRIPTS['cold_start_first_solve'])
+
+        assert 'av_calculator.calculator' in modules
+        for module in ('cProfile', 'argparse', 'av_calculator.profiling',
+                       'av_calculator.batch', 'av_calculator.vectorized'):
+            assert module not in modules
+
+    def test_first_solve_within_budget(self):
+        """Test that importing the package and solving one plan stays within budget."""
+        from benchmarks import COLD_START_SCRIPTS, cold_start_ratio
+
+        ratio = cold_start_ratio(COLD_START_SCRIPTS['cold_start_first_solve'])
+
+        assert ratio <= COLD_START_BUDGET, (
+            f"First solve took {ratio:.2f}x a bare numpy import (budget {COLD_START_BUDGET}x)"
+        )
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="set AV_RUN_BENCHMARKS=1 to run throughput gates")
+class TestEngineBenchmarks:
+    """Throughput gates for the real engines."""
+
+    def test_throughput_within_tolerance(self):
+        """Test that no benchmark is slower than the baseline allows."""
+        from benchmarks import load_baseline, run_benchmarks
+        from fixtures import compare_with_baseline
+
+        benchmarks = run_benchmarks(quick=True)
+        report = compare_with_baseline(
+            {}, load_baseline(),
+            current_benchmarks={name: stats['ops_per_sec'] for name, stats in benchmarks.items()},
+            throughput_tolerance=THROUGHPUT_TOLERANCE,
+        )
+
+        assert report['failed'] == 0, report['differences']
@@ -325,3 +325,318 @@ class TestNumericalStability:
         av_values = [r['av_percentage'] for r in results]
         assert len(set(av_values)) == 1, \
             f"Repeated calculations produced different results: {av_values}"
+
+
+class TestThresholdBenefits:
+    """Test visit- and day-threshold benefits in the v2 engine."""
+
+    @staticmethod
+    def _calculate(service_params):
+        import contextlib
+        import io
+        from av_calculator.calculator_v2 import calculate_av_combined_v2
+        from av_calculator.continuance import get_continuance_table
+        from av_calculator.models import PlanDesign
+
+        plan = PlanDesign(deductible=2000, moop=8000, coinsurance=0.2,
+                          metal_tier='Silver', service_params=service_params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return calculate_av_combined_v2(plan, get_continuance_table('Silver')).av
+
+    def test_threshold_arrays_shape(self):
+        """Test that all ten thresholds are stacked per table row."""
+        from av_calculator.continuance import get_continuance_table
+        from av_calculator.thresholds import get_threshold_arrays
+
+        table = get_continuance_table('Silver')
+        arrays = get_threshold_arrays(table)
+
+        assert arrays.pc_visit_cost.shape == (10, len(table))
+        assert arrays.ip_days.shape == (10, len(table))
+        # Visits beyond a higher threshold never exceed those beyond a lower one
+        assert (arrays.pc_visit_freq[1:] <= arrays.pc_visit_freq[:-1] + 1e-9).all()
+        assert get_threshold_arrays(table) is arrays
+
+    def test_rx_table_has_no_thresholds(self):
+        """Test that drug-only tables report no threshold columns."""
+        from av_calculator.continuance import get_continuance_table
+        from av_calculator.thresholds import get_threshold_arrays
+
+        assert get_threshold_arrays(get_continuance_table('Silver', 'rx')) is None
+
+    def test_first_visits_raise_av(self):
+        """Test that first N PCP visits before the deductible raise AV."""
+        baseline = self._calculate({})
+        free_visits = self._calculate({'PC': {'first_visits': 3}})
+        copay_visits = self._calculate({'PC': {'first_visits': 3, 'first_visits_copay': 30}})
+
+        assert free_visits > copay_visits > baseline
+
+    def test_per_day_copay_changes_av(self):
+        """Test that an inpatient per-day copay limit changes AV."""
+        ip = {'copay': 500, 'copay_after_deductible': False,
+              'subject_to_deductible': False, 'subject_to_coinsurance': False}
+
+        assert self._calculate({'IP': dict(ip, per_day_limit=5)}) != self._calculate({'IP': ip})
+
+    def test_invalid_threshold_config(self):
+        """Test that out-of-range or misplaced thresholds are rejected."""
+        from av_calculator.calculator_v2 import ServiceConfig
+
+        with pytest.raises(ValueError):
+            ServiceConfig(code='PC', first_visits=11)
+        with pytest.raises(ValueError):
+            ServiceConfig(code='SP', first_visits=2)
+        with pytest.raises(ValueError):
+            ServiceConfig(code='PC', per_day_limit=3)
+
+
+class TestConvergenceTracing:
+    """Test convergence tracers and iteration histograms."""
+
+    PLAN = {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2}
+
+    def test_default_calculation_is_silent(self, capsys):
+        """Test that calculations print nothing unless debugging."""
+        from av_calculator import calculate_av
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        calculate_av(dict(self.PLAN))
+        calculate_av_v2(dict(self.PLAN))
+
+        assert capsys.readouterr().out == ''
+
+    def test_ring_buffer_keeps_latest_records(self):
+        """Test that the ring buffer overwrites the oldest records."""
+        from av_calculator.tracing import RingBufferTracer
+
+        tracer = RingBufferTracer(capacity=4)
+        for i in range(10):
+            tracer.inner(0, i, 0.5, 0.25)
+
+        records = tracer.inner_records
+        assert tracer.inner_count == 10
+        assert records[:, 1].tolist() == [6, 7, 8, 9]
+        assert records[:, 3] == pytest.approx([0.25] * 4)
+
+    def test_sampling_tracer(self):
+        """Test that only every Nth inner iteration is forwarded."""
+        from av_calculator.tracing import RingBufferTracer, SamplingTracer
+
+        target = RingBufferTracer(capacity=16)
+        tracer = SamplingTracer(target, every=5)
+        for i in range(12):
+            tracer.inner(0, i, 0.5, 0.5)
+
+        assert target.inner_records[:, 1].tolist() == [0, 5, 10]
+
+    def test_binary_trace_round_trip(self, tmp_path):
+        """Test that trace_file writes a binary trace matching the result."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.tracing import OUTER_FIELDS, load_trace
+
+        trace_file = tmp_path / 'trace.npz'
+        result = calculate_av_v2(dict(self.PLAN, trace_file=str(trace_file)))
+        trace = load_trace(trace_file)
+
+        assert trace['outer'].shape == (result['performance']['iterations_outer'], len(OUTER_FIELDS))
+        assert trace['counts'][1] == result['performance']['iterations_outer']
+
+    def test_histogram_aggregates_requests(self):
+        """Test that every calculation is counted in the iteration histogram."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.tracing import IterationHistogram, get_iteration_histogram
+
+        histogram = get_iteration_histogram()
+        before = histogram.count
+        result = calculate_av_v2(dict(self.PLAN))
+
+        assert histogram.count == before + 1
+        assert histogram.outer[result['performance']['iterations_outer']] >= 1
+
+        combined = IterationHistogram()
+        combined.merge(histogram)
+        combined.merge(histogram)
+        assert combined.count == 2 * histogram.count
+
+
+class TestPhaseTimings:
+    """Test per-phase timings and the metrics registry."""
+
+    PLAN = {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2}
+
+    def test_timings_off_by_default(self):
+        """Test that results carry no phase timings unless requested."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        performance = calculate_av_v2(dict(self.PLAN))['performance']
+
+        assert 'phases_ms' not in performance
+        assert 'counters' not in performance
+
+    @pytest.mark.parametrize('engine', ['v1', 'v2'])
+    def test_timings_requested(self, engine):
+        """Test that both engines report every phase and counter."""
+        from av_calculator import calculate_av
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.metrics import COUNTERS, PHASES
+
+        calculate = calculate_av if engine == 'v1' else calculate_av_v2
+        performance = calculate(dict(self.PLAN, timings=True))['performance']
+
+        assert set(performance['phases_ms']) == set(PHASES)
+        assert set(performance['counters']) == set(COUNTERS)
+        assert performance['counters']['sweeps'] > 0
+        assert performance['counters']['row_lookups'] > performance['counters']['sweeps']
+        phases = performance['phases_ms']
+        assert phases['service_sweep'] <= phases['inner_loop'] <= phases['outer_loop']
+
+    def test_registry_aggregates_when_enabled(self):
+        """Test that the process-wide registry records only while enabled."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.metrics import enable_metrics, get_metrics_registry
+
+        registry = get_metrics_registry()
+        registry.reset()
+        calculate_av_v2(dict(self.PLAN))
+        assert registry.snapshot()['calculations'] == 0
+
+        enable_metrics()
+        try:
+            calculate_av_v2(dict(self.PLAN))
+            calculate_av_v2(dict(self.PLAN))
+        finally:
+            enable_metrics(False)
+
+        snapshot = registry.snapshot()
+        assert snapshot['calculations'] == 2
+        assert snapshot['phases']['outer_loop']['max_ms'] > 0
+        assert snapshot['counters']['sweeps'] > 0
+        registry.reset()
+
+
+class TestProfiling:
+    """Test the profile option of the dict entry points."""
+
+    PLAN = {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2}
+
+    @pytest.mark.parametrize('engine', ['v1', 'v2'])
+    def test_profile_reports_engine_functions(self, engine):
+        """Test that profiling reports hot functions without changing the result."""
+        from av_calculator import calculate_av
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        calculate = calculate_av if engine == 'v1' else calculate_av_v2
+        result = calculate(dict(self.PLAN, profile=True))
+        expected = calculate(dict(self.PLAN))
+
+        assert result['av'] == expected['av']
+        engine_functions = result['profile']['engine']
+        assert engine_functions['get_continuance_table_row']['calls'] > 0
+        assert engine_functions['compute_row_value']['calls'] > 0
+        assert result['profile']['hot_functions']
+
+    def test_profile_writes_collapsed_stacks(self, tmp_path):
+        """Test that the collapsed-stack file is 'frames microseconds' per line."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        path = tmp_path / 'av.collapsed'
+        result = calculate_av_v2(dict(self.PLAN, profile=True, profile_file=str(path)))
+
+        lines = path.read_text().splitlines()
+        assert result['profile']['collapsed_file'] == str(path)
+        assert lines
+        for line in lines:
+            stack, micros = line.rsplit(' ', 1)
+            assert int(micros) >= 0
+            assert stack.split(';')[0].startswith('calculate_av')
+        assert any('process_all_services_v2' in line for line in lines)
+
+
+class TestExplanation:
+    """Test per-service attribution of plan payment."""
+
+    PLANS = [
+        {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2},
+        {'deductible': 8000, 'moop': 8000, 'coinsurance': 0.2},
+        {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.3, 'metal_tier': 'Bronze',
+         'service_params': {'PC': {'first_visits': 3}}},
+    ]
+
+    def test_explanation_off_by_default(self):
+        """Test that results carry no explanation unless asked for."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        assert 'explanation' not in calculate_av_v2(dict(self.PLANS[0]))
+
+    @pytest.mark.parametrize('plan', PLANS)
+    def test_ranges_sum_to_breakdown(self, plan):
+        """Test that each range's attribution sums to its plan payment."""
+        from av_calculator.calculator_v2 import calculate_av_combined_v2
+        from av_calculator.constants import OTHER_SERVICE
+        from av_calculator.continuance import get_continuance_table
+        from av_calculator.models import PlanDesign
+
+        design = PlanDesign(
+            deductible=plan['deductible'], moop=plan['moop'], coinsurance=plan['coinsurance'],
+            metal_tier=plan.get('metal_tier', 'Silver'), service_params=plan.get('service_params', {}),
+        )
+        table = get_continuance_table(design.metal_tier, 'combined')
+        result = calculate_av_combined_v2(design, table, explain=True)
+        explanation = result.explanation
+
+        assert sum(explanation.below_deductible.values()) == pytest.approx(result.plan_pay_below_deduct)
+        assert sum(explanation.deductible_to_moop.values()) == pytest.approx(result.plan_pay_deduct_to_moop)
+        assert sum(explanation.above_moop.values()) == pytest.approx(result.plan_pay_above_moop)
+        assert sum(explanation.totals().values()) == pytest.approx(result.total_plan_payment)
+        assert explanation.above_moop[OTHER_SERVICE] > 0
+        assert calculate_av_combined_v2(design, table).av == result.av
+
+    def test_dict_entry_points(self):
+        """Test the explain option of both dict entry points."""
+        from av_calculator import calculate_av
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        for calculate in (calculate_av, calculate_av_v2):
+            result = calculate(dict(self.PLANS[0], explain=True))
+            explanation = result['explanation']
+
+            assert set(explanation) == {'below_deductible', 'deductible_to_moop', 'above_moop',
+                                        'total', 'av_percent'}
+            assert sum(explanation['av_percent'].values()) == pytest.approx(result['av_percent'], abs=0.1)
+            assert explanation['total']['IP'] > explanation['total']['ST']
+
+
+class TestHSAFunding:
+    """Test employer HSA/HRA funding in AV."""
+
+    PLAN = {'deductible': 3000, 'moop': 8000, 'coinsurance': 0.2, 'metal_tier': 'Bronze'}
+
+    @pytest.mark.parametrize('engine', ['v1', 'v2'])
+    def test_funding_raises_av(self, engine):
+        """Test that funding raises AV, never pays more than the contribution, and saturates."""
+        from av_calculator import calculate_av
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+
+        calculate = calculate_av if engine == 'v1' else calculate_av_v2
+        results = [calculate(dict(self.PLAN, hsa_contribution=hsa)) for hsa in (0, 500, 1000, 50000, 60000)]
+        funding = [result['breakdown']['hsa_funding'] for result in results]
+
+        assert funding[0] == 0
+        assert 0 < funding[1] <= 500
+        assert funding[1] < funding[2] <= 1000
+        assert funding[3] == funding[4]
+        assert [result['av'] for result in results[:4]] == sorted(result['av'] for result in results[:4])
+        assert results[0]['av'] == calculate(dict(self.PLAN))['av']
+
+    def test_funding_in_batch(self):
+        """Test that a deductible x HSA grid in one batch matches single solves."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.vectorized import calculate_av_batch
+
+        grid = [dict(self.PLAN, deductible=deductible, hsa_contribution=hsa)
+                for deductible in (1650, 3000, 6000) for hsa in (0, 750, 2000)]
+        batch = calculate_av_batch(grid)
+
+        for plan, result in zip(grid, batch.to_dicts()):
+            assert result['breakdown'] == calculate_av_v2(dict(plan))['breakdown']
@@ -299,3 +299,353 @@ class TestContinuanceTableValidation:
 
         assert not validation['is_valid']
         assert any('monotonic' in err.lower() for err in validation['errors'])
+
+
+class TestAdjustedContinuanceTables:
+    """Test cost trend / area factor adjusted table views."""
+
+    def test_identity_factors_return_base_table(self):
+        """Factors of 1.0 should return the cached base table itself."""
+        from av_calculator.continuance import get_adjusted_table, get_continuance_table
+
+        base = get_continuance_table('Silver', 'combined')
+        assert get_adjusted_table('Silver', 'combined') is base
+
+    def test_view_scales_cost_columns(self):
+        """Dollar columns scale by trend * area; enrollee distribution does not."""
+        import numpy as np
+        from av_calculator.continuance import get_adjusted_table, get_continuance_table
+
+        base = get_continuance_table('Silver', 'combined')
+        view = get_adjusted_table('Silver', 'combined', trend_factor=1.07, area_factor=1.1)
+        factor = 1.07 * 1.1
+
+        np.testing.assert_allclose(view.maxd, base.maxd * factor)
+        np.testing.assert_allclose(view.up_to, base.up_to * factor)
+        np.testing.assert_allclose(view.services['PC'], base.services['PC'] * factor)
+        assert view.pct_enrollees is base.pct_enrollees
+        assert view.total_expected_cost == pytest.approx(base.total_expected_cost * factor)
+        assert len(view) == len(base)
+
+    def test_base_table_not_modified(self):
+        """Adjusting a table must not mutate the shared base arrays."""
+        from av_calculator.continuance import get_adjusted_table, get_continuance_table
+
+        base = get_continuance_table('Gold', 'combined')
+        original_total = base.total_expected_cost
+
+        view = get_adjusted_table('Gold', 'combined', trend_factor=1.5)
+        _ = view.maxd, view.services['ER']
+
+        assert base.total_expected_cost == original_total
+        assert not view.maxd.flags.writeable
+
+    def test_views_cached_by_factor_set(self):
+        """Same factor set returns the same view; different sets do not."""
+        from av_calculator.continuance import get_adjusted_table
+
+        a = get_adjusted_table('Bronze', 'combined', trend_factor=1.05)
+        b = get_adjusted_table('Bronze', 'combined', trend_factor=1.05)
+        c = get_adjusted_table('Bronze', 'combined', trend_factor=1.06)
+
+        assert a is b
+        assert a is not c
+
+    def test_lru_eviction(self):
+        """Cache holds at most MAX_ADJUSTED_TABLES views."""
+        from av_calculator import continuance
+        from av_calculator.constants import MAX_ADJUSTED_TABLES
+
+        first = continuance.get_adjusted_table('Silver', 'rx', trend_factor=1.001)
+        for i in range(MAX_ADJUSTED_TABLES + 5):
+            continuance.get_adjusted_table('Silver', 'rx', trend_factor=1.01 + i / 1000)
+
+        assert len(continuance._ADJUSTED_CACHE) == MAX_ADJUSTED_TABLES
+        assert continuance.get_adjusted_table('Silver', 'rx', trend_factor=1.001) is not first
+
+    def test_cache_stats(self):
+        """Hits, misses and evictions of the view cache are counted."""
+        from av_calculator import continuance
+        from av_calculator.constants import MAX_ADJUSTED_TABLES
+
+        before = continuance.table_cache_stats()
+        continuance.get_adjusted_table('Gold', 'rx', trend_factor=1.234)
+        continuance.get_adjusted_table('Gold', 'rx', trend_factor=1.234)
+        after = continuance.table_cache_stats()
+
+        assert after['misses'] == before['misses'] + 1
+        assert after['hits'] == before['hits'] + 1
+        assert after['adjusted_views'] <= after['adjusted_capacity'] == MAX_ADJUSTED_TABLES
+        assert after['tables_loaded'] >= 1
+
+    def test_trend_raises_av(self):
+        """Trending costs against a fixed deductible/MOOP raises the plan share."""
+        from av_calculator.calculator_v2 import calculate_av
+
+        plan = {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.2, 'metal_tier': 'Silver'}
+        base = calculate_av(plan)
+        trended = calculate_av(dict(plan, trend_factor=1.2))
+
+        assert trended['total_allowed_cost'] > base['total_allowed_cost']
+        assert trended['av'] >= base['av']
+
+    def test_invalid_factor_rejected(self):
+        """Non-positive factors are rejected."""
+        from av_calculator.continuance import get_adjusted_table
+
+        with pytest.raises(ValueError):
+            get_adjusted_table('Silver', 'combined', trend_factor=0.0)
+
+    @pytest.mark.parametrize("factors", [
+        {'trend_factor': '1.1'},
+        {'area_factor': None},
+        {'trend_factor': float('nan')},
+        {'area_factor': -1.05},
+        {'trend_factor': True},
+    ])
+    def test_non_numeric_factor_rejected(self, factors):
+        """Factors that are not finite positive numbers raise ValueError."""
+        from av_calculator.continuance import get_adjusted_table
+
+        with pytest.raises(ValueError):
+            get_adjusted_table('Silver', 'combined', **factors)
+
+    def test_concurrent_eviction(self):
+        """Threads churning the view cache past capacity never fail or overfill it."""
+        from concurrent.futures import ThreadPoolExecutor
+        from av_calculator import continuance
+        from av_calculator.constants import MAX_ADJUSTED_TABLES
+
+        def churn(worker):
+            for i in range(200):
+                view = continuance.get_adjusted_table(
+                    'Silver', 'rx', trend_factor=1.1 + (worker * 7 + i) % (MAX_ADJUSTED_TABLES * 2) / 1000)
+                assert view.factor > 1
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(churn, range(8)))
+
+        assert len(continuance._ADJUSTED_CACHE) <= MAX_ADJUSTED_TABLES
+
+
+class TestTableRegistry:
+    """Test multi-year vintage discovery and memory-mapped bundles."""
+
+    @pytest.fixture
+    def vintage_root(self, tmp_path, continuance_tables_dir):
+        """Build a root with the 2026 Silver tables plus a compiled 2027 vintage."""
+        import shutil
+        from av_calculator.bundle import compile_bundle
+
+        for name in ('silver_combined.json', 'silver_rx.json'):
+            shutil.copy(continuance_tables_dir / name, tmp_path / name)
+
+        vintage_2027 = tmp_path / '2027'
+        vintage_2027.mkdir()
+        shutil.copy(continuance_tables_dir / 'silver_combined.json', vintage_2027)
+        compile_bundle(vintage_2027, plan_year=2027)
+
+        return tmp_path
+
+    def test_discovers_vintages(self, vintage_root):
+        """Root is the default year; four-digit subdirectories are vintages."""
+        from av_calculator.continuance import TableRegistry
+
+        registry = TableRegistry(vintage_root)
+        assert registry.plan_years == [2026, 2027]
+        assert registry.manifest(2026) is None
+        assert registry.manifest(2027)['plan_year'] == 2027
+
+    def test_tables_load_lazily(self, vintage_root):
+        """Discovery does not load any table until it is requested."""
+        from av_calculator.continuance import TableRegistry
+
+        registry = TableRegistry(vintage_root)
+        registry.discover()
+        assert not registry.is_loaded(2027, 'Silver', 'combined')
+
+        registry.get(2027, 'Silver', 'combined')
+        assert registry.is_loaded(2027, 'Silver', 'combined')
+
+    def test_bundle_matches_json(self, vintage_root):
+        """Memory-mapped bundle columns equal the JSON-parsed columns."""
+        import numpy as np
+        from av_calculator.continuance import TableRegistry
+
+        registry = TableRegistry(vintage_root)
+        from_json = registry.get(2026, 'Silver', 'combined')
+        from_bundle = registry.get(2027, 'Silver', 'combined')
+
+        assert isinstance(from_bundle.maxd.base, np.memmap)
+        np.testing.assert_array_equal(from_json.maxd, from_bundle.maxd)
+        np.testing.assert_array_equal(from_json.up_to, from_bundle.up_to)
+        assert from_json.services.keys() == from_bundle.services.keys()
+
+    def test_unknown_plan_year(self, vintage_root):
+        """Requesting a missing vintage raises FileNotFoundError."""
+        from av_calculator.continuance import TableRegistry
+
+        with pytest.raises(FileNotFoundError):
+            TableRegistry(vintage_root).get(2030, 'Silver', 'combined')
+
+    def test_calculate_av_accepts_plan_year(self):
+        """calculate_av resolves plan_year through the registry."""
+        from av_calculator.calculator_v2 import calculate_av
+
+        plan = {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.2, 'metal_tier': 'Silver'}
+        assert calculate_av(dict(plan, plan_year=2026))['av'] == calculate_av(plan)['av']
+        with pytest.raises(FileNotFoundError):
+            calculate_av(dict(plan, plan_year=1999))
+
+
+class TestWorkbookIngestion:
+    """Test streaming ingestion of the CMS AV Calculator workbook."""
+
+    @pytest.fixture(scope="class")
+    def workbook_path(self, tmp_path_factory, continuance_tables_dir):
+        """Build a workbook laid out like the CMS calculator from the JSON tables."""
+        openpyxl = pytest.importorskip("openpyxl")
+
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        for table_file in sorted(continuance_tables_dir.glob('*_*.json')):
+            with open(table_file, 'r') as f:
+                table = json.load(f)
+
+            sheet = workbook.create_sheet(table['table_name'])
+            sheet.append([table['table_title']])
+            sheet.append([])
+            sheet.append(table['columns'])
+            for row in table['data']:
+                sheet.append([row[column] for column in table['columns']])
+
+        path = tmp_path_factory.mktemp('workbook') / 'AV-Calculator.xlsx'
+        workbook.save(path)
+        return path
+
+    def test_ingest_matches_json_tables(self, workbook_path, tmp_path):
+        """Ingested bundle reproduces the hand-extracted tables exactly."""
+        import numpy as np
+        from av_calculator.continuance import TableRegistry
+        from av_calculator.ingest import ingest_workbook
+
+        vintage_dir = tmp_path / '2027'
+        report = ingest_workbook(workbook_path, vintage_dir, plan_year=2027)
+
+        assert len(report.row_counts) == 12
+        assert all(count == 166 for count in report.row_counts.values())
+        assert (vintage_dir / 'silver_combined.json').exists()
+
+        registry = TableRegistry(tmp_path)
+        expected = TableRegistry().get(2026, 'Silver', 'combined')
+        ingested = registry.get(2027, 'Silver', 'combined')
+
+        # xlsx stores floats as text, so allow last-digit round-trip noise
+        np.testing.assert_allclose(ingested.maxd, expected.maxd, rtol=1e-12)
+        np.testing.assert_allclose(ingested.up_to, expected.up_to, rtol=1e-12)
+        for code, column in expected.services.items():
+            np.testing.assert_allclose(ingested.services[code], column, rtol=1e-12)
+
+    def test_strict_accepts_cms_workbook(self, workbook_path, tmp_path):
+        """The 2026 workbook's headers carry every service column, so strict passes."""
+        from av_calculator.ingest import ingest_workbook
+
+        report = ingest_workbook(workbook_path, tmp_path, plan_year=2027, write_json=False, strict=True)
+        assert report.warnings == []
+        assert len(report.row_counts) == 12
+
+    def test_reports_missing_service_columns(self):
+        """Service columns absent from a sheet produce warnings."""
+        from av_calculator.ingest import validate_columns
+
+        columns = ['Up To', 'Percent of Enrollees', "Avg. Cost per Enrollee (Max'd)",
+                   'Avg. Cost per Enrollee (Bucket)', 'Generics', 'Preferred Brand', 'Non-Preferred Brand']
+        warnings = validate_columns('silver_rx', 'rx', columns)
+        assert warnings == ["silver_rx: service column 'Specialty High-Cost' not found"]
+
+    def test_strict_fails_on_missing_service_column(self, workbook_path, tmp_path):
+        """A sheet missing a service column fails ingestion when strict."""
+        openpyxl = pytest.importorskip("openpyxl")
+        from av_calculator.ingest import ingest_workbook
+
+        workbook = openpyxl.load_workbook(workbook_path)
+        sheet = workbook['Gold_Rx']
+        for cell in sheet[3]:
+            if cell.value == 'Specialty High-Cost':
+                cell.value = 'Specialty'
+        path = tmp_path / 'renamed.xlsx'
+        workbook.save(path)
+
+        report = ingest_workbook(path, tmp_path / 'lenient', plan_year=2027, write_json=False)
+        assert report.warnings == ["gold_rx: service column 'Specialty High-Cost' not found"]
+
+        with pytest.raises(ValueError, match="Specialty High-Cost"):
+            ingest_workbook(path, tmp_path / 'strict', plan_year=2027, strict=True)
+
+    def test_row_count_mismatch_fails(self, workbook_path, tmp_path):
+        """A sheet with the wrong number of rows is rejected."""
+        from av_calculator.ingest import ingest_workbook
+
+        with pytest.raises(ValueError, match="rows"):
+            ingest_workbook(workbook_path, tmp_path, plan_year=2027, expected_rows=165)
+
+    def test_missing_core_column_fails(self):
+        """Headers without the core columns are rejected."""
+        from av_calculator.ingest import validate_columns
+
+        with pytest.raises(ValueError, match="core columns"):
+            validate_columns('silver_rx', 'rx', ['Up To', 'Generics'])
+
+
+class TestColumnProjection:
+    """Test column-projected table loading with lazy extra columns."""
+
+    def test_json_loads_only_projected_columns(self):
+        """Only core and mapped service columns are decoded by default."""
+        from av_calculator.constants import CORE_COLUMNS
+        from av_calculator.continuance import load_table_from_json
+
+        table = load_table_from_json('Silver', 'combined')
+
+        assert set(CORE_COLUMNS) <= set(table.columns)
+        assert 'IP Max Days - 3' not in table.columns
+        assert 'Primary Care >2 Visits' not in table.columns
+
+    def test_declared_columns_loaded_up_front(self):
+        """Columns declared by the caller are decoded with the table."""
+        from av_calculator.continuance import load_table_from_json
+
+        table = load_table_from_json('Silver', 'combined', columns=['IP Max Days - 3'])
+        assert 'IP Max Days - 3' in table.columns
+
+    def test_extra_columns_load_lazily(self, continuance_tables_dir):
+        """Undeclared columns are pulled in on first access and match the source."""
+        from av_calculator.continuance import load_table_from_json
+
+        table = load_table_from_json('Gold', 'combined')
+        column = table.column('Primary Care >2 Visits')
+
+        with open(continuance_tables_dir / 'gold_combined.json', 'r') as f:
+            rows = json.load(f)['data']
+
+        assert 'Primary Care >2 Visits' in table.columns
+        assert list(column) == [row['Primary Care >2 Visits'] for row in rows]
+
+    def test_unknown_column_raises(self):
+        """Requesting a column the table does not have raises KeyError."""
+        from av_calculator.continuance import get_continuance_table
+
+        with pytest.raises(KeyError):
+            get_continuance_table('Silver', 'rx').column('IP Max Days - 1')
+
+    def test_adjusted_view_scales_only_cost_columns(self):
+        """Trend factors scale dollar columns but not day or visit counts."""
+        import numpy as np
+        from av_calculator.continuance import get_adjusted_table, get_continuance_table
+
+        base = get_continuance_table('Silver', 'combined')
+        view = get_adjusted_table('Silver', 'combined', trend_factor=1.1)
+
+        np.testing.assert_allclose(view.column('Primary Care >2 Visits'),
+                                   base.column('Primary Care >2 Visits') * 1.1)
+        np.testing.assert_array_equal(view.column('IP Max Days - 2'), base.column('IP Max Days - 2'))
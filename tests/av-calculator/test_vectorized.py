@@ -0,0 +1,221 @@
+"""
+Tests for the vectorized batch engine.
+
+Checks it against the scalar v2 engine on a small fuzzed population; run
+fuzz_engines.py for the large-scale comparison.
+"""
+
+import numpy as np
+import pytest
+
+
+class TestVectorizedEngine:
+    """Test calculate_av_batch against calculate_av_combined_v2."""
+
+    def test_matches_scalar_engine(self):
+        """Test that random plans give the same AV, iterations and warnings."""
+        from av_calculator.vectorized import calculate_av_batch
+        from fuzz_engines import generate_plans, reference_av
+
+        plans = [plan for plan in generate_plans(60, seed=3) if plan['moop'] >= 2000]
+        batch = calculate_av_batch(plans)
+
+        for i, plan in enumerate(plans):
+            reference = reference_av(plan)
+            if 'error' in reference:
+                assert batch.errors[i] is not None
+                continue
+            assert batch.errors[i] is None
+            assert batch.av[i] == pytest.approx(reference['av'], abs=1e-9)
+            assert batch.iterations_outer[i] == reference['iterations_outer']
+            assert bool(batch.converged[i]) == reference['converged']
+
+    def test_iteration_cap(self):
+        """Test that lanes under a lower iteration cap solve exactly and the rest are marked capped."""
+        from av_calculator.vectorized import calculate_av_batch
+        from fuzz_engines import generate_plans
+
+        plans = [plan for plan in generate_plans(40, seed=5) if plan['moop'] >= 2000]
+        full = calculate_av_batch(plans)
+        screened = calculate_av_batch(plans, max_iterations=50)
+        settled = ~screened.capped
+
+        assert settled.any()
+        assert (screened.av[settled] == full.av[settled]).all()
+        assert (screened.iterations_outer[settled] == full.iterations_outer[settled]).all()
+
+        tight = calculate_av_batch(plans[:1], max_iterations=1)
+        assert tight.capped[0]
+        assert "Outer loop hit max iterations (1)" in tight.warnings(0)
+        with pytest.raises(ValueError):
+            calculate_av_batch(plans, max_iterations=0)
+
+    def test_result_lane(self):
+        """Test that a lane converts to the same AVResult the scalar engine returns."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.vectorized import calculate_av_batch
+
+        plan = {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2}
+        batch = calculate_av_batch([plan])
+        expected = calculate_av_v2(dict(plan))
+        result = batch.to_dicts()[0]
+
+        assert result['av'] == expected['av']
+        assert result['metal_tier'] == expected['metal_tier']
+        assert result['breakdown'] == expected['breakdown']
+        assert result['warnings'] == expected['warnings']
+
+    def test_failed_lanes(self):
+        """Test that invalid plans fail their own lane only."""
+        from av_calculator.vectorized import calculate_av_batch
+
+        batch = calculate_av_batch([
+            {'deductible': 9000, 'moop': 8000, 'coinsurance': 0.2},
+            {'deductible': 0, 'moop': 8000, 'coinsurance': 0.2},
+            {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2,
+             'service_params': {'SP': {'first_visits': 3}}},
+            {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2},
+        ])
+
+        assert list(batch.failed) == [True, True, True, False]
+        assert batch.to_dicts()[0] == {'error': 'Deductible cannot exceed MOOP'}
+        with pytest.raises(ValueError):
+            batch.result(2)
+        assert 0.5 < batch.av[3] < 0.8
+
+    def test_explanation_matches_scalar_engine(self):
+        """Test that batch explanations equal the scalar engine's, lane by lane."""
+        from av_calculator.calculator_v2 import calculate_av as calculate_av_v2
+        from av_calculator.vectorized import calculate_av_batch
+
+        plans = [
+            {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2},
+            {'deductible': 9000, 'moop': 8000, 'coinsurance': 0.2},
+            {'deductible': 8000, 'moop': 8000, 'coinsurance': 0.2},
+            {'deductible': 4000, 'moop': 9100, 'coinsurance': 0.3, 'metal_tier': 'Bronze',
+             'service_params': {'PC': {'first_visits': 3}, 'IP': {'per_day_limit': 5}}},
+        ]
+        batch = calculate_av_batch(plans, explain=True)
+        results = batch.to_dicts()
+
+        assert results[1] == {'error': 'Deductible cannot exceed MOOP'}
+        for plan, result in zip(plans[2:] + plans[:1], results[2:] + results[:1]):
+            assert result['explanation'] == calculate_av_v2(dict(plan, explain=True))['explanation']
+        with pytest.raises(ValueError):
+            calculate_av_batch(plans[:1]).attribution(0)
+
+
+class TestFamilyTier:
+    """Test family-tier evaluation in the batch engine."""
+
+    PLAN = {'deductible': 2000, 'moop': 8000, 'coinsurance': 0.2}
+
+    def test_single_member_matches_individual(self):
+        """Test that a one-member family is priced like the member's own plan."""
+        from av_calculator.vectorized import calculate_av_batch
+
+        aggregate = dict(self.PLAN, family_deductible=4000, family_moop=16000, embedded_deductible=False)
+        batch = calculate_av_batch([self.PLAN, aggregate], family_size=1)
+        at_family_limits = calculate_av_batch([dict(self.PLAN, deductible=4000, moop=16000)])
+
+        assert batch.family['av'][0] == pytest.approx(batch.av[0], abs=1e-9)
+        assert batch.family['av'][1] == pytest.approx(at_family_limits.av[0], abs=1e-9)
+        assert batch.av[1] == batch.av[0]
+
+    def test_family_limits_raise_av(self):
+        """Test that larger families and lower family limits raise family AV."""
+        from av_calculator.vectorized import calculate_av_batch
+
+        plans = [self.PLAN, dict(self.PLAN, family_deductible=3000, family_moop=12000)]
+        by_size = [calculate_av_batch(plans, family_size=size).family['av'] for size in (2, 3, 4)]
+
+        assert by_size[0][0] == pytest.approx(calculate_av_batch(plans).av[0], abs=1e-9)
+        for smaller, larger in zip(by_size, by_size[1:]):
+            assert (larger >= smaller).all()
+        assert by_size[1][1] > by_size[1][0]
+
+    def test_family_deductible_never_raises_av(self):
+        """Test that family AV falls with the family deductible and embedding never lowers it."""
+        from av_calculator.vectorized import calculate_av_batch
+
+        copays = {code: {'copay': copay, 'subject_to_deductible': False, 'subject_to_coinsurance': False}
+                  for code, copay in (('PC', 30), ('SP', 60), ('ER', 300))}
+        for plan in (self.PLAN, dict(self.PLAN, service_params=copays)):
+            family_deductibles = [4000, 8000, 12000, 16000]
+            by_embedding = [
+                calculate_av_batch([
+                    dict(plan, family_deductible=deductible, family_moop=16000, embedded_deductible=embedded)
+                    for deductible in family_deductibles
+                ], family_size=6).family['av']
+                for embedded in (False, True)
+            ]
+
+            # Member lanes at different deductibles converge to within ~1e-8 AV
+            assert (np.diff(by_embedding[0]) <= 1e-6).all()
+            assert (by_embedding[1] >= by_embedding[0] - 1e-6).all()
+
+    def test_family_limits_relieve_once(self):
+        """Test that family cost-sharing is one accumulator capped at the family MOOP."""
+        from av_calculator.continuance import get_continuance_table
+        from av_calculator.family import family_cost_sharing
+
+        table = get_continuance_table('Silver')
+        lanes = 5
+        adjusted_deductible = np.full(lanes, 2000.0)
+        moop_spending = np.full(lanes, 32000.0)
+        lev_deductible, lev_moop = np.interp([2000.0, 32000.0], table.up_to, table.maxd)
+        # A lane with 20% cost-sharing past its deductible
+        plan_pay_deduct_to_moop = np.full(lanes, 0.8 * (lev_moop - lev_deductible))
+        member_cost = lev_deductible + 0.2 * (lev_moop - lev_deductible)
+
+        family_deductible = np.array([2000.0, 4000.0, 8000.0, 12000.0, 16000.0])
+        family = family_cost_sharing(
+            table, adjusted_deductible, moop_spending, np.zeros(lanes), plan_pay_deduct_to_moop,
+            np.full(lanes, member_cost), np.full(lanes, 2000.0), family_deductible,
+            np.full(lanes, 16000.0), family_size=6,
+        )
+
+        assert (np.diff(family) >= 0).all()
+        assert (family <= min(6 * member_cost, 16000.0)).all()
+        assert family[0] < family[-1]
+
+    def test_family_result(self):
+        """Test family results in result dictionaries and failed lanes."""
+        from av_calculator.vectorized import calculate_av_batch
+
+        batch = calculate_av_batch([
+            dict(self.PLAN, family_deductible=3000),
+            dict(self.PLAN, family_deductible=20000),
+        ], family_size=3)
+        result = batch.to_dicts()[0]
+
+        assert result['family']['family_size'] == 3
+        assert result['family']['embedded_deductible'] is True
+        assert result['family']['total_allowed_cost'] == pytest.approx(3 * result['total_allowed_cost'])
+        assert result['family']['av'] > result['av']
+        assert batch.errors[1] == 'Family deductible cannot exceed family MOOP'
+        with pytest.raises(ValueError):
+            calculate_av_batch([self.PLAN], family_size=0)
+
+
+class TestFuzzShrinker:
+    """Test repro shrinking in the fuzz harness."""
+
+    def test_shrink_to_minimal_plan(self):
+        """Test that shrinking drops everything the failure does not depend on."""
+        from fuzz_engines import shrink
+
+        plan = {
+            'deductible': 2345.67, 'moop': 8123.45, 'coinsurance': 0.37, 'metal_tier': 'Gold',
+            'service_params': {'PC': {'first_visits': 3, 'copay': 20}, 'ER': {'copay': 500}},
+        }
+
+        def fails(candidate):
+            return candidate.get('service_params', {}).get('PC', {}).get('first_visits') == 3
+
+        repro = shrink(plan, fails)
+
+        assert repro == {
+            'deductible': 2300.0, 'moop': 8100.0, 'coinsurance': 0.35, 'metal_tier': 'Silver',
+            'service_params': {'PC': {'first_visits': 3}},
+        }